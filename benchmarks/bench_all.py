@@ -0,0 +1,94 @@
+#!/usr/bin/python3
+"""
+Benchmark of the all command: printing the list of every str(obj) built in
+memory first, against streaming it in chunks (the list, jsonl and csv
+formats), reporting the time to the first byte written, the total time and
+the peak memory allocated while printing
+
+Usage: ./benchmarks/bench_all.py [records]
+"""
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+class Sink:
+    """Output stream discarding what it is given, noting when it first
+    was"""
+
+    def __init__(self):
+        """Initialize an empty sink"""
+        self.first = None
+
+    def write(self, text):
+        """Discards text"""
+        if self.first is None:
+            self.first = time.perf_counter()
+        return len(text)
+
+    def flush(self):
+        """Does nothing"""
+
+
+def build_list(storage, sink):
+    """Prints all Place the way all used to: one list, then print()"""
+    result = []
+    for obj in storage.all("Place").values():
+        result.append(str(obj))
+    print(result, file=sink)
+
+
+def stream(output):
+    """Returns a function printing all Place --format=output"""
+    from models.output import writers
+
+    def run(storage, sink):
+        """Streams every Place to sink"""
+        writer = writers[output](sink, "Place")
+        for obj in storage.stream("Place"):
+            writer.write(obj)
+        writer.close()
+    return run
+
+
+def measure(run, storage):
+    """Returns the time to the first byte and in total, in ms, and the
+    peak memory allocated by run, in MiB"""
+    sink = Sink()
+    tracemalloc.start()
+    start = time.perf_counter()
+    run(storage, sink)
+    end = time.perf_counter()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return ((sink.first - start) * 1000, (end - start) * 1000,
+            peak / (1 << 20))
+
+
+def main(records):
+    """Times all over a store of records places"""
+    os.chdir(tempfile.mkdtemp())
+    from models import storage
+    from models.place import Place
+
+    storage.all().clear()
+    for i in range(records):
+        place = Place()
+        place.name = f"place {i}"
+        place.price_by_night = i % 300
+    for name, run in [("list, built", build_list),
+                      ("list, streamed", stream("list")),
+                      ("jsonl", stream("jsonl")),
+                      ("csv", stream("csv"))]:
+        first, total, peak = measure(run, storage)
+        print(f"{name:<15} first byte {first:9.1f} ms, "
+              f"total {total:9.1f} ms, peak {peak:7.1f} MiB")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
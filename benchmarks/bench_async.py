@@ -0,0 +1,49 @@
+#!/usr/bin/python3
+"""
+Benchmark of the time BaseModel.save() blocks its caller, with saves made
+in the caller and with the background writer (FileStorage.async_mode)
+
+Usage: ./benchmarks/bench_async.py [records] [saves]
+"""
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))))
+
+
+def main(records, saves):
+    """Times saves updates of one object among records objects"""
+    os.chdir(tempfile.mkdtemp())
+    from models import storage
+    from models.engine.file_storage import FileStorage
+    from models.user import User
+
+    storage.all().clear()
+    users = [User() for _ in range(records)]
+    storage.save()
+
+    for async_mode in (False, True):
+        FileStorage.async_mode = async_mode
+        latencies = []
+        start = time.perf_counter()
+        for i in range(saves):
+            user = users[i % records]
+            user.first_name = f"name {i}"
+            begin = time.perf_counter()
+            user.save()
+            latencies.append((time.perf_counter() - begin) * 1000)
+        storage.flush()
+        total = time.perf_counter() - start
+        print(f"{'async' if async_mode else 'sync':>5}: save() median "
+              f"{statistics.median(latencies):8.3f} ms, max "
+              f"{max(latencies):8.3f} ms, {saves} saves written in "
+              f"{total:.2f}s")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10000,
+         int(sys.argv[2]) if len(sys.argv) > 2 else 100)
@@ -0,0 +1,65 @@
+#!/usr/bin/python3
+"""
+Benchmark of FileStorage checkpoint latency under each fsync policy: a full
+snapshot (compact) and a journal append of one changed object
+
+Usage: ./benchmarks/bench_checkpoint.py [records] [rounds]
+"""
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))))
+
+
+def timings(action, rounds):
+    """Returns the latencies of rounds calls of action, in milliseconds"""
+    latencies = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        action()
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+def report(name, latencies):
+    """Prints the median and worst latency"""
+    print(f"{name:>18}: median {statistics.median(latencies):8.2f} ms, "
+          f"max {max(latencies):8.2f} ms")
+
+
+def main(records, rounds):
+    """Times rounds checkpoints of records objects per fsync policy"""
+    os.chdir(tempfile.mkdtemp())
+    from models import storage
+    from models.engine.file_storage import FileStorage
+    from models.user import User
+
+    storage.all().clear()
+    users = [User() for _ in range(records)]
+    storage.save()
+
+    for policy in ("never", "batch", "always"):
+        FileStorage.fsync = policy
+
+        def snapshot():
+            users[0].first_name = "Betty"
+            storage.compact()
+        report(f"{policy} snapshot", timings(snapshot, rounds))
+
+        FileStorage.journal_mode = True
+
+        def append():
+            users[0].first_name = "Betty"
+            storage.save()
+        report(f"{policy} journal", timings(append, rounds))
+        FileStorage.journal_mode = False
+        storage.compact()
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10000,
+         int(sys.argv[2]) if len(sys.argv) > 2 else 50)
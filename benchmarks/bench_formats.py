@@ -0,0 +1,60 @@
+#!/usr/bin/python3
+"""
+Benchmark of a full save and reload of FileStorage in each snapshot format
+
+Usage: ./benchmarks/bench_formats.py [records]
+"""
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))))
+
+CLASSES = ("BaseModel", "User", "State", "City", "Amenity", "Place",
+           "Review")
+
+
+def entries(records):
+    """Yields (key, dictionary) for records objects of every class"""
+    for i in range(records):
+        class_name = CLASSES[i % len(CLASSES)]
+        obj_id = f"{i:08d}-0000-4000-8000-000000000000"
+        yield f"{class_name}.{obj_id}", {
+            "id": obj_id,
+            "created_at": "2024-01-01T12:00:00.000000",
+            "updated_at": "2024-01-01T12:00:00.000000",
+            "name": f"name {i}",
+            "__class__": class_name}
+
+
+def main(records):
+    """Times one save and one reload of records objects per format"""
+    os.chdir(tempfile.mkdtemp())
+    from models import storage
+    from models.engine.file_storage import FileStorage
+    from models.engine.serializers import serializers
+
+    for name in serializers:
+        storage.all().clear()
+        storage.hydrate_many(entries(records))
+        FileStorage.format = name
+
+        start = time.perf_counter()
+        storage.save()
+        saved = time.perf_counter() - start
+        path = [p for p in os.listdir() if p.startswith("file.")][0]
+        size = os.path.getsize(path)
+
+        storage.all().clear()
+        start = time.perf_counter()
+        storage.reload()
+        loaded = time.perf_counter() - start
+        print(f"{name:>6}: save {saved:.2f}s, reload {loaded:.2f}s, "
+              f"{size / 1e6:.1f} MB ({len(storage.all())} objects)")
+        os.remove(path)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200000)
@@ -0,0 +1,78 @@
+#!/usr/bin/python3
+"""
+Benchmark of bulk loading places, in records per second: one create plus
+an update per attribute in the console, each saving the store, against
+import from JSON Lines and CSV files, and export back to them
+
+Usage: ./benchmarks/bench_import.py [records] [console_records]
+"""
+import io
+import os
+import sys
+import tempfile
+import time
+from unittest import mock
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+ATTRIBUTES = {"name": "Loft", "city_id": "city-1", "number_rooms": "3",
+              "price_by_night": "120", "latitude": "37.77"}
+
+
+def rate(records, seconds):
+    """Formats a throughput"""
+    return f"{records / seconds:10.0f} records/s ({seconds:7.2f} s)"
+
+
+def console_load(records):
+    """Returns the seconds taken to create records places with the create
+    and update commands"""
+    from console import HBNBCommand
+    cli = HBNBCommand()
+    start = time.perf_counter()
+    with mock.patch("sys.stdout", new=io.StringIO()) as out:
+        for _ in range(records):
+            out.seek(0)
+            out.truncate()
+            cli.onecmd("create Place")
+            place_id = out.getvalue().strip()
+            for name, value in ATTRIBUTES.items():
+                cli.onecmd(f"update Place {place_id} {name} {value}")
+    return time.perf_counter() - start
+
+
+def main(records, console_records):
+    """Times loading records places from files and console_records places
+    through the console"""
+    os.chdir(tempfile.mkdtemp())
+    from models import storage
+    from models.engine.file_storage import FileStorage
+    from models.place import Place
+
+    FileStorage.fsync = "never"
+    storage.all().clear()
+    seconds = console_load(console_records)
+    print(f"{'create + update':<16} {rate(console_records, seconds)}")
+
+    storage.all().clear()
+    for i in range(records):
+        place = Place()
+        for name, value in ATTRIBUTES.items():
+            setattr(place, name, value)
+    for name in ("places.jsonl", "places.csv"):
+        start = time.perf_counter()
+        storage.export_file(Place, name)
+        exported = time.perf_counter() - start
+        storage.all().clear()
+        storage.save()
+        start = time.perf_counter()
+        storage.import_file(Place, name)
+        imported = time.perf_counter() - start
+        print(f"{'import ' + name[7:]:<16} {rate(records, imported)}")
+        print(f"{'export ' + name[7:]:<16} {rate(records, exported)}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000,
+         int(sys.argv[2]) if len(sys.argv) > 2 else 50)
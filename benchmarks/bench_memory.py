@@ -0,0 +1,65 @@
+#!/usr/bin/python3
+"""
+Benchmark of the memory used per model instance, with the default layout
+and with the compact layout of models.compact
+
+Usage: ./benchmarks/bench_memory.py [instances per class]
+"""
+import json
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))))
+
+from models import compact  # noqa: E402
+from models.base_model import classes  # noqa: E402
+
+NAMES = ("BaseModel", "User", "State", "City", "Amenity", "Place", "Review")
+
+
+def record(cls, i):
+    """Returns the JSON text of the i-th generated instance of cls"""
+    value = {"id": f"{i:08d}-0000-4000-8000-000000000000",
+             "created_at": f"2024-01-01T12:{i % 60:02d}:00.{i % 999999:06d}",
+             "updated_at": f"2024-01-02T12:{i % 60:02d}:00.{i % 999999:06d}",
+             "__class__": cls.__name__}
+    for name, default in compact.fields(cls).items():
+        if name.endswith("_id"):
+            # Foreign keys point at a few hundred parents
+            value[name] = f"{i % 300:08d}-0000-4000-8000-000000000000"
+        elif isinstance(default, str):
+            value[name] = f"{name} {i}"
+        elif isinstance(default, list):
+            value[name] = []
+        else:
+            value[name] = type(default)(i % 100)
+    return json.dumps(value)
+
+
+def measure(cls, texts):
+    """Returns the bytes retained per instance built from texts"""
+    tracemalloc.start()
+    objs = [cls.from_dict(json.loads(text)) for text in texts]
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del objs
+    return size / len(texts)
+
+
+def main(count):
+    """Prints the memory per instance of every model class"""
+    print(f"{'class':<10} {'default':>9} {'compact':>9} {'saved':>6}")
+    for name in NAMES:
+        texts = [record(classes[name], i) for i in range(count)]
+        default = measure(classes[name], texts)
+        compact.enable([name])
+        small = measure(classes[name], texts)
+        compact.disable()
+        print(f"{name:<10} {default:>8.0f}B {small:>8.0f}B "
+              f"{1 - small / default:>6.0%}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
@@ -0,0 +1,55 @@
+#!/usr/bin/python3
+"""
+Benchmark of FileStorage.reload() decoded by 1 to N worker processes, for
+the JSON snapshot split into chunks and for the sharded layout
+
+Usage: ./benchmarks/bench_parallel.py [records] [max_workers]
+"""
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))))
+
+
+def main(records, max_workers):
+    """Times reloads of records objects with 1 to max_workers workers"""
+    os.chdir(tempfile.mkdtemp())
+    from models import storage
+    from models.engine.file_storage import FileStorage
+    from models.place import Place
+    from models.user import User
+
+    storage.all().clear()
+    for n in range(records):
+        obj = (User if n % 2 else Place)()
+        obj.name = f"object {n}"
+    FileStorage.fsync = "never"
+    storage.save()
+    FileStorage.sharded = True
+    FileStorage.shard_partitions = 2 * max_workers
+    storage.save()
+
+    size = os.path.getsize("file.json") / 1e6
+    print(f"{records} objects, file.json {size:.1f} MB, "
+          f"{os.cpu_count()} CPUs")
+    for sharded in (False, True):
+        FileStorage.sharded = sharded
+        base = None
+        for workers in range(1, max_workers + 1):
+            FileStorage.reload_workers = workers
+            storage.all().clear()
+            start = time.perf_counter()
+            storage.reload()
+            elapsed = time.perf_counter() - start
+            base = base or elapsed
+            layout = "shards" if sharded else "chunks"
+            print(f"{layout} x{workers:<3}: {elapsed:6.2f} s "
+                  f"(speedup {base / elapsed:4.2f})")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200000,
+         int(sys.argv[2]) if len(sys.argv) > 2 else os.cpu_count() or 1)
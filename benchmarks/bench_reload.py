@@ -0,0 +1,53 @@
+#!/usr/bin/python3
+"""
+Benchmark of FileStorage.reload() on a generated file.json
+
+Usage: ./benchmarks/bench_reload.py [records]
+"""
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))))
+
+CLASSES = ("BaseModel", "User", "State", "City", "Amenity", "Place",
+           "Review")
+
+
+def generate(path, records):
+    """Writes a file.json holding records objects of every class"""
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("{")
+        for i in range(records):
+            class_name = CLASSES[i % len(CLASSES)]
+            obj_id = f"{i:08d}-0000-4000-8000-000000000000"
+            value = {"id": obj_id,
+                     "created_at": "2024-01-01T12:00:00.000000",
+                     "updated_at": "2024-01-01T12:00:00.000000",
+                     "name": f"name {i}",
+                     "__class__": class_name}
+            separator = ",\n" if i else ""
+            f.write(f'{separator}"{class_name}.{obj_id}": {json.dumps(value)}')
+        f.write("}")
+
+
+def main(records):
+    """Times one reload of records objects"""
+    os.chdir(tempfile.mkdtemp())
+    generate("file.json", records)
+    from models import storage
+    storage.all().clear()
+
+    start = time.perf_counter()
+    storage.reload()
+    elapsed = time.perf_counter() - start
+    print(f"reload: {len(storage.all())} objects in {elapsed:.2f}s "
+          f"({len(storage.all()) / elapsed:,.0f} objects/s)")
+    os.remove("file.json")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000000)
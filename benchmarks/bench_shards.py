@@ -0,0 +1,59 @@
+#!/usr/bin/python3
+"""
+Benchmark of the FileStorage sharded layout against the single file: the
+latency of saving one changed Review in a store of mostly Users and Places,
+and the time of a full reload
+
+Usage: ./benchmarks/bench_shards.py [records] [rounds]
+"""
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))))
+
+
+def main(records, rounds):
+    """Times saves and reloads of records objects in each layout"""
+    os.chdir(tempfile.mkdtemp())
+    from models import storage
+    from models.engine.file_storage import FileStorage
+    from models.place import Place
+    from models.review import Review
+    from models.user import User
+
+    FileStorage.fsync = "never"
+    for sharded, partitions in ((False, 1), (True, 1), (True, 8)):
+        FileStorage.sharded = sharded
+        FileStorage.shard_partitions = partitions
+        storage.all().clear()
+        for n in range(records):
+            (User if n % 2 else Place)()
+        review = Review()
+        storage.save()
+
+        latencies = []
+        for _ in range(rounds):
+            review.text = "Great"
+            start = time.perf_counter()
+            storage.save()
+            latencies.append((time.perf_counter() - start) * 1000)
+        storage.all().clear()
+        start = time.perf_counter()
+        storage.reload()
+        reload_time = time.perf_counter() - start
+
+        name = f"sharded x{partitions}" if sharded else "single file"
+        print(f"{name:>12}: save median "
+              f"{statistics.median(latencies):8.2f} ms, "
+              f"reload {reload_time:6.2f} s")
+        shutil.rmtree("file.shards", ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000,
+         int(sys.argv[2]) if len(sys.argv) > 2 else 20)
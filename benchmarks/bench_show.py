@@ -0,0 +1,59 @@
+#!/usr/bin/python3
+"""
+Benchmark of a one-shot console lookup, echo "show User <id>" | console.py,
+as the store grows: scanning file.json at startup against opening it
+through its offset index (HBNB_INDEXED)
+
+Usage: ./benchmarks/bench_show.py [max_records] [rounds]
+"""
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+def show(user_id, env, rounds):
+    """Returns the median wall time of rounds console lookups, in ms"""
+    console = os.path.join(ROOT, "console.py")
+    latencies = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        out = subprocess.run([sys.executable, console],
+                             input=f"show User {user_id}\n", env=env,
+                             capture_output=True, text=True, check=True)
+        latencies.append((time.perf_counter() - start) * 1000)
+        assert user_id in out.stdout, out.stdout
+    return statistics.median(latencies)
+
+
+def main(max_records, rounds):
+    """Times lookups in stores of 1000 up to max_records objects"""
+    os.chdir(tempfile.mkdtemp())
+    from models import storage
+    from models.engine.file_storage import FileStorage
+    from models.user import User
+
+    FileStorage.lazy_mode = FileStorage.indexed = True
+    FileStorage.fsync = "never"
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    records = 1000
+    while records <= max_records:
+        storage.all().clear()
+        users = [User() for _ in range(records)]
+        storage.save()
+        user_id = users[records // 2].id
+        scan = show(user_id, env, rounds)
+        indexed = show(user_id, dict(env, HBNB_INDEXED="1"), rounds)
+        print(f"{records:>8} objects: scan {scan:8.1f} ms, "
+              f"indexed {indexed:8.1f} ms")
+        records *= 10
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000,
+         int(sys.argv[2]) if len(sys.argv) > 2 else 5)
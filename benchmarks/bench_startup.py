@@ -0,0 +1,60 @@
+#!/usr/bin/python3
+"""
+Benchmark of the console cold start: wall time of console.py running help
+(which loads nothing) and show (which loads the store) piped in, and the
+slowest imports reported by python -X importtime
+
+Usage: ./benchmarks/bench_startup.py [records] [rounds]
+"""
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+def run(args, env, stdin=None):
+    """Runs a fresh interpreter; returns its wall time in ms and stderr"""
+    start = time.perf_counter()
+    out = subprocess.run([sys.executable, *args], input=stdin, env=env,
+                         capture_output=True, text=True, check=True)
+    return (time.perf_counter() - start) * 1000, out.stderr
+
+
+def main(records, rounds):
+    """Times cold starts against a store of records objects"""
+    os.chdir(tempfile.mkdtemp())
+    from models import storage
+    from models.user import User
+
+    users = [User() for _ in range(records)]
+    storage.save()
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    console = os.path.join(ROOT, "console.py")
+
+    print(f"{records} objects in file.json")
+    for name, args, stdin in (
+            ("python -c pass", ["-c", "pass"], None),
+            ("console help", [console], "help quit\n"),
+            ("console show", [console], f"show User {users[0].id}\n")):
+        times = [run(args, env, stdin)[0] for _ in range(rounds)]
+        print(f"{name:>16}: median {statistics.median(times):7.1f} ms")
+
+    _, err = run(["-X", "importtime", console], env, "help quit\n")
+    imports = []
+    for line in err.splitlines()[1:]:
+        if line.startswith("import time:"):
+            fields = line[len("import time:"):].split("|")
+            imports.append((int(fields[1]), fields[2].rstrip()))
+    print("slowest imports of console help (cumulative us):")
+    for cumulative, module in sorted(imports, reverse=True)[:8]:
+        print(f"{cumulative:>10} {module}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000,
+         int(sys.argv[2]) if len(sys.argv) > 2 else 5)
@@ -2,16 +2,18 @@
 """
 Console module for the AirBnB clone project
 """
+import ast
 import cmd
+import re
 import sys
-from models import storage
-from models.base_model import BaseModel
-from models.user import User
-from models.state import State
-from models.city import City
-from models.amenity import Amenity
-from models.place import Place
-from models.review import Review
+import models
+from models.base_model import classes
+from models.output import writers
+from models.query import Query
+from models.schema import schema
+
+# <class>.<command>(<arguments>), see HBNBCommand.default
+DOT_COMMAND = re.compile(r"^(\w+)\.(\w+)\((.*)\)$")
 
 
 class HBNBCommand(cmd.Cmd):
@@ -19,15 +21,14 @@ class HBNBCommand(cmd.Cmd):
     Command interpreter class for the AirBnB clone
     """
     prompt = "(hbnb) "
-    classes = {
-        'BaseModel': BaseModel,
-        'User': User,
-        'State': State,
-        'City': City,
-        'Amenity': Amenity,
-        'Place': Place,
-        'Review': Review
-    }
+    classes = classes
+    # Saves coalesced per write when commands are piped in (see main)
+    batch_flush_every = 1000
+    batching = False
+    # Whether commands are piped in, and so run inside main's batch
+    piped = False
+    # Attributes the update commands leave as they are
+    read_only = ("id", "created_at", "updated_at", "__class__")
 
     def emptyline(self):
         """Do nothing when an empty line is entered"""
@@ -49,6 +50,27 @@ class HBNBCommand(cmd.Cmd):
         print()
         return True
 
+    def do_begin(self, arg):
+        """Starts a batch: changes are saved once, at commit"""
+        if self.batching:
+            print("** batch already started **")
+            return
+        models.storage.begin()
+        self.batching = True
+
+    def do_commit(self, arg):
+        """Saves the changes made since begin"""
+        if not self.batching:
+            print("** no batch started **")
+            return
+        self.batching = False
+        models.storage.commit()
+        if self.piped:
+            # Piped commands run inside an outer batch, which would defer
+            # this commit: end it to save now, then start it again
+            models.commit_deferred()
+            models.begin_deferred(self.batch_flush_every)
+
     def help_quit(self):
         """Help for quit command"""
         print("Quit command to exit the program")
@@ -93,14 +115,13 @@ class HBNBCommand(cmd.Cmd):
             return
 
         instance_id = args[1]
-        key = f"{class_name}.{instance_id}"
-        all_objects = storage.all()
+        obj = models.storage.get(class_name, instance_id)
 
-        if key not in all_objects:
+        if obj is None:
             print("** no instance found **")
             return
 
-        print(all_objects[key])
+        print(obj)
 
     def do_destroy(self, arg):
         """Deletes an instance based on the class name and id"""
@@ -123,35 +144,106 @@ class HBNBCommand(cmd.Cmd):
             return
 
         instance_id = args[1]
-        key = f"{class_name}.{instance_id}"
-        all_objects = storage.all()
+        obj = models.storage.get(class_name, instance_id)
 
-        if key not in all_objects:
+        if obj is None:
             print("** no instance found **")
             return
 
-        del all_objects[key]
-        storage.save()
+        models.storage.delete(obj)
+        models.storage.save()
 
     def do_all(self, arg):
-        """Prints all string representation of all instances"""
-        all_objects = storage.all()
-        result = []
+        """Prints all string representation of all instances:
+        all [<class>] [--format=list|jsonl|csv]"""
+        args = arg.split()
+        output = "list"
+        if args and args[-1].startswith("--format="):
+            output = args.pop().partition("=")[2]
+        if output not in writers:
+            print(f"** unknown format: {output} **")
+            return
 
-        if not arg:
-            for obj in all_objects.values():
-                result.append(str(obj))
-        else:
-            class_name = arg.split()[0]
+        class_name = None
+        if args:
+            class_name = args[0]
             if class_name not in self.classes:
                 print("** class doesn't exist **")
                 return
 
-            for key, obj in all_objects.items():
-                if key.startswith(f"{class_name}."):
-                    result.append(str(obj))
+        try:
+            writer = writers[output](sys.stdout, class_name)
+        except ValueError as e:
+            print(f"** {e} **")
+            return
+        for obj in models.storage.stream(class_name):
+            writer.write(obj)
+        writer.close()
+
+    def do_query(self, arg):
+        """Prints the instances of a class matching a query, one per line:
+        query <class> [where <field><op><value> [and ...]]
+        [order by <field> [asc|desc]] [limit <n>] [fields <field>,...]"""
+        if not arg:
+            print("** class name missing **")
+            return
 
-        print(result)
+        try:
+            query = Query.parse(arg)
+        except ValueError as e:
+            print(f"** {e} **")
+            return
+
+        if query.class_name not in self.classes:
+            print("** class doesn't exist **")
+            return
+
+        try:
+            query.criteria()
+        except ValueError as e:
+            print(f"** {e} **")
+            return
+
+        for obj in query.run(models.storage):
+            print(query.row(obj))
+
+    def do_import(self, arg):
+        """Creates or replaces instances of a class from the records of a
+        JSON Lines (.jsonl) or CSV (.csv) file, saving once; prints how
+        many were imported: import <class> <file>"""
+        self.transfer(arg, models.storage.import_file)
+
+    def do_export(self, arg):
+        """Writes every instance of a class to a JSON Lines (.jsonl) or CSV
+        (.csv) file; prints how many were exported: export <class> <file>"""
+        self.transfer(arg, models.storage.export_file)
+
+    def transfer(self, arg, function):
+        """Runs function(class name, file name) for import or export and
+        prints its result"""
+        args = arg.split(maxsplit=1)
+        if not args:
+            print("** class name missing **")
+            return
+
+        class_name = args[0]
+        if class_name not in self.classes:
+            print("** class doesn't exist **")
+            return
+
+        if len(args) < 2:
+            print("** file name missing **")
+            return
+
+        try:
+            print(function(class_name, args[1].strip()))
+        except OSError as e:
+            print(f"** {e.strerror}: {args[1].strip()} **")
+        except ValueError as e:
+            print(f"** {e} **")
+        except Exception as e:
+            # Any other failure is reported rather than ending the console
+            print(f"** {type(e).__name__}: {e} **")
 
     def do_update(self, arg):
         """Updates an instance based on the class name and id"""
@@ -174,10 +266,9 @@ class HBNBCommand(cmd.Cmd):
             return
 
         instance_id = args[1]
-        key = f"{class_name}.{instance_id}"
-        all_objects = storage.all()
+        obj = models.storage.get(class_name, instance_id)
 
-        if key not in all_objects:
+        if obj is None:
             print("** no instance found **")
             return
 
@@ -196,19 +287,186 @@ class HBNBCommand(cmd.Cmd):
         if attr_value.startswith('"') and attr_value.endswith('"'):
             attr_value = attr_value[1:-1]
 
-        # Cast to appropriate type
-        obj = all_objects[key]
-        if hasattr(obj, attr_name):
-            attr_type = type(getattr(obj, attr_name))
-            if attr_type == int:
-                attr_value = int(attr_value)
-            elif attr_type == float:
-                attr_value = float(attr_value)
-            # For string, keep as is
+        try:
+            attr_value = self.cast(obj, attr_name, attr_value)
+        except ValueError as e:
+            print(f"** {attr_name}: {e} **")
+            return
 
         setattr(obj, attr_name, attr_value)
         obj.save()
 
+    def default(self, line):
+        """Runs the dot-notation commands, e.g. User.count() or
+        Place.update("<id>", {"name": "Loft", "max_guest": 4})"""
+        match = DOT_COMMAND.match(line.strip())
+        handler = None
+        if match is not None:
+            class_name, command, text = match.groups()
+            handler = getattr(self, f"dot_{command}", None)
+        if handler is not None:
+            try:
+                args = ast.literal_eval(f"[{text}]")
+            except (SyntaxError, ValueError):
+                handler = None
+        if handler is None:
+            return super().default(line)
+
+        if class_name not in self.classes:
+            print("** class doesn't exist **")
+            return
+        handler(class_name, *args)
+
+    def dot_all(self, class_name, *args):
+        """<class>.all(): prints all instances of the class"""
+        self.do_all(class_name)
+
+    def dot_count(self, class_name, *args):
+        """<class>.count(): prints the number of instances of the class"""
+        print(models.storage.count(class_name))
+
+    def dot_show(self, class_name, *args):
+        """<class>.show(<id>): prints an instance"""
+        self.do_show(" ".join([class_name, *map(str, args[:1])]))
+
+    def dot_destroy(self, class_name, *args):
+        """<class>.destroy(<id>): deletes an instance"""
+        self.do_destroy(" ".join([class_name, *map(str, args[:1])]))
+
+    def dot_update(self, class_name, *args):
+        """<class>.update(<id>, <attribute>, <value>) or
+        <class>.update(<id>, <dictionary>): updates an instance, saving it
+        once however many attributes are given"""
+        if not args:
+            print("** instance id missing **")
+            return
+
+        obj = models.storage.get(class_name, str(args[0]))
+        if obj is None:
+            print("** no instance found **")
+            return
+
+        if len(args) > 1 and isinstance(args[1], dict):
+            attributes = args[1]
+        elif len(args) < 2:
+            print("** attribute name missing **")
+            return
+        elif len(args) < 3:
+            print("** value missing **")
+            return
+        else:
+            attributes = {str(args[1]): args[2]}
+
+        try:
+            self.apply(obj, attributes)
+        except ValueError as e:
+            print(f"** {e} **")
+            return
+        obj.save()
+
+    def dot_update_many(self, class_name, *args):
+        """<class>.update_many(<conditions>, <dictionary>): updates every
+        instance matching the conditions of a query's where clause (all
+        of them if empty), saving once; prints how many were updated"""
+        if len(args) < 2 or not isinstance(args[1], dict):
+            print("** dictionary missing **")
+            return
+
+        conditions = str(args[0]).strip()
+        try:
+            if conditions:
+                query = Query.parse(f"{class_name} where {conditions}")
+            else:
+                query = Query(class_name)
+            query.criteria()
+        except ValueError as e:
+            print(f"** {e} **")
+            return
+
+        # Checked once against the schema, before any instance changes
+        fields = schema(self.classes[class_name]).fields
+        attributes = dict(args[1])
+        try:
+            self.check_names(attributes)
+        except ValueError as e:
+            print(f"** {e} **")
+            return
+        for name in attributes.keys() & fields.keys():
+            try:
+                attributes[name] = fields[name].parse(attributes[name])
+            except ValueError as e:
+                print(f"** {name}: {e} **")
+                return
+
+        with models.storage.batch():
+            objects = list(query.run(models.storage))
+            for obj in objects:
+                self.apply(obj, attributes)
+                obj.save()
+        print(len(objects))
+
+    def apply(self, obj, attributes):
+        """Sets the attributes of obj from a name -> value dictionary,
+        except id, the timestamps and __class__; raises ValueError, before
+        setting any, if a name is invalid or a value does not fit its
+        field"""
+        self.check_names(attributes)
+        values = {}
+        for name, value in attributes.items():
+            if name in self.read_only:
+                continue
+            try:
+                values[name] = self.cast(obj, name, value)
+            except ValueError as e:
+                raise ValueError(f"{name}: {e}") from None
+        for name, value in values.items():
+            setattr(obj, name, value)
+
+    def check_names(self, attributes):
+        """Raises ValueError if a key of attributes is not an identifier,
+        or is a private one (starting with __), but for read_only ones"""
+        for name in attributes:
+            if name in self.read_only:
+                continue
+            if (not isinstance(name, str) or not name.isidentifier()
+                    or name.startswith("__")):
+                raise ValueError(f"invalid attribute name: {name!r}")
+
+    @staticmethod
+    def cast(obj, name, value):
+        """Returns value converted by the field name of the schema of obj;
+        a string given for an attribute the class does not declare is
+        converted to the type of its current value (int or float)"""
+        field = schema(type(obj)).fields.get(name)
+        if field is not None:
+            return field.parse(value)
+        if isinstance(value, str) and hasattr(obj, name):
+            attr_type = type(getattr(obj, name))
+            if attr_type == int:
+                return int(value)
+            if attr_type == float:
+                return float(value)
+        return value
+
+
+def main():
+    """Runs the console; commands piped in rather than typed are run as
+    one batch, saving every batch_flush_every writes and at the end. The
+    batch starts when a command first uses the storage, so a script that
+    never does (e.g. help) does not load the store."""
+    console = HBNBCommand()
+    console.piped = not sys.stdin.isatty()
+    if console.piped:
+        models.begin_deferred(console.batch_flush_every)
+    try:
+        console.cmdloop()
+    finally:
+        # A batch left open by begin is saved on exit
+        if console.batching:
+            models.storage.commit()
+        if console.piped:
+            models.commit_deferred()
+
 
 if __name__ == '__main__':
-    HBNBCommand().cmdloop()
+    main()
@@ -1,11 +1,120 @@
 #!/usr/bin/python3
 """
 Models package initialization
+
+models.storage, the unique storage instance, is created and reloaded the
+first time it is used rather than at import, so commands that never touch
+it (help, quit) do not pay for loading the store.
 """
-from models.engine.file_storage import FileStorage
+import os
+import threading
+
+# Storage engine: "db" (SQLite, see DBStorage) or "file" (default)
+storage_t = os.getenv("HBNB_TYPE_STORAGE", "file")
+
+_storage_lock = threading.RLock()
+# flush_every of the batch begin_deferred() left for _open_storage to start
+_pending_batch = None
+
+
+def _configure(FileStorage):
+    """Applies the HBNB_* environment variables to FileStorage"""
+    # Snapshot format: "json" (file.json) or "binary" (file.hbnb)
+    FileStorage.format = os.getenv("HBNB_STORAGE_FORMAT", FileStorage.format)
+
+    # When saves are flushed to disk: "always", "batch" or "never"
+    FileStorage.fsync = os.getenv("HBNB_FSYNC", FileStorage.fsync)
+
+    # Save from a background thread instead of in the caller
+    if os.getenv("HBNB_ASYNC_SAVE"):
+        FileStorage.async_mode = True
+
+    # Return copies from all(), safe to iterate while other threads write
+    if os.getenv("HBNB_THREAD_SAFE"):
+        FileStorage.thread_safe = True
+
+    # Append each save's changes to a journal (<snapshot>.journal), folded
+    # into the snapshot once it grows past HBNB_JOURNAL_LIMIT records
+    if os.getenv("HBNB_JOURNAL"):
+        FileStorage.journal_mode = True
+    if os.getenv("HBNB_JOURNAL_LIMIT"):
+        FileStorage.journal_limit = int(os.getenv("HBNB_JOURNAL_LIMIT"))
+
+    # Build instances on first access instead of at reload
+    if os.getenv("HBNB_LAZY_LOAD"):
+        FileStorage.lazy_mode = True
+
+    # Open the store through its offset index (file.json.idx), building
+    # only the objects used
+    if os.getenv("HBNB_INDEXED"):
+        FileStorage.lazy_mode = True
+        FileStorage.indexed = True
+
+    # Split the snapshot into one file per class, or HBNB_SHARDS files per
+    # class partitioned by id, in the file.shards directory
+    if os.getenv("HBNB_SHARDS"):
+        FileStorage.sharded = True
+        FileStorage.shard_partitions = int(os.getenv("HBNB_SHARDS"))
+
+    # Decode the store in this many processes at reload
+    if os.getenv("HBNB_RELOAD_WORKERS"):
+        FileStorage.reload_workers = int(os.getenv("HBNB_RELOAD_WORKERS"))
+
+    # Share the store with other processes, merging their changes on save
+    # (or refusing to save over them with HBNB_SHARED=refuse)
+    if os.getenv("HBNB_SHARED"):
+        FileStorage.shared = True
+        if os.getenv("HBNB_SHARED") == "refuse":
+            FileStorage.on_conflict = "refuse"
+
+
+def _open_storage():
+    """Creates the storage instance of the application and reloads it"""
+    from models.engine.file_storage import FileStorage
+    _configure(FileStorage)
+    if storage_t == "db":
+        from models.engine.db_storage import DBStorage
+        storage = DBStorage()
+    else:
+        storage = FileStorage()
+
+    # Store model instances in the compact (slotted) layout
+    if os.getenv("HBNB_COMPACT"):
+        from models import compact
+        compact.enable()
+
+    storage.reload()
+    if _pending_batch is not None:
+        storage.begin(*_pending_batch)
+    return storage
+
+
+def begin_deferred(flush_every=None):
+    """Starts a batch (see FileStorage.begin) on the storage, once it is
+    opened: a batch started before then does not load the store"""
+    global _pending_batch
+    with _storage_lock:
+        if "storage" in globals():
+            globals()["storage"].begin(flush_every)
+        else:
+            _pending_batch = (flush_every,)
+
+
+def commit_deferred():
+    """Ends the batch of begin_deferred(), if the storage was opened"""
+    global _pending_batch
+    with _storage_lock:
+        _pending_batch = None
+        if "storage" in globals():
+            globals()["storage"].commit()
 
-# Create a unique FileStorage instance for the application
-storage = FileStorage()
 
-# Reload objects from storage
-storage.reload()
+def __getattr__(name):
+    """Creates models.storage on first use; it is then a plain module
+    attribute, so later lookups cost nothing extra"""
+    if name != "storage":
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    with _storage_lock:
+        if "storage" not in globals():
+            globals()["storage"] = _open_storage()
+    return globals()["storage"]
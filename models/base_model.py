@@ -2,8 +2,81 @@
 """
 BaseModel class definition
 """
+import importlib
+import re
 import uuid
 from datetime import datetime
+import models
+from models.schema import schema
+
+
+class Registry(dict):
+    """
+    Dictionary of class name -> BaseModel subclass, filled in as the
+    subclasses are defined. Looking up a class that is not defined yet, or
+    testing whether it is a model class, imports its module, e.g.
+    models.user for User.
+    """
+
+    def __missing__(self, name):
+        """Imports the module of the model class name and returns it"""
+        module = re.sub(r'(?<!^)(?=[A-Z])', '_', name).lower()
+        if not module.isidentifier():
+            raise KeyError(name)
+        try:
+            importlib.import_module(f"models.{module}")
+        except ImportError:
+            raise KeyError(name) from None
+        if not dict.__contains__(self, name):
+            raise KeyError(name)
+        return dict.__getitem__(self, name)
+
+    def __contains__(self, name):
+        """Tells whether name is a model class, importing its module if it
+        is not defined yet"""
+        if dict.__contains__(self, name):
+            return True
+        try:
+            self[name]
+        except KeyError:
+            return False
+        return True
+
+
+# Every model class, by name
+classes = Registry()
+
+
+class Timestamp:
+    """
+    Descriptor for created_at and updated_at. Instances built from a
+    dictionary keep the ISO 8601 string they were loaded with until the
+    attribute is first read, and to_dict() passes it through unchanged.
+    """
+
+    def __set_name__(self, owner, name):
+        """Remembers the attribute name"""
+        self.name = name
+
+    def __get__(self, obj, owner=None):
+        """Returns the datetime, parsing the stored string on first read"""
+        if obj is None:
+            return self
+        try:
+            value = obj.__dict__[self.name]
+        except KeyError:
+            raise AttributeError(self.name) from None
+        if isinstance(value, str):
+            try:
+                value = datetime.fromisoformat(value)
+            except ValueError:
+                return value
+            obj.__dict__[self.name] = value
+        return value
+
+    def __set__(self, obj, value):
+        """Stores value, a datetime or an ISO 8601 string"""
+        obj.__dict__[self.name] = value
 
 
 class BaseModel:
@@ -11,44 +84,76 @@ class BaseModel:
     BaseModel class that defines all common attributes/methods for other
     classes
     """
+    created_at = Timestamp()
+    updated_at = Timestamp()
+
+    def __init_subclass__(cls, **kwargs):
+        """Registers every subclass in classes"""
+        super().__init_subclass__(**kwargs)
+        classes[cls.__name__] = cls
 
     def __init__(self, *args, **kwargs):
         """
         Initialize BaseModel instance
         """
         if kwargs:  # case: creating from a dictionary
-            for key, value in kwargs.items():
-                if key == "created_at" or key == "updated_at":
-                    setattr(self, key, datetime.fromisoformat(value))
-                elif key != "__class__":
-                    setattr(self, key, value)
+            self._fill(kwargs)
             # Add to storage for instances created from dictionary
-            from models import storage
-            storage.new(self)
+            models.storage.new(self)
         else:  # case: creating a brand new instance
             self.id = str(uuid.uuid4())  # unique ID
             self.created_at = datetime.now()
             self.updated_at = datetime.now()
             # Add to storage for new instances
-            from models import storage
-            storage.new(self)
+            models.storage.new(self)
+
+    @classmethod
+    def from_dict(cls, obj_dict):
+        """Returns an instance built from a to_dict() dictionary, without
+        registering it in storage (see FileStorage.hydrate_many); values
+        saved with another type than the field declares are converted"""
+        obj = cls.__new__(cls)
+        obj._fill(schema(cls).load(obj_dict))
+        return obj
+
+    def _fill(self, obj_dict):
+        """Sets the attributes of a to_dict() dictionary in one step;
+        timestamps stay strings until read (see Timestamp)"""
+        attrs = dict(obj_dict)
+        attrs.pop("__class__", None)
+        self.__dict__.update(attrs)
+
+    def __setattr__(self, name, value):
+        """Sets an attribute and marks the instance as changed in storage"""
+        old = getattr(self, name, None)
+        super().__setattr__(name, value)
+        if getattr(self, "id", None) is not None:
+            models.storage.mark_dirty(self, name, old)
 
     def __str__(self):
         """String representation of the instance"""
+        # Show timestamps as datetimes even if never read yet
+        for key in ("created_at", "updated_at"):
+            if isinstance(self.__dict__.get(key), str):
+                getattr(self, key)
         return f"[{self.__class__.__name__}] ({self.id}) {self.__dict__}"
 
     def save(self):
         """Updates the public instance attribute updated_at with current
         datetime"""
         self.updated_at = datetime.now()
-        from models import storage
-        storage.save()
+        models.storage.save()
 
     def to_dict(self):
         """Returns a dictionary containing all keys/values of __dict__ of the
         instance"""
         obj_dict = self.__dict__.copy()
         obj_dict["__class__"] = self.__class__.__name__
-        obj_dict["created_at"] = self.created_at.isoformat()
-        obj_dict["updated_at"] = self.updated_at.isoformat()
+        for key in ("created_at", "updated_at"):
+            value = obj_dict.get(key)
+            if isinstance(value, datetime):
+                obj_dict[key] = value.isoformat()
         return obj_dict
+
+
+classes['BaseModel'] = BaseModel
@@ -0,0 +1,131 @@
+#!/usr/bin/python3
+"""
+Bulk import and export of the instances of one class, in JSON Lines
+(.jsonl) or CSV (.csv) files, as written by all --format=jsonl|csv
+
+Files are read and written one record at a time. Imported records are
+checked against the schema of the class (see models.schema), e.g.
+Place.number_rooms must be an integer, and converted to their types (CSV
+cells are strings); undeclared attributes are kept as they are. An import
+is all or nothing: a bad record raises ValueError before any instance is
+stored, and the storage is saved once at the end.
+"""
+import csv
+import json
+import os
+import uuid
+from datetime import datetime
+from models.base_model import classes
+from models.engine.object_map import name_of
+from models.output import writers
+from models.schema import schema
+
+# Output format of each file extension
+extensions = {".jsonl": "jsonl", ".csv": "csv"}
+
+
+def file_format(path):
+    """Returns the format of the file at path, from its extension; raises
+    ValueError if it is not one of extensions"""
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in extensions:
+        raise ValueError(f"unknown file format: {extension or path}")
+    return extensions[extension]
+
+
+def read_records(path):
+    """Yields the (line number, record dictionary) of each record in the
+    file at path"""
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        if file_format(path) == "csv":
+            reader = csv.DictReader(f)
+            try:
+                for record in reader:
+                    yield reader.line_num, record
+            except csv.Error as e:
+                # reader.line_num only counts the rows read successfully
+                number = reader.reader.line_num
+                raise ValueError(f"line {number}: {e}") from None
+            return
+        for number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError as e:
+                raise ValueError(f"line {number}: {e}") from None
+            if not isinstance(record, dict):
+                raise ValueError(f"line {number}: not an object")
+            yield number, record
+
+
+def identifier(value):
+    """Returns value, a string or number, as an id string; raises
+    ValueError if it is empty or another type"""
+    if isinstance(value, bool) or not isinstance(value, (str, int, float)):
+        raise ValueError(f"not a string: {value!r}")
+    value = str(value)
+    if not value.strip():
+        raise ValueError("empty")
+    return value
+
+
+def timestamp(value):
+    """Returns value if it is an ISO 8601 date, else raises ValueError"""
+    if not isinstance(value, str):
+        raise ValueError(f"not a date: {value!r}")
+    datetime.fromisoformat(value)
+    return value
+
+
+def import_file(storage, cls, path):
+    """Stores an instance of cls (a class or class name) for each record
+    of the file at path, replacing those with the same id, then saves
+    storage once; returns the number of records imported"""
+    class_name = name_of(cls)
+    cls = classes[class_name]
+    converters = {name: field.parse
+                  for name, field in schema(cls).fields.items()}
+    converters["created_at"] = converters["updated_at"] = timestamp
+    # Records without timestamps are stamped with the time of the import
+    now = datetime.now().isoformat()
+    objects = []
+    for number, record in read_records(path):
+        if record.get("__class__", class_name) != class_name:
+            raise ValueError(f"line {number}: not a {class_name}: "
+                             f"{record['__class__']}")
+        values = {"id": str(uuid.uuid4()),
+                  "created_at": now, "updated_at": now}
+        if record.get("id") is not None:
+            try:
+                values["id"] = identifier(record["id"])
+            except ValueError as e:
+                raise ValueError(f"line {number}: id: {e}") from None
+        for name, value in record.items():
+            if name in ("id", "__class__") or value is None:
+                continue
+            convert = converters.get(name)
+            try:
+                values[name] = value if convert is None else convert(value)
+            except ValueError as e:
+                raise ValueError(f"line {number}: {name}: {e}") from None
+        objects.append(cls.from_dict(values))
+    for obj in objects:
+        storage.new(obj)
+    storage.save()
+    return len(objects)
+
+
+def export_file(storage, cls, path):
+    """Writes every instance of cls (a class or class name) to the file at
+    path; returns the number of records exported"""
+    class_name = name_of(cls)
+    output = file_format(path)
+    count = 0
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = writers[output](f, class_name)
+        for obj in storage.stream(class_name):
+            writer.write(obj)
+            count += 1
+        writer.close()
+    return count
@@ -0,0 +1,152 @@
+#!/usr/bin/python3
+"""
+Opt-in compact layout for model instances
+
+A compact variant of a model class keeps id and every class-level attribute
+(name, city_id, ...) in __slots__ rather than in a per-instance __dict__,
+stores created_at and updated_at as integer microseconds since the epoch,
+and interns the values of *_id attributes, which repeat across instances.
+Attributes that are not declared on the class still go to __dict__.
+
+Compact variants keep the class name and subclass the original class, so
+storage keys, to_dict(), __str__ and the console behave the same. enable()
+registers them in models.base_model.classes, so storage.reload() and the
+console build compact instances from then on:
+
+    from models import compact
+    compact.enable()
+"""
+import sys
+from datetime import datetime, timedelta, timezone
+from models.base_model import classes
+from models.schema import schema
+
+EPOCH = datetime(1970, 1, 1)
+MICROSECOND = timedelta(microseconds=1)
+
+# Original class of every class replaced by enable(), by name
+originals = {}
+
+
+class EpochTimestamp:
+    """
+    Descriptor for created_at and updated_at on compact instances, backed
+    by an integer slot of microseconds since the epoch
+    """
+
+    def __init__(self, slot):
+        """Initialize a descriptor storing its value in the slot named
+        slot"""
+        self.slot = slot
+
+    def __get__(self, obj, owner=None):
+        """Returns the stored time as a datetime"""
+        if obj is None:
+            return self
+        return EPOCH + getattr(obj, self.slot) * MICROSECOND
+
+    def __set__(self, obj, value):
+        """Stores value, a datetime or an ISO 8601 string; one with a
+        time zone is converted to UTC, as the stored time has none"""
+        if isinstance(value, str):
+            value = datetime.fromisoformat(value)
+        if value.tzinfo is not None:
+            value = value.astimezone(timezone.utc).replace(tzinfo=None)
+        object.__setattr__(obj, self.slot, (value - EPOCH) // MICROSECOND)
+
+
+class CompactModel:
+    """
+    Mixin placed in front of a model class by compact_class()
+    """
+    __slots__ = ()
+    created_at = EpochTimestamp("_created_at")
+    updated_at = EpochTimestamp("_updated_at")
+
+    def __getattr__(self, name):
+        """Returns the class-level default of a declared attribute whose
+        slot was never set"""
+        try:
+            return type(self)._defaults[name]
+        except KeyError:
+            raise AttributeError(name) from None
+
+    def __str__(self):
+        """String representation of the instance"""
+        return f"[{self.__class__.__name__}] ({self.id}) {self.attributes()}"
+
+    def _fill(self, obj_dict):
+        """Sets the attributes of a to_dict() dictionary in one step"""
+        for key, value in obj_dict.items():
+            if key == "__class__":
+                continue
+            if isinstance(value, str) and key.endswith("_id"):
+                value = sys.intern(value)
+            object.__setattr__(self, key, value)
+
+    def attributes(self):
+        """Returns the attributes set on the instance, as its __dict__
+        would hold them without the compact layout"""
+        attrs = {}
+        for name in type(self).__slots__:
+            try:
+                value = object.__getattribute__(self, name)
+            except AttributeError:
+                continue
+            if name in ("_created_at", "_updated_at"):
+                name = name[1:]
+                value = EPOCH + value * MICROSECOND
+            attrs[name] = value
+        attrs.update(getattr(self, "__dict__", {}))
+        return attrs
+
+    def to_dict(self):
+        """Returns a dictionary containing all keys/values of the
+        instance"""
+        obj_dict = self.attributes()
+        obj_dict["__class__"] = self.__class__.__name__
+        for key in ("created_at", "updated_at"):
+            if key in obj_dict:
+                obj_dict[key] = obj_dict[key].isoformat()
+        return obj_dict
+
+
+def fields(cls):
+    """Returns the class-level attributes declared by the model class cls
+    and its bases, with their defaults"""
+    return dict(schema(cls).defaults)
+
+
+def compact_class(cls):
+    """Returns a new compact variant of the model class cls; defining it
+    registers it in classes under the name of cls"""
+    defaults = fields(cls)
+    namespace = {
+        "__slots__": ("id", "_created_at", "_updated_at") + tuple(defaults),
+        "__module__": cls.__module__,
+        "__qualname__": cls.__qualname__,
+        "__doc__": cls.__doc__,
+        "_defaults": defaults,
+    }
+    return type(cls.__name__, (CompactModel, cls), namespace)
+
+
+def enable(names=None):
+    """Replaces the registered model classes called names (by default all
+    of them) with their compact variants"""
+    if names is None:
+        names = ("BaseModel", "User", "State", "City", "Amenity", "Place",
+                 "Review")
+    for name in names:
+        cls = classes[name]
+        if issubclass(cls, CompactModel):
+            continue
+        originals[name] = cls
+        compact_class(cls)
+
+
+def disable():
+    """Registers the original model classes again"""
+    for name, cls in originals.items():
+        classes[name] = cls
+    originals.clear()
@@ -0,0 +1,338 @@
+#!/usr/bin/python3
+"""
+DBStorage module for storing instances in a SQLite database
+"""
+import contextlib
+import json
+import os
+import sqlite3
+from models.base_model import classes
+from models.engine.object_map import ObjectMap, indexes, name_of
+
+
+class DBStorage:
+    """
+    DBStorage class storing instances in a SQLite database, with the same
+    interface as FileStorage
+
+    Every model class has its own table, holding the id, the fields listed
+    in indexes as indexed columns, and the to_dict() dictionary of the
+    instance as JSON. save() writes the objects created, updated or
+    destroyed since the last save in a single transaction, so a crash
+    leaves either all or none of them.
+
+    reload() reads no rows: instances are built on demand and then kept
+    in memory. get() reads one row by its id, find() on an indexed field
+    (with a string value) reads the matching rows through the index of its
+    column, and count() counts rows in SQL; all() and stream(), and find()
+    on other fields, read the whole table of the class, after which the
+    instances in memory are authoritative for it (as when all() is
+    cleared).
+
+    As with FileStorage, save() calls inside batch() are coalesced into
+    one transaction.
+
+    The database path is path, or HBNB_DB_PATH, or hbnb.db.
+    """
+    indexes = indexes
+
+    def __init__(self, path=None):
+        """Initialize a storage backed by the database at path"""
+        self.path = path or os.getenv("HBNB_DB_PATH", "hbnb.db")
+        self.__connection = sqlite3.connect(self.path)
+        self.__tables = set()
+        self.__objects = ObjectMap(self.indexes)
+        self.__dirty = set()
+        self.__deleted = set()
+        self.__batch_depth = 0
+        self.__batch_saves = 0
+        self.__batch_flush_every = None
+        # Classes whose every row was read, or all of them
+        self.__loaded = set()
+        self.__all_loaded = False
+
+    def all(self, cls=None):
+        """Returns the dictionary of every instance, or a new dictionary of
+        the instances of cls (a class or class name) only"""
+        if cls is None:
+            if not self.__all_loaded:
+                for class_name in self.__table_names():
+                    self.__load_class(class_name)
+                self.__all_loaded = True
+            return self.__objects
+        class_name = name_of(cls)
+        self.__load_class(class_name)
+        return dict(self.__objects.bucket(class_name))
+
+    def count(self, cls=None):
+        """Returns the number of instances of cls (a class or class name),
+        or of every class, counting the rows not in memory in SQL"""
+        if cls is None:
+            if self.__all_loaded:
+                return len(self.__objects)
+            return sum(map(self.count, set(self.__table_names()) |
+                           set(self.__objects.class_names())))
+        class_name = name_of(cls)
+        bucket = self.__objects.bucket(class_name)
+        if (self.__is_loaded(class_name) or
+                not self.__table_exists(class_name)):
+            return len(bucket)
+        # Rows whose instance is in memory, or destroyed, are not counted
+        skip = [key.partition(".")[2] for key in bucket]
+        skip += [key.partition(".")[2] for key in self.__deleted
+                 if key.startswith(class_name + ".")]
+        stored, = self.__connection.execute(
+            f'SELECT COUNT(*) FROM "{class_name}" '
+            'WHERE id NOT IN (SELECT value FROM json_each(?))',
+            (json.dumps(skip),)).fetchone()
+        return stored + len(bucket)
+
+    def stream(self, cls=None):
+        """Yields the instances of cls (a class or class name), or of every
+        class, one at a time (see FileStorage.stream)"""
+        if cls is None:
+            names = dict.fromkeys(self.__table_names())
+            names.update(dict.fromkeys(self.__objects.class_names()))
+        else:
+            names = [name_of(cls)]
+        for class_name in names:
+            self.__load_class(class_name)
+            yield from list(self.__objects.bucket(class_name).values())
+
+    def get(self, cls, id):
+        """Returns the instance of cls (a class or class name) with the
+        given id, or None, reading its row if it is not in memory"""
+        class_name = name_of(cls)
+        key = f"{class_name}.{id}"
+        obj = self.__objects.get(key)
+        if obj is None and not self.__is_loaded(class_name):
+            self.__load_rows(class_name, {"id": str(id)})
+            obj = self.__objects.get(key)
+        return obj
+
+    def find(self, cls, **criteria):
+        """Returns a dictionary of the instances of cls whose attributes
+        equal the given criteria, e.g. find(City, state_id=state.id); the
+        rows matching the indexed fields are read through their index"""
+        class_name = name_of(cls)
+        if not self.__is_loaded(class_name):
+            fields = self.indexes.get(class_name, ())
+            indexed = {field: value for field, value in criteria.items()
+                       if field in fields and isinstance(value, str)}
+            if indexed:
+                self.__load_rows(class_name, indexed)
+            else:
+                self.__load_class(class_name)
+        candidates = None
+        for field, value in criteria.items():
+            hits = self.__objects.lookup(class_name, field, value)
+            if hits is not None and (candidates is None or
+                                     len(hits) < len(candidates)):
+                candidates = hits
+        if candidates is None:
+            candidates = self.__objects.bucket(class_name)
+        return {key: obj for key, obj in candidates.items()
+                if all(getattr(obj, field, None) == value
+                       for field, value in criteria.items())}
+
+    def import_file(self, cls, path):
+        """Stores an instance of cls for each record of the JSON Lines or
+        CSV file at path, then saves once (see FileStorage.import_file)"""
+        from models import bulk
+        return bulk.import_file(self, cls, path)
+
+    def export_file(self, cls, path):
+        """Writes every instance of cls to the JSON Lines or CSV file at
+        path (see FileStorage.export_file)"""
+        from models import bulk
+        return bulk.export_file(self, cls, path)
+
+    def new(self, obj):
+        """Adds obj to the storage"""
+        key = f"{obj.__class__.__name__}.{obj.id}"
+        self.__objects[key] = obj
+        self.__dirty.add(key)
+        self.__deleted.discard(key)
+
+    def mark_dirty(self, obj, name=None, old=None):
+        """Records obj as changed since the last save (see
+        FileStorage.mark_dirty)"""
+        key = f"{obj.__class__.__name__}.{obj.id}"
+        if key not in self.__objects:
+            return
+        self.__dirty.add(key)
+        if name is not None:
+            self.__objects.reindex(key, obj, name, old)
+
+    def delete(self, obj=None):
+        """Removes obj from the storage, if it is stored"""
+        if obj is None:
+            return
+        key = f"{obj.__class__.__name__}.{obj.id}"
+        if self.__objects.pop(key, None) is not None:
+            self.__dirty.discard(key)
+            self.__deleted.add(key)
+
+    def save(self):
+        """Writes the objects created, updated or destroyed since the last
+        save to the database, in one transaction; inside a batch, the save
+        is deferred to the end of the batch"""
+        if self.__batch_depth:
+            self.__batch_saves += 1
+            flush_every = self.__batch_flush_every
+            if flush_every is None or self.__batch_saves < flush_every:
+                return
+            self.__batch_saves = 0
+
+        rows = {}
+        for key in self.__dirty:
+            obj = self.__objects.get(key)
+            if obj is not None:
+                rows.setdefault(obj.__class__.__name__, []).append(
+                    self.__row(obj))
+        removed = {}
+        for key in self.__deleted:
+            class_name, _, obj_id = key.partition(".")
+            removed.setdefault(class_name, []).append((obj_id,))
+
+        with self.__connection:
+            for class_name, values in rows.items():
+                columns = ("id",) + self.indexes.get(class_name, ()) + (
+                    "data",)
+                self.__table(class_name)
+                self.__connection.executemany(
+                    'INSERT OR REPLACE INTO "{}" ({}) VALUES ({})'.format(
+                        class_name, ", ".join(columns),
+                        ", ".join("?" * len(columns))), values)
+            for class_name, ids in removed.items():
+                if self.__table_exists(class_name):
+                    self.__connection.executemany(
+                        f'DELETE FROM "{class_name}" WHERE id = ?', ids)
+        self.__dirty.clear()
+        self.__deleted.clear()
+
+    def begin(self, flush_every=None):
+        """Starts a batch of saves (see FileStorage.begin)"""
+        self.__batch_depth += 1
+        if self.__batch_depth == 1:
+            self.__batch_saves = 0
+            self.__batch_flush_every = flush_every
+
+    def commit(self):
+        """Ends the batch started by begin(), saving once if save() was
+        called since the last save"""
+        if not self.__batch_depth:
+            return
+        self.__batch_depth -= 1
+        if not self.__batch_depth and self.__batch_saves:
+            self.__batch_saves = 0
+            self.save()
+
+    @contextlib.contextmanager
+    def batch(self, flush_every=None):
+        """Context manager running its block as one batch of saves"""
+        self.begin(flush_every)
+        try:
+            yield self
+        finally:
+            self.commit()
+
+    def reload(self, progress=None):
+        """Opens the tables of the database; their rows are read when first
+        used, so the instances in memory are kept and no row is read here
+
+        If given, progress is called once as progress(0, 0, total_rows).
+        """
+        self.__loaded = set()
+        self.__all_loaded = False
+        names = self.__table_names()
+        self.__tables.update(names)
+        if progress is not None:
+            total = sum(self.__connection.execute(
+                f'SELECT COUNT(*) FROM "{name}"').fetchone()[0]
+                for name in names)
+            progress(0, 0, total)
+
+    def hydrate_many(self, entries):
+        """Stores an instance for each (key, to_dict() dictionary) pair of
+        entries, without marking them dirty"""
+        for key, value in entries:
+            try:
+                cls = classes[value['__class__']]
+            except KeyError:
+                continue
+            self.__load(key, cls, value)
+
+    def close(self):
+        """Closes the database connection"""
+        self.__connection.close()
+
+    def __row(self, obj):
+        """Returns the column values of obj for its table"""
+        values = [obj.id]
+        for field in self.indexes.get(obj.__class__.__name__, ()):
+            value = getattr(obj, field, None)
+            values.append(value if isinstance(value, str) else None)
+        values.append(json.dumps(obj.to_dict()))
+        return values
+
+    def __table(self, class_name):
+        """Creates the table of class_name and its indexes if needed"""
+        if class_name in self.__tables:
+            return
+        fields = self.indexes.get(class_name, ())
+        columns = "".join(f", {field} TEXT" for field in fields)
+        self.__connection.execute(
+            f'CREATE TABLE IF NOT EXISTS "{class_name}" '
+            f'(id TEXT PRIMARY KEY{columns}, data TEXT NOT NULL)')
+        for field in fields:
+            self.__connection.execute(
+                f'CREATE INDEX IF NOT EXISTS "{class_name}_{field}" '
+                f'ON "{class_name}" ({field})')
+        self.__tables.add(class_name)
+
+    def __table_names(self):
+        """Returns the names of the tables of model classes"""
+        return [name for (name,) in self.__connection.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'table'")
+                if name in classes]
+
+    def __is_loaded(self, class_name):
+        """Returns whether every row of class_name was read"""
+        return self.__all_loaded or class_name in self.__loaded
+
+    def __load_class(self, class_name):
+        """Reads every row of class_name not in memory, once"""
+        if self.__is_loaded(class_name):
+            return
+        self.__load_rows(class_name, {})
+        self.__loaded.add(class_name)
+
+    def __load_rows(self, class_name, columns):
+        """Builds the instances of the rows of class_name whose columns
+        equal the given values, but for those in memory or destroyed"""
+        if class_name not in classes or not self.__table_exists(class_name):
+            return
+        cls = classes[class_name]
+        where = " AND ".join(f"{column} = ?" for column in columns)
+        for obj_id, data in self.__connection.execute(
+                f'SELECT id, data FROM "{class_name}"' +
+                (f" WHERE {where}" if where else ""),
+                tuple(columns.values())):
+            key = f"{class_name}.{obj_id}"
+            if key not in self.__objects and key not in self.__deleted:
+                self.__load(key, cls, json.loads(data))
+
+    def __table_exists(self, class_name):
+        """Returns True if the table of class_name exists"""
+        if class_name in self.__tables:
+            return True
+        return self.__connection.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?",
+            (class_name,)).fetchone() is not None
+
+    def __load(self, key, cls, value):
+        """Builds the instance of cls described by value under key"""
+        self.__objects[key] = cls.from_dict(value)
+        self.__dirty.discard(key)
+        self.__deleted.discard(key)
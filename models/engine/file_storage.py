@@ -2,66 +2,1502 @@
 """
 FileStorage module for serializing and deserializing instances to/from JSON
 """
+import atexit
+import contextlib
 import json
+import marshal
 import os
+import shutil
+import threading
+import time
+import warnings
+import weakref
+import zlib
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
 from datetime import datetime
+from models.base_model import classes
+from models.engine.locks import RWLock
+from models.engine.object_map import ObjectMap, indexes, name_of
+from models.engine.offset_index import OffsetIndex
+from models.engine.serializers import serializers
+
+
+class StaleStorageError(Exception):
+    """
+    Raised by save() in shared mode when another process changed the store
+    since this one last read or wrote it, and on_conflict is "refuse"
+    """
 
 
 class FileStorage:
     """
     FileStorage class for handling JSON serialization and deserialization
+
+    By default every save() rewrites the whole JSON file. With journal_mode
+    enabled, save() only appends one record per changed or destroyed object
+    to a journal file, and compact() folds the journal back into the
+    snapshot once it grows past journal_limit records.
+
+    The JSON text of every clean object is cached in __cache, so only the
+    objects marked dirty since the last save go through to_dict() again.
+
+    __objects keeps a bucket per class and the secondary indexes declared
+    in indexes, which back all(cls) and find().
+
+    format selects the snapshot format among models.engine.serializers:
+    "json" (file.json) or "binary" (file.hbnb).
+
+    With lazy_mode enabled, reload() only records where each object is
+    stored in the snapshot; an instance is built the first time all(),
+    find() or get() touches it. Once more than max_resident such instances
+    are loaded, the oldest clean ones are dropped again.
+
+    Snapshots are written to a temporary file and renamed into place, the
+    previous one being kept as <snapshot>.bak; reload() falls back to it if
+    the snapshot is torn. fsync sets when writes are flushed to disk:
+    "always", "batch" (at most once every fsync_interval seconds) or
+    "never" (left to the operating system).
+
+    Inside batch() (or between begin() and commit()), save() calls are
+    coalesced into one save when the batch ends, or one every flush_every
+    calls.
+
+    With async_mode enabled, save() returns at once and a background
+    writer thread saves on its own, at most flush_interval seconds later or
+    as soon as high_water objects are dirty; flush() waits for it, and
+    pending saves are flushed at interpreter exit. The writer only holds
+    __lock while copying the changed objects, so callers are not blocked
+    while it encodes and writes.
+
+    __lock is a readers-writer lock: lookups share it, changes to the
+    storage hold it alone, and __save_lock runs one save at a time. With
+    thread_safe enabled, all() returns a copy of __objects, which other
+    threads cannot change while it is iterated.
+
+    With shared enabled, several processes may use the same store: each
+    save holds an exclusive advisory lock on <snapshot>.lock (reload() and
+    refresh() a shared one), and first checks whether another process
+    saved since. If so, on_conflict decides: "merge" pulls their changes
+    in (see refresh()), keeping the objects changed here, while "refuse"
+    raises StaleStorageError.
+
+    With sharded enabled, the snapshot is split into one file per class in
+    the file.shards directory, or shard_partitions files per class
+    partitioned by id (e.g. file.shards/User.3.json). A save only rewrites
+    the shards holding objects changed since the last one, and reload()
+    decodes the shards in parallel; in lazy_mode, the shards of a class are
+    only loaded once all(), find() or get() asks for it.
+
+    With reload_workers above 1, reload() decodes in that many processes:
+    a JSON snapshot is split into chunks of whole entries (of at least
+    reload_chunk_size bytes), and shards are handed out one by one. The
+    workers send back the decoded entries marshalled, and the instances
+    are built here as each chunk comes in.
+
+    With indexed enabled as well as lazy_mode, every snapshot is written
+    with an index of the byte range of each object, <snapshot>.idx (see
+    OffsetIndex). reload() then maps the index instead of scanning the
+    snapshot, and get() finds an object through it, so opening the store
+    takes the same time however large it is. A snapshot without an index,
+    or whose index is stale (saved without indexed, or by another
+    process), is scanned once and the index written then.
     """
+    indexes = indexes
     __file_path = "file.json"
-    __objects = {}
+    __objects = ObjectMap(indexes)
+    __cache = {}
+    __dirty = set()
+    __deleted = set()
+    __journal_records = 0
+    __lazy = {}
+    __resident = {}
+    __evicted = weakref.WeakValueDictionary()
+    __loaded_format = "json"
+    __torn = False
+    __snapshot_id = None
+    __snapshot_fd = None
+    __journal_offset = 0
+    __unloaded = {}
+    __stale_shards = set()
+    __torn_shards = set()
+    __index = None
+    __listed = set()
+    __shadowed = set()
+    __synced_at = 0.0
+    # Batch state (depth, saves, flush_every) of each thread
+    __batches = threading.local()
+    __lock = RWLock()
+    __save_lock = threading.RLock()
+    __wake = threading.Condition()
+    __writer = None
+    __requested = 0
+    __completed = 0
+    __urgent = False
+    __error = None
+    __exit_flush = False
+    format = "json"
+    fsync = "batch"
+    fsync_interval = 1.0
+    journal_mode = False
+    journal_limit = 10000
+    progress_every = 10000
+    lazy_mode = False
+    max_resident = None
+    thread_safe = False
+    async_mode = False
+    flush_interval = 1.0
+    high_water = 1000
+    shared = False
+    on_conflict = "merge"
+    sharded = False
+    shard_partitions = 1
+    reload_workers = 1
+    reload_chunk_size = 4 * 1024 * 1024
+    indexed = False
+    stream_chunk = 1000
+
+    def all(self, cls=None):
+        """Returns the dictionary __objects, or a new dictionary of the
+        instances of cls (a class or class name) only
+
+        In thread_safe mode, a copy of __objects is returned as well, so
+        it can be iterated while other threads change the storage.
+        """
+        if cls is None:
+            if FileStorage.__unloaded:
+                with FileStorage.__lock.write():
+                    for class_name in list(FileStorage.__unloaded):
+                        self.__load_class(class_name)
+            if FileStorage.__index is not None:
+                with FileStorage.__lock.write():
+                    self.__list_index()
+            if FileStorage.__lazy:
+                with FileStorage.__lock.write():
+                    self.__materialize(
+                        entry for bucket in FileStorage.__lazy.values()
+                        for entry in bucket.items())
+            if not self.thread_safe:
+                return FileStorage.__objects
+            with FileStorage.__lock.read():
+                return dict(FileStorage.__objects)
+        class_name = name_of(cls)
+        self.__load_class(class_name)
+        with self.__access():
+            self.__materialize(
+                FileStorage.__lazy.get(class_name, {}).items())
+            objects = dict(FileStorage.__objects.bucket(class_name))
+            self.__evict()
+        return objects
+
+    def get(self, cls, id):
+        """Returns the instance of cls (a class or class name) with the
+        given id, or None"""
+        key = f"{name_of(cls)}.{id}"
+        if FileStorage.__unloaded:
+            self.__load_class(name_of(cls))
+        obj = FileStorage.__objects.get(key)
+        if (obj is not None and key not in FileStorage.__resident or
+                not FileStorage.__lazy and FileStorage.__index is None):
+            return obj
+        with FileStorage.__lock.write():
+            obj = FileStorage.__objects.get(key)
+            if obj is None:
+                offsets = FileStorage.__lazy.get(
+                    name_of(cls), {}).get(key)
+                if offsets is None:
+                    offsets = self.__index_get(key)
+                if offsets is None:
+                    return None
+                self.__materialize([(key, offsets)])
+                obj = FileStorage.__objects.get(key)
+                self.__evict()
+            elif key in FileStorage.__resident:
+                # Recently used instances are evicted last
+                FileStorage.__resident[key] = FileStorage.__resident.pop(key)
+        return obj
+
+    def find(self, cls, **criteria):
+        """Returns a dictionary of the instances of cls whose attributes
+        equal the given criteria, e.g. find(City, state_id=state.id)
+
+        The smallest matching secondary index narrows the candidates;
+        without one, only the bucket of cls is scanned.
+        """
+        class_name = name_of(cls)
+        self.__load_class(class_name)
+        with self.__access():
+            self.__materialize(
+                FileStorage.__lazy.get(class_name, {}).items())
+            candidates = None
+            for field, value in criteria.items():
+                hits = FileStorage.__objects.lookup(class_name, field, value)
+                if hits is not None and (candidates is None or
+                                         len(hits) < len(candidates)):
+                    candidates = hits
+            if candidates is None:
+                candidates = FileStorage.__objects.bucket(class_name)
+
+            objects = {key: obj for key, obj in candidates.items()
+                       if all(getattr(obj, field, None) == value
+                              for field, value in criteria.items())}
+            self.__evict()
+        return objects
+
+    def count(self, cls=None):
+        """Returns the number of instances of cls (a class or class name),
+        or of every class, without building the lazily loaded ones
+
+        The instances of a class are counted from its bucket and its lazy
+        offsets, plus, if it was not listed from the index yet, its keys in
+        the index that were neither taken from it nor destroyed.
+        """
+        if cls is None:
+            with FileStorage.__lock.write():
+                for class_name in list(FileStorage.__unloaded):
+                    self.__load_class(class_name)
+                self.__list_index()
+                return len(FileStorage.__objects) + sum(
+                    map(len, FileStorage.__lazy.values()))
+        class_name = name_of(cls)
+        if class_name in FileStorage.__unloaded:
+            self.__load_class(class_name)
+        with self.__access():
+            count = (len(FileStorage.__objects.bucket(class_name)) +
+                     len(FileStorage.__lazy.get(class_name, ())))
+            index = FileStorage.__index
+            if index is not None and class_name not in FileStorage.__listed:
+                prefix = class_name + "."
+                taken = {key for key in
+                         FileStorage.__shadowed | FileStorage.__deleted
+                         if key.startswith(prefix)}
+                count += index.count(prefix) - sum(
+                    1 for key in taken if index.get(key) is not None)
+        return count
+
+    def stream(self, cls=None):
+        """Yields the instances of cls (a class or class name), or of every
+        class, one at a time
+
+        Unlike all(), lazily loaded objects are built stream_chunk at a
+        time and evicted again past max_resident, so listing a large lazily
+        loaded store does not hold it in memory whole.
+        """
+        if cls is not None:
+            yield from self.__stream_class(name_of(cls))
+            return
+        if not (FileStorage.__unloaded or FileStorage.__lazy or
+                FileStorage.__index is not None):
+            yield from self.all().values()
+            return
+        with FileStorage.__lock.write():
+            for class_name in list(FileStorage.__unloaded):
+                self.__load_class(class_name)
+            self.__list_index()
+            names = dict.fromkeys(FileStorage.__objects.class_names())
+            names.update(dict.fromkeys(FileStorage.__lazy))
+        for class_name in names:
+            yield from self.__stream_class(class_name)
 
-    def all(self):
-        """Returns the dictionary __objects"""
-        return FileStorage.__objects
+    def import_file(self, cls, path):
+        """Stores an instance of cls (a class or class name) for each record
+        of the JSON Lines or CSV file at path, checked and converted to the
+        types the class declares, then saves once; returns the number of
+        records imported (see models.bulk)"""
+        from models import bulk
+        return bulk.import_file(self, cls, path)
+
+    def export_file(self, cls, path):
+        """Writes every instance of cls (a class or class name) to the JSON
+        Lines or CSV file at path, one at a time; returns the number of
+        records exported"""
+        from models import bulk
+        return bulk.export_file(self, cls, path)
 
     def new(self, obj):
         """Sets in __objects the obj with key <obj class name>.id"""
         key = f"{obj.__class__.__name__}.{obj.id}"
-        FileStorage.__objects[key] = obj
+        with FileStorage.__lock.write():
+            FileStorage.__objects[key] = obj
+            FileStorage.__cache.pop(key, None)
+            FileStorage.__resident.pop(key, None)
+            self.__lazy_pop(key)
+            FileStorage.__dirty.add(key)
+            FileStorage.__deleted.discard(key)
+
+    def mark_dirty(self, obj, name=None, old=None):
+        """Records obj as changed since the last save
+
+        BaseModel calls this on every attribute assignment, passing the
+        attribute name and its previous value so indexes can follow; code
+        that mutates an attribute in place (e.g. appending to a list) must
+        call it, or obj.save(), itself.
+        """
+        key = f"{obj.__class__.__name__}.{obj.id}"
+        if key not in FileStorage.__objects and not FileStorage.__lazy:
+            # Not stored (yet): nothing to track
+            return
+        with FileStorage.__lock.write():
+            if key not in FileStorage.__objects:
+                if self.__lazy_pop(key) is None:
+                    return
+                # An evicted instance the caller still holds
+                FileStorage.__evicted.pop(key, None)
+                FileStorage.__objects[key] = obj
+            FileStorage.__cache.pop(key, None)
+            FileStorage.__resident.pop(key, None)
+            FileStorage.__dirty.add(key)
+            if name is not None:
+                FileStorage.__objects.reindex(key, obj, name, old)
+
+    def delete(self, obj=None):
+        """Removes obj from __objects, if it is stored"""
+        if obj is None:
+            return
+        key = f"{obj.__class__.__name__}.{obj.id}"
+        with FileStorage.__lock.write():
+            if (FileStorage.__objects.pop(key, None) is not None or
+                    self.__lazy_pop(key) is not None):
+                FileStorage.__cache.pop(key, None)
+                FileStorage.__resident.pop(key, None)
+                FileStorage.__dirty.discard(key)
+                FileStorage.__deleted.add(key)
 
     def save(self):
-        """Serializes __objects to the JSON file (path: __file_path)"""
-        obj_dict = {}
-        for key, obj in FileStorage.__objects.items():
-            obj_dict[key] = obj.to_dict()
+        """Serializes __objects to the snapshot file (path: __file_path,
+        with the extension of the format)
+
+        In journal mode only the objects created, updated or destroyed since
+        the last save are appended to the journal. Inside a batch, the save
+        is deferred to the end of the batch. In async mode, the background
+        writer carries it out later (see flush()).
+        """
+        batch = self.__batch()
+        if batch.depth:
+            batch.saves += 1
+            if batch.flush_every is None or batch.saves < batch.flush_every:
+                return
+            batch.saves = 0
+
+        if self.async_mode:
+            self.__request_save()
+            return
+        self.__persist()
+
+    def flush(self):
+        """Waits until the background writer has carried out every save()
+        requested so far, re-raising the error of the last write if it
+        failed; does nothing outside async mode"""
+        with FileStorage.__wake:
+            target = FileStorage.__requested
+            if FileStorage.__completed < target:
+                FileStorage.__urgent = True
+                FileStorage.__wake.notify_all()
+            while (FileStorage.__completed < target and
+                   FileStorage.__writer is not None and
+                   FileStorage.__writer.is_alive()):
+                FileStorage.__wake.wait()
+            error, FileStorage.__error = FileStorage.__error, None
+        if error is not None:
+            raise error
+
+    def begin(self, flush_every=None):
+        """Starts a batch: save() calls are coalesced until the matching
+        commit(), except that every flush_every-th one is carried out.
+        Batches nest; only the outermost one saves. A batch only defers
+        the saves of the thread that started it."""
+        batch = self.__batch()
+        batch.depth += 1
+        if batch.depth == 1:
+            batch.saves = 0
+            batch.flush_every = flush_every
+
+    def commit(self):
+        """Ends the batch started by begin(), saving once if save() was
+        called since the last save"""
+        batch = self.__batch()
+        if not batch.depth:
+            return
+        batch.depth -= 1
+        if not batch.depth and batch.saves:
+            batch.saves = 0
+            self.save()
+
+    @contextlib.contextmanager
+    def batch(self, flush_every=None):
+        """Context manager running its block as one batch (see begin()),
+        e.g. with storage.batch(): ..."""
+        self.begin(flush_every)
+        try:
+            yield self
+        finally:
+            self.commit()
+
+    def compact(self):
+        """Writes a full snapshot of __objects and empties the journal
+
+        Clean objects are written straight from their cached payload, and
+        objects not loaded yet in lazy mode are copied from the previous
+        snapshot. It is written to a temporary file first, since the
+        previous snapshot is read while writing, then renamed into place;
+        the previous snapshot becomes the backup, unless it was torn.
+        """
+        with FileStorage.__save_lock, self.__store_lock():
+            self.__merge()
+            self.__compact()
+
+    def refresh(self):
+        """Pulls in the changes other processes saved since this one last
+        read or wrote the store, and returns how many records it applied
+
+        Only the journal records appended since are read, unless the
+        snapshot was rewritten, in which case it is read again in full.
+        Objects changed or destroyed here and not saved yet are left as
+        they are.
+        """
+        with FileStorage.__save_lock, self.__store_lock(exclusive=False):
+            with FileStorage.__lock.write():
+                return self.__refresh()
+
+    def __persist(self):
+        """Carries out a save: appends to the journal or compacts"""
+        if not self.journal_mode:
+            self.compact()
+            return
+        with FileStorage.__save_lock, self.__store_lock():
+            self.__merge()
+            self.__append()
+
+    @contextlib.contextmanager
+    def __store_lock(self, exclusive=True):
+        """Holds the advisory lock on <store>.lock in shared mode, where
+        fcntl is available; never nested, since flock() locks are per open
+        file"""
+        if not self.shared or fcntl is None:
+            yield
+            return
+        with open(self.__store_path() + ".lock", 'a') as f:
+            fcntl.flock(f.fileno(),
+                        fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            yield
+
+    def __changed(self):
+        """Returns whether another process saved since this one last read
+        or wrote the store: the snapshot was replaced, or the journal grew"""
+        version = self.__version(self.__store_path())
+        if version is not None and version != FileStorage.__snapshot_id:
+            return True
+        try:
+            size = os.path.getsize(self.__journal_path())
+        except OSError:
+            size = 0
+        return size > FileStorage.__journal_offset
+
+    def __merge(self):
+        """In shared mode, handles the changes other processes saved since
+        as on_conflict asks (under __save_lock and the store lock)"""
+        if not self.shared or not self.__changed():
+            return
+        if self.on_conflict == "refuse":
+            raise StaleStorageError(
+                f"{self.__store_path()} was changed by another process")
+        with FileStorage.__lock.write():
+            self.__refresh()
+
+    def __refresh(self):
+        """Carries out refresh() (under both locks)"""
+        skip = FileStorage.__dirty | FileStorage.__deleted
+        applied = 0
+        version = self.__version(self.__store_path())
+        if version is not None and version != FileStorage.__snapshot_id:
+            held = set(FileStorage.__objects)
+            for bucket in FileStorage.__lazy.values():
+                held.update(bucket)
+            FileStorage.__lazy = {}
+            FileStorage.__resident = {}
+            FileStorage.__evicted.clear()
+            self.__drop_index()
+            keys = self.__load_snapshot(None, skip)
+            for key in held - set(keys) - skip:
+                self.__forget(key)
+            applied = len(keys)
+            FileStorage.__journal_records = 0
+            FileStorage.__journal_offset = 0
+        return applied + self.__replay_journal(skip)
+
+    @staticmethod
+    def __batch():
+        """Returns the batch state of the calling thread"""
+        batch = FileStorage.__batches
+        if not hasattr(batch, "depth"):
+            batch.depth = 0
+            batch.saves = 0
+            batch.flush_every = None
+        return batch
+
+    def __request_save(self):
+        """Hands a save over to the background writer, starting it if
+        needed"""
+        with FileStorage.__wake:
+            FileStorage.__requested += 1
+            writer = FileStorage.__writer
+            if writer is None or not writer.is_alive():
+                writer = FileStorage.__writer = threading.Thread(
+                    target=self.__run_writer, name="FileStorage writer",
+                    daemon=True)
+                writer.start()
+                if not FileStorage.__exit_flush:
+                    FileStorage.__exit_flush = True
+                    atexit.register(self.__flush_at_exit)
+            FileStorage.__wake.notify_all()
+
+    def __run_writer(self):
+        """Body of the background writer: waits for requested saves, lets
+        them gather for up to flush_interval seconds (or until high_water
+        objects are dirty, or flush() is called), then saves once"""
+        wake = FileStorage.__wake
+        while True:
+            with wake:
+                while FileStorage.__completed == FileStorage.__requested:
+                    wake.wait()
+                deadline = time.monotonic() + self.flush_interval
+                while (not FileStorage.__urgent and
+                       len(FileStorage.__dirty) < self.high_water):
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    wake.wait(remaining)
+                target = FileStorage.__requested
+                FileStorage.__urgent = False
+            error = None
+            try:
+                self.__persist()
+            except Exception as e:
+                error = e
+            with wake:
+                FileStorage.__completed = target
+                FileStorage.__error = error
+                wake.notify_all()
+
+    def __flush_at_exit(self):
+        """Carries out pending saves and syncs them to disk at interpreter
+        exit"""
+        FileStorage.__synced_at = 0.0
+        fsync, FileStorage.fsync = FileStorage.fsync, "always"
+        try:
+            self.flush()
+        finally:
+            FileStorage.fsync = fsync
+
+    def __take_changes(self):
+        """Returns the dirty and deleted keys and starts new, empty sets
+        (under __lock)"""
+        dirty, deleted = FileStorage.__dirty, FileStorage.__deleted
+        FileStorage.__dirty, FileStorage.__deleted = set(), set()
+        return dirty, deleted
 
-        with open(FileStorage.__file_path, 'w', encoding='utf-8') as f:
-            json.dump(obj_dict, f)
+    def __restore_changes(self, dirty, deleted):
+        """Marks keys taken by __take_changes() as changed again, after a
+        failed write"""
+        with FileStorage.__lock.write():
+            FileStorage.__dirty |= {key for key in dirty
+                                    if key in FileStorage.__objects}
+            FileStorage.__deleted |= {
+                key for key in deleted if key not in FileStorage.__objects}
 
-    def reload(self):
-        """Deserializes the JSON file to __objects"""
-        if os.path.exists(FileStorage.__file_path):
+    def __keep_payloads(self, payloads, objects):
+        """Caches the payloads written for keys whose instance has not
+        changed since (under __lock)"""
+        for key, payload in payloads.items():
+            if (key not in FileStorage.__dirty and
+                    FileStorage.__objects.get(key) is objects[key]):
+                FileStorage.__cache[key] = payload
+
+    def __append(self):
+        """Appends a journal record per object changed or destroyed since
+        the last save, then compacts if the journal is full
+
+        The changed objects are copied (to_dict()) under __lock; encoding
+        and writing happen without it.
+        """
+        serializer = serializers[self.format]
+        with FileStorage.__lock.write():
+            dirty, deleted = self.__take_changes()
+            objects = {}
+            values = {}
+            for key in dirty:
+                obj = FileStorage.__objects.get(key)
+                if obj is not None:
+                    objects[key] = obj
+                    values[key] = obj.to_dict()
+        if not values and not deleted:
+            return
+
+        try:
+            payloads = {}
+            records = []
+            for key, value in values.items():
+                payload = payloads[key] = serializer.encode(value)
+                records.append('{"op": "put", "key": %s, "value": %s}'
+                               % (json.dumps(key),
+                                  serializer.to_json(payload)))
+            for key in deleted:
+                records.append(json.dumps({"op": "del", "key": key}))
+            with open(self.__journal_path(), 'ab') as f:
+                for record in records:
+                    f.write(record.encode('utf-8') + b"\n")
+                self.__sync(f)
+                end = f.tell()
+        except BaseException:
+            self.__restore_changes(dirty, deleted)
+            raise
+
+        with FileStorage.__lock.write():
+            self.__keep_payloads(payloads, objects)
+            FileStorage.__journal_records += len(records)
+            FileStorage.__journal_offset = end
+            if self.sharded:
+                FileStorage.__stale_shards.update(
+                    map(self.__shard_of, dirty | deleted))
+            full = FileStorage.__journal_records > self.journal_limit
+        if full:
+            self.__compact()
+
+    def __compact(self):
+        """Carries out compact() (under __save_lock and the store lock)
+
+        Under __lock, the order of the objects, their cached payloads and
+        a to_dict() copy of the others are taken; the new snapshot is then
+        encoded and written without it, and finally renamed into place
+        under __lock again, since lazy offsets must follow the file.
+        """
+        if self.sharded:
+            self.__compact_shards()
+            return
+        serializer = serializers[self.format]
+        with FileStorage.__lock.write():
+            if FileStorage.__loaded_format != self.format:
+                # Cached payloads and lazy offsets belong to the old format
+                self.all()
+                FileStorage.__cache = {}
+                FileStorage.__loaded_format = self.format
+            # Objects only found in the index are copied as well
+            self.__list_index()
+            dirty, deleted = self.__take_changes()
+            cache = FileStorage.__cache
+            entries = []
+            objects = {}
+            for key, obj in FileStorage.__objects.items():
+                payload = cache.get(key)
+                objects[key] = obj
+                entries.append((key, payload,
+                                obj.to_dict() if payload is None else None))
+            lazy = {class_name: dict(bucket)
+                    for class_name, bucket in FileStorage.__lazy.items()}
+            source = FileStorage.__snapshot_fd if lazy else None
+
+        path = self.__path()
+        payloads = {}
+        offsets = {}
+        try:
+            with open(path + ".tmp", 'wb') as f:
+                writer = serializer.writer(f)
+                for key, payload, value in entries:
+                    if payload is None:
+                        payload = payloads[key] = serializer.encode(value)
+                    offsets[key] = writer.write(key, payload)
+                if source is not None:
+                    for bucket in lazy.values():
+                        for key, (start, end) in bucket.items():
+                            offsets[key] = writer.write(
+                                key, os.pread(source, end - start, start))
+                writer.close()
+                synced = self.__sync(f)
+            if self.indexed and self.lazy_mode:
+                OffsetIndex.write(path + ".idx.tmp",
+                                  self.__version(path + ".tmp"), offsets)
+        except BaseException:
+            self.__restore_changes(dirty, deleted)
+            for tmp in (path + ".tmp", path + ".idx.tmp"):
+                if os.path.exists(tmp):
+                    os.remove(tmp)
+            raise
+
+        with FileStorage.__lock.write():
+            if os.path.exists(path) and not FileStorage.__torn:
+                self.__backup(path)
+            os.replace(path + ".tmp", path)
+            if os.path.exists(path + ".idx.tmp"):
+                os.replace(path + ".idx.tmp", path + ".idx")
+            FileStorage.__torn = False
+            FileStorage.__snapshot_id = self.__version(path)
+            self.__keep_snapshot(path if self.lazy_mode or lazy else None)
+            # Keep what is still valid: changes made meanwhile stay dirty
+            current = FileStorage.__objects
+            FileStorage.__cache = {
+                key: payload for key, payload in FileStorage.__cache.items()
+                if key in offsets and key in current}
+            self.__keep_payloads(payloads, objects)
+            FileStorage.__lazy = {
+                class_name: {key: offsets[key] for key in bucket
+                             if key in offsets}
+                for class_name, bucket in FileStorage.__lazy.items()}
+            if self.lazy_mode:
+                FileStorage.__resident = {
+                    key: offsets[key] for key in current
+                    if key in offsets and key not in FileStorage.__dirty}
+            else:
+                FileStorage.__resident = {}
+            if os.path.exists(self.__journal_path()):
+                os.remove(self.__journal_path())
+            FileStorage.__journal_records = 0
+            FileStorage.__journal_offset = 0
+            self.__evict()
+        if synced and self.fsync == "always":
+            self.__sync_directory(path)
+
+    def __compact_shards(self):
+        """Carries out compact() in the sharded layout: only the shards
+        holding objects changed since the last compaction are rewritten,
+        and those left empty are removed"""
+        serializer = serializers[self.format]
+        with FileStorage.__lock.write():
+            if FileStorage.__loaded_format != self.format:
+                # Every shard is rewritten in the new format
+                self.all()
+                FileStorage.__cache = {}
+                FileStorage.__loaded_format = self.format
+                FileStorage.__stale_shards.update(
+                    self.__shard_of(key) for key in FileStorage.__objects)
+            elif not os.path.isdir(self.__store_path()):
+                # Switched to the sharded layout: write every shard
+                self.all()
+                FileStorage.__stale_shards.update(
+                    self.__shard_of(key) for key in FileStorage.__objects)
+            shards = FileStorage.__stale_shards | {
+                self.__shard_of(key)
+                for key in FileStorage.__dirty | FileStorage.__deleted}
+            class_names = {shard.partition(".")[0] for shard in shards}
+            for class_name in class_names:
+                self.__load_class(class_name)
+            dirty, deleted = self.__take_changes()
+            FileStorage.__stale_shards = set()
+            cache = FileStorage.__cache
+            entries = {shard: [] for shard in shards}
+            objects = {}
+            for class_name in class_names:
+                bucket = FileStorage.__objects.bucket(class_name)
+                for key, obj in bucket.items():
+                    shard_entries = entries.get(self.__shard_of(key))
+                    if shard_entries is None:
+                        continue
+                    payload = cache.get(key)
+                    objects[key] = obj
+                    shard_entries.append(
+                        (key, payload,
+                         obj.to_dict() if payload is None else None))
+
+        directory = self.__store_path()
+        payloads = {}
+        synced = False
+        try:
+            os.makedirs(directory, exist_ok=True)
+            for shard, shard_entries in entries.items():
+                if not shard_entries:
+                    continue
+                with open(self.__shard_path(shard) + ".tmp", 'wb') as f:
+                    writer = serializer.writer(f)
+                    for key, payload, value in shard_entries:
+                        if payload is None:
+                            payload = payloads[key] = serializer.encode(value)
+                        writer.write(key, payload)
+                    writer.close()
+                    synced = self.__sync(f) or synced
+        except BaseException:
+            self.__restore_changes(dirty, deleted)
+            with FileStorage.__lock.write():
+                FileStorage.__stale_shards |= shards
+            for shard in shards:
+                if os.path.exists(self.__shard_path(shard) + ".tmp"):
+                    os.remove(self.__shard_path(shard) + ".tmp")
+            raise
+
+        with FileStorage.__lock.write():
+            for shard, shard_entries in entries.items():
+                path = self.__shard_path(shard)
+                if (os.path.exists(path) and
+                        shard not in FileStorage.__torn_shards):
+                    self.__backup(path)
+                if shard_entries:
+                    os.replace(path + ".tmp", path)
+                elif os.path.exists(path):
+                    os.remove(path)
+            FileStorage.__torn_shards -= shards
+            self.__keep_payloads(payloads, objects)
+            if os.path.exists(self.__journal_path()):
+                os.remove(self.__journal_path())
+            FileStorage.__journal_records = 0
+            FileStorage.__journal_offset = 0
+            FileStorage.__snapshot_id = self.__version(directory)
+        if synced and self.fsync == "always":
+            self.__sync_directory(os.path.join(directory, ""))
+
+    def reload(self, progress=None):
+        """Deserializes the snapshot file to __objects, then replays the
+        journal on top of it
+
+        The file is streamed one entry at a time, each instance being built
+        as soon as its entry is parsed. If given, progress is called every
+        progress_every objects and once at the end as
+        progress(objects_loaded, bytes_read, total_bytes).
+
+        If the snapshot is torn, the objects it loaded are dropped again
+        and the backup is loaded instead, with a RuntimeWarning.
+        """
+        with FileStorage.__save_lock, self.__store_lock(exclusive=False):
+            with FileStorage.__lock.write():
+                self.__reload(progress)
+
+    def __reload(self, progress):
+        """Carries out reload() (under both locks)"""
+        if FileStorage.__loaded_format != self.format:
+            FileStorage.__cache = {}
+        FileStorage.__lazy = {}
+        FileStorage.__resident = {}
+        FileStorage.__evicted.clear()
+        FileStorage.__unloaded = {}
+        FileStorage.__stale_shards = set()
+        self.__drop_index()
+        FileStorage.__loaded_format = self.format
+        self.__load_snapshot(progress)
+        FileStorage.__journal_records = 0
+        FileStorage.__journal_offset = 0
+        self.__replay_journal()
+
+    def __load_snapshot(self, progress, skip=()):
+        """Loads the snapshot, or its backup if it is torn, leaving the
+        keys in skip alone; returns the keys read"""
+        if self.sharded:
+            return self.__load_shards(progress, skip)
+        return self.__load_file(progress, skip, self.lazy_mode)
+
+    def __load_file(self, progress, skip, lazy_mode):
+        """Carries out __load_snapshot() in the single file layout"""
+        FileStorage.__torn = False
+        path = self.__path()
+        if self.indexed and lazy_mode and self.__open_index(path):
+            return []
+        keys = []
+        # Offsets of every entry, for the index missing or stale
+        offsets = {} if self.indexed and lazy_mode else None
+        try:
+            if not self.__read_chunks(path, keys, progress, lazy_mode, skip):
+                self.__read_snapshot(path, keys, progress, lazy_mode, skip,
+                                     offsets)
+            if offsets:
+                self.__write_index(path, offsets)
+        except FileNotFoundError:
+            FileStorage.__snapshot_id = None
+            self.__keep_snapshot(None)
+        except ValueError as e:
+            for key in keys:
+                if key not in skip:
+                    self.__forget(key)
+            FileStorage.__lazy = {}
+            FileStorage.__torn = True
+            backup = path + ".bak"
+            warnings.warn(f"{path} is damaged ({e})" + (
+                f", loading {backup}" if os.path.exists(backup) else ""),
+                RuntimeWarning)
+            keys = []
             try:
-                with open(FileStorage.__file_path, 'r', encoding='utf-8') as f:
-                    obj_dict = json.load(f)
-
-                for key, value in obj_dict.items():
-                    class_name = value['__class__']
-                    # Import the class dynamically
-                    if class_name == 'BaseModel':
-                        from models.base_model import BaseModel
-                        FileStorage.__objects[key] = BaseModel(**value)
-                    elif class_name == 'User':
-                        from models.user import User
-                        FileStorage.__objects[key] = User(**value)
-                    elif class_name == 'State':
-                        from models.state import State
-                        FileStorage.__objects[key] = State(**value)
-                    elif class_name == 'City':
-                        from models.city import City
-                        FileStorage.__objects[key] = City(**value)
-                    elif class_name == 'Amenity':
-                        from models.amenity import Amenity
-                        FileStorage.__objects[key] = Amenity(**value)
-                    elif class_name == 'Place':
-                        from models.place import Place
-                        FileStorage.__objects[key] = Place(**value)
-                    elif class_name == 'Review':
-                        from models.review import Review
-                        FileStorage.__objects[key] = Review(**value)
-            except (FileNotFoundError, json.JSONDecodeError):
+                # Offsets in lazy mode would point into the backup
+                self.__read_snapshot(backup, keys, progress, False, skip)
+            except (FileNotFoundError, ValueError):
                 pass
+            FileStorage.__snapshot_id = self.__version(path)
+            self.__keep_snapshot(None)
+        return keys
+
+    def __replay_journal(self, skip=()):
+        """Applies the journal records past __journal_offset, leaving the
+        keys in skip alone; returns how many records it applied"""
+        try:
+            f = open(self.__journal_path(), 'rb')
+        except FileNotFoundError:
+            return 0
+        applied = 0
+        with f:
+            f.seek(FileStorage.__journal_offset)
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # A torn trailing record from an interrupted append
+                    break
+                FileStorage.__journal_offset += len(line)
+                FileStorage.__journal_records += 1
+                key = record["key"]
+                if key in skip:
+                    continue
+                self.__lazy_pop(key)
+                if record["op"] == "put":
+                    self.__load(key, record["value"])
+                else:
+                    self.__forget(key)
+                if self.sharded:
+                    # Not in its shard yet
+                    FileStorage.__stale_shards.add(self.__shard_of(key))
+                applied += 1
+        return applied
+
+    def __load_shards(self, progress, skip=()):
+        """Carries out __load_snapshot() in the sharded layout; in lazy
+        mode, the shards are only listed, and each class is loaded on first
+        access"""
+        directory = self.__store_path()
+        extension = serializers[self.format].extension
+        FileStorage.__unloaded = {}
+        FileStorage.__torn_shards = set()
+        try:
+            names = sorted(os.listdir(directory))
+        except FileNotFoundError:
+            # A store saved before sharding: split up on the next save
+            keys = self.__load_file(progress, skip, False)
+            FileStorage.__stale_shards.update(map(self.__shard_of, keys))
+            FileStorage.__snapshot_id = None
+            return keys
+        FileStorage.__snapshot_id = self.__version(directory)
+        shards = [shard for shard, ext in map(os.path.splitext, names)
+                  if ext == extension]
+        if not self.lazy_mode:
+            return self.__read_shards(shards, progress, skip)
+        for shard in shards:
+            FileStorage.__unloaded.setdefault(
+                shard.partition(".")[0], []).append(shard)
+        return []
+
+    def __stream_class(self, class_name):
+        """Yields the instances of class_name, building the lazily loaded
+        ones stream_chunk at a time"""
+        self.__load_class(class_name)
+        with self.__access():
+            built = list(FileStorage.__objects.bucket(class_name).values())
+            pending = list(FileStorage.__lazy.get(class_name, {}).items())
+        yield from built
+        for i in range(0, len(pending), self.stream_chunk):
+            entries = pending[i:i + self.stream_chunk]
+            with FileStorage.__lock.write():
+                self.__materialize(entries)
+                objects = [FileStorage.__objects.get(key)
+                           for key, offsets in entries]
+                self.__evict()
+            yield from (obj for obj in objects if obj is not None)
+
+    def __load_class(self, class_name):
+        """Loads the shards of class_name that lazy mode left unloaded, or
+        lists its objects from the index"""
+        if class_name in FileStorage.__unloaded:
+            with FileStorage.__lock.write():
+                shards = FileStorage.__unloaded.pop(class_name, None)
+                if shards is not None:
+                    self.__read_shards(shards, None, FileStorage.__dirty |
+                                       FileStorage.__deleted)
+        if (FileStorage.__index is not None and
+                class_name not in FileStorage.__listed):
+            with FileStorage.__lock.write():
+                self.__list_index(class_name)
+
+    def __open_index(self, path):
+        """Maps the index of the snapshot at path in place of reading the
+        snapshot, if there is one matching it; returns whether it did"""
+        try:
+            index = OffsetIndex(path + ".idx")
+        except (OSError, ValueError):
+            return False
+        try:
+            if index.version != self.__version(path):
+                raise ValueError("stale index")
+            with open(path, 'rb') as f:
+                # Whatever payloads read by offset need, e.g. layouts
+                serializers[self.format].prepare(f)
+        except (OSError, ValueError):
+            index.close()
+            return False
+        FileStorage.__index = index
+        FileStorage.__snapshot_id = index.version
+        self.__keep_snapshot(path)
+        return True
+
+    @staticmethod
+    def __write_index(path, offsets):
+        """Writes the index of the snapshot at path just read, whose
+        offsets are given, through a temporary file; a store that cannot
+        be written to is left without one"""
+        tmp = f"{path}.idx.{os.getpid()}.tmp"
+        try:
+            OffsetIndex.write(tmp, FileStorage.__snapshot_id, offsets)
+            os.replace(tmp, path + ".idx")
+        except OSError:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+
+    def __drop_index(self):
+        """Unmaps the index, forgetting what it told apart"""
+        if FileStorage.__index is not None:
+            FileStorage.__index.close()
+        FileStorage.__index = None
+        FileStorage.__listed = set()
+        FileStorage.__shadowed = set()
+
+    def __list_index(self, class_name=None):
+        """Records the offsets of the objects of class_name (by default,
+        of every class) found in the index as lazily loaded, except those
+        already built, changed or destroyed (under __lock)"""
+        index = FileStorage.__index
+        if index is None or class_name in FileStorage.__listed:
+            return
+        lazy = FileStorage.__lazy
+        skip = FileStorage.__shadowed
+        for key, offsets in index.items(
+                "" if class_name is None else class_name + "."):
+            if (key in skip or key in FileStorage.__objects or
+                    key in FileStorage.__deleted):
+                continue
+            bucket_name = key.partition(".")[0]
+            bucket = lazy.get(bucket_name)
+            if bucket is None:
+                bucket = lazy[bucket_name] = {}
+            bucket.setdefault(key, offsets)
+        if class_name is None:
+            self.__drop_index()
+        else:
+            FileStorage.__listed.add(class_name)
+
+    def __index_get(self, key):
+        """Returns the offsets of key from the index, if its class was not
+        listed yet and it was not taken from the index before"""
+        index = FileStorage.__index
+        if (index is None or key in FileStorage.__shadowed or
+                key in FileStorage.__deleted or
+                key.partition(".")[0] in FileStorage.__listed):
+            return None
+        return index.get(key)
+
+    def __read_shards(self, shards, progress=None, skip=()):
+        """Loads the given shards, leaving the keys in skip alone, and
+        returns the keys read; shards are read and decoded in parallel,
+        and the instances built as each one comes in"""
+        serializer = serializers[self.format]
+        paths = [self.__shard_path(shard) for shard in shards]
+        total = sum(os.path.getsize(path) for path in paths
+                    if os.path.exists(path))
+        # Imported here rather than at startup, which rarely needs it
+        import concurrent.futures
+        keys = []
+        loaded = read = 0
+        context = self.__pool_context()
+        if context is not None and len(paths) > 1:
+            pool = concurrent.futures.ProcessPoolExecutor(
+                self.reload_workers, mp_context=context)
+            futures = [pool.submit(_decode_file, self.format, path)
+                       for path in paths]
+            results = (self.__shard_result(serializer, path, future)
+                       for path, future in zip(paths, futures))
+        else:
+            pool = concurrent.futures.ThreadPoolExecutor()
+            results = pool.map(self.__decode_shard,
+                               [serializer] * len(paths), paths)
+        with pool:
+            for shard, (entries, size, torn) in zip(shards, results):
+                if torn:
+                    FileStorage.__torn_shards.add(shard)
+                for key, value in entries:
+                    keys.append(key)
+                    if self.__shard_of(key) != shard:
+                        # Written with another shard_partitions
+                        FileStorage.__stale_shards.update(
+                            (shard, self.__shard_of(key)))
+                    if key not in skip:
+                        self.__load(key, value)
+                loaded += len(entries)
+                read += size
+                if progress is not None:
+                    progress(loaded, read, total)
+        return keys
+
+    @staticmethod
+    def __shard_result(serializer, path, future):
+        """Returns what __decode_shard() would for the shard at path, from
+        the future of a worker decoding it; a shard the worker could not
+        read is read here instead, from its backup if it is torn"""
+        try:
+            payload, size = future.result()
+        except (OSError, ValueError):
+            return FileStorage.__decode_shard(serializer, path)
+        return marshal.loads(payload), size, False
+
+    @staticmethod
+    def __decode_shard(serializer, path):
+        """Returns the (key, value) entries of the shard at path, its size,
+        and whether it is torn, in which case its backup is read instead"""
+        try:
+            with open(path, 'rb') as f:
+                return ([(key, value) for key, value, start, end
+                         in serializer.entries(f)],
+                        os.fstat(f.fileno()).st_size, False)
+        except FileNotFoundError:
+            return [], 0, False
+        except ValueError as e:
+            backup = path + ".bak"
+            warnings.warn(f"{path} is damaged ({e})" + (
+                f", loading {backup}" if os.path.exists(backup) else ""),
+                RuntimeWarning)
+        try:
+            with open(backup, 'rb') as f:
+                return ([(key, value) for key, value, start, end
+                         in serializer.entries(f)],
+                        os.fstat(f.fileno()).st_size, True)
+        except (FileNotFoundError, ValueError):
+            return [], 0, True
+
+    def __read_chunks(self, path, keys, progress, lazy_mode, skip):
+        """Loads the JSON snapshot at path in chunks decoded by
+        reload_workers processes, appending the keys read to keys; returns
+        False, having loaded nothing, if it must be read in one go instead
+        (one worker, lazy mode, a small or unsplittable file, or a chunk
+        failing to decode, which the serial reader reports)"""
+        context = self.__pool_context()
+        if (context is None or lazy_mode or self.format != "json" or
+                not os.path.exists(path)):
+            return False
+        size = os.path.getsize(path)
+        ranges = self.__chunks(path, size, min(
+            self.reload_workers * 4, size // self.reload_chunk_size))
+        if len(ranges) < 2:
+            return False
+        import concurrent.futures
+        loaded = 0
+        try:
+            with concurrent.futures.ProcessPoolExecutor(
+                    self.reload_workers, mp_context=context) as pool:
+                futures = [pool.submit(_decode_chunk, path, start, end,
+                                       end == size)
+                           for start, end in ranges]
+                for (start, end), future in zip(ranges, futures):
+                    entries = marshal.loads(future.result())
+                    for key, value in entries:
+                        keys.append(key)
+                        if key not in skip:
+                            self.__load(key, value)
+                    loaded += len(entries)
+                    if progress is not None:
+                        progress(loaded, end, size)
+        except ValueError:
+            for key in keys:
+                if key not in skip:
+                    self.__forget(key)
+            del keys[:]
+            return False
+        FileStorage.__snapshot_id = self.__version(path)
+        self.__keep_snapshot(None)
+        return True
+
+    @staticmethod
+    def __chunks(path, size, count):
+        """Returns the (start, end) byte ranges splitting the JSON snapshot
+        at path into about count chunks, each made of whole entries: they
+        begin at a line holding a key, right after the "}," ending an
+        entry"""
+        bounds = [0]
+        with open(path, 'rb') as f:
+            for n in range(1, count):
+                f.seek(max(size * n // count, bounds[-1]))
+                f.readline()
+                while True:
+                    start = f.tell()
+                    line = f.readline()
+                    if not line:
+                        break
+                    if line.startswith(b'"'):
+                        f.seek(start - 3)
+                        if f.read(3) == b"},\n":
+                            bounds.append(start)
+                            break
+                        f.readline()
+                if not line:
+                    break
+        bounds.append(size)
+        return list(zip(bounds, bounds[1:]))
+
+    def __pool_context(self):
+        """Returns the multiprocessing context of the reload workers, or
+        None to decode here; workers are forked, since importing models
+        afresh would reload the store in each of them"""
+        if self.reload_workers <= 1:
+            return None
+        import multiprocessing
+        if "fork" not in multiprocessing.get_all_start_methods():
+            return None
+        return multiprocessing.get_context("fork")
+
+    def __read_snapshot(self, path, keys, progress, lazy_mode, skip=(),
+                        offsets=None):
+        """Loads the snapshot at path, appending the key of each entry read
+        to keys, and its byte range to the dictionary offsets if given; in
+        lazy mode, only records the offsets of the entries, without
+        decoding them"""
+        serializer = serializers[self.format]
+        lazy = FileStorage.__lazy
+        loaded = 0
+        with open(path, 'rb') as f:
+            total = os.fstat(f.fileno()).st_size
+            # Lazy mode only needs the byte range of each value
+            for key, value, start, end in serializer.entries(
+                    f, not lazy_mode):
+                keys.append(key)
+                if offsets is not None:
+                    offsets[key] = (start, end)
+                if key in skip:
+                    # Changed in memory since: left as it is
+                    pass
+                elif lazy_mode:
+                    self.__forget(key)
+                    class_name = key.partition(".")[0]
+                    bucket = lazy.get(class_name)
+                    if bucket is None:
+                        bucket = lazy[class_name] = {}
+                    bucket[key] = (start, end)
+                else:
+                    self.__load(key, value)
+                loaded += 1
+                if (progress is not None and
+                        loaded % self.progress_every == 0):
+                    progress(loaded, f.tell(), total)
+            if progress is not None:
+                progress(loaded, f.tell(), total)
+            FileStorage.__snapshot_id = self.__version(f.fileno())
+            self.__keep_snapshot(f.fileno() if lazy_mode else None)
+
+    def hydrate_many(self, entries):
+        """Stores an instance for each (key, to_dict() dictionary) pair of
+        entries, as read back from a file: each instance is built with
+        from_dict() and registered once, and is not marked dirty"""
+        with FileStorage.__lock.write():
+            for key, value in entries:
+                self.__load(key, value)
+
+    def __path(self, name=None):
+        """Returns the path of the snapshot in the format called name (by
+        default, format)"""
+        extension = serializers[name or self.format].extension
+        return os.path.splitext(FileStorage.__file_path)[0] + extension
+
+    def __journal_path(self):
+        """Returns the path of the journal of the current snapshot"""
+        return self.__store_path() + ".journal"
+
+    def __store_path(self):
+        """Returns the path of the snapshot, or of the directory of the
+        shards in the sharded layout"""
+        if self.sharded:
+            return os.path.splitext(FileStorage.__file_path)[0] + ".shards"
+        return self.__path()
+
+    def __shard_of(self, key):
+        """Returns the name of the shard holding key: its class name, and
+        the partition of its id if there are several"""
+        class_name, _, id = key.partition(".")
+        if self.shard_partitions <= 1:
+            return class_name
+        partition = zlib.crc32(id.encode('utf-8')) % self.shard_partitions
+        return f"{class_name}.{partition}"
+
+    def __shard_path(self, shard):
+        """Returns the path of the shard called shard"""
+        return os.path.join(self.__store_path(),
+                            shard + serializers[self.format].extension)
+
+    def __sync(self, f):
+        """Flushes the file f to disk as the fsync policy asks; returns
+        True if it did"""
+        if self.fsync == "never":
+            return False
+        now = time.monotonic()
+        if (self.fsync == "batch" and
+                now - FileStorage.__synced_at < self.fsync_interval):
+            return False
+        f.flush()
+        os.fsync(f.fileno())
+        FileStorage.__synced_at = now
+        return True
+
+    @staticmethod
+    def __sync_directory(path):
+        """Flushes the directory entry of path to disk, where supported"""
+        try:
+            fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+        except OSError:
+            return
+        try:
+            os.fsync(fd)
+        except OSError:
+            pass
+        finally:
+            os.close(fd)
+
+    @staticmethod
+    def __backup(path):
+        """Makes the snapshot at path its backup, path.bak, keeping path in
+        place until the new snapshot replaces it"""
+        backup = path + ".bak"
+        if os.path.exists(backup + ".tmp"):
+            os.remove(backup + ".tmp")
+        try:
+            os.link(path, backup + ".tmp")
+        except OSError:
+            shutil.copyfile(path, backup + ".tmp")
+        os.replace(backup + ".tmp", backup)
+
+    @staticmethod
+    def __version(file):
+        """Returns what tells one version of a file (a path or a file
+        descriptor) from the next, or None if there is no such file"""
+        try:
+            st = os.stat(file)
+        except FileNotFoundError:
+            return None
+        return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+    @staticmethod
+    def __keep_snapshot(file):
+        """Keeps the snapshot file (a path or a file descriptor) open for
+        reading lazily loaded objects, closing the previous one; file may
+        be None. Reading through a descriptor of its own keeps the offsets
+        valid after another process replaces the snapshot."""
+        previous = FileStorage.__snapshot_fd
+        if isinstance(file, int):
+            FileStorage.__snapshot_fd = os.dup(file)
+        elif file is not None:
+            FileStorage.__snapshot_fd = os.open(file, os.O_RDONLY)
+        else:
+            FileStorage.__snapshot_fd = None
+        if previous is not None:
+            os.close(previous)
+
+    def __materialize(self, entries):
+        """Builds the lazily loaded objects of entries, an iterable of
+        (key, (start, end)) pairs; those another thread built first are
+        skipped"""
+        keys = [key for key, offsets in entries]
+        if not keys:
+            return
+        with FileStorage.__lock.write():
+            fd = FileStorage.__snapshot_fd
+            if fd is None:
+                FileStorage.__lazy = {}
+                return
+            serializer = serializers[FileStorage.__loaded_format]
+            for key in keys:
+                offsets = self.__lazy_pop(key)
+                if offsets is None:
+                    continue
+                start, end = offsets
+                obj = FileStorage.__evicted.pop(key, None)
+                if obj is not None:
+                    # Evicted while still held by the caller: bring back
+                    # that instance rather than a second copy of it
+                    FileStorage.__objects[key] = obj
+                    FileStorage.__resident[key] = offsets
+                    continue
+                payload = os.pread(fd, end - start, start)
+                self.__load(key, serializer.decode(payload))
+                FileStorage.__cache[key] = payload
+                FileStorage.__resident[key] = (start, end)
+
+    def __evict(self):
+        """Drops the oldest clean lazily loaded objects past max_resident"""
+        if self.max_resident is None or not self.lazy_mode:
+            return
+        resident = FileStorage.__resident
+        while len(resident) > self.max_resident:
+            key = next(iter(resident))
+            offsets = resident.pop(key)
+            if key in FileStorage.__dirty:
+                continue
+            obj = FileStorage.__objects.pop(key, None)
+            if obj is None:
+                continue
+            FileStorage.__cache.pop(key, None)
+            FileStorage.__evicted[key] = obj
+            class_name = key.partition(".")[0]
+            FileStorage.__lazy.setdefault(class_name, {})[key] = offsets
+
+    def __access(self):
+        """Returns the mode of __lock to hold while reading __objects:
+        writing if lazily loaded objects may be built or evicted"""
+        if (FileStorage.__lazy or self.lazy_mode or
+                FileStorage.__index is not None):
+            return FileStorage.__lock.write()
+        return FileStorage.__lock.read()
+
+    def __lazy_pop(self, key):
+        """Forgets the snapshot offsets of key, returning them or None"""
+        bucket = FileStorage.__lazy.get(key.partition(".")[0])
+        offsets = bucket.pop(key, None) if bucket else None
+        if offsets is None and FileStorage.__index is not None:
+            offsets = self.__index_get(key)
+            if offsets is not None:
+                FileStorage.__shadowed.add(key)
+        return offsets
+
+    def __load(self, key, value):
+        """Builds the instance described by value and stores it under key"""
+        try:
+            cls = classes[value['__class__']]
+        except KeyError:
+            return
+        FileStorage.__objects[key] = cls.from_dict(value)
+        FileStorage.__cache.pop(key, None)
+        FileStorage.__resident.pop(key, None)
+        FileStorage.__dirty.discard(key)
+        FileStorage.__deleted.discard(key)
+
+    def __forget(self, key):
+        """Drops the in-memory instance stored under key, as a file being
+        loaded no longer holds it"""
+        FileStorage.__objects.pop(key, None)
+        FileStorage.__cache.pop(key, None)
+        FileStorage.__resident.pop(key, None)
+        FileStorage.__dirty.discard(key)
+        FileStorage.__deleted.discard(key)
+
+
+def _decode_file(name, path):
+    """Returns the (key, value) entries of the snapshot file at path, in the
+    format called name, marshalled, and its size (run by reload workers)"""
+    serializer = serializers[name]
+    with open(path, 'rb') as f:
+        entries = [(key, value) for key, value, start, end
+                   in serializer.entries(f)]
+        return marshal.dumps(entries), os.fstat(f.fileno()).st_size
+
+
+def _decode_chunk(path, start, end, last):
+    """Returns the (key, value) entries of the JSON snapshot at path between
+    the byte offsets start and end, marshalled (run by reload workers)"""
+    with open(path, 'rb') as f:
+        f.seek(start)
+        data = f.read(end - start).strip()
+    if start == 0:
+        if not data.startswith(b"{"):
+            raise ValueError("not a JSON snapshot")
+        data = data[1:]
+    if last:
+        if not data.endswith(b"}"):
+            raise ValueError("truncated snapshot")
+        data = data[:-1]
+    return marshal.dumps(list(json.loads(b"{" + data.rstrip(b",") + b"}")
+                              .items()))
@@ -0,0 +1,163 @@
+#!/usr/bin/python3
+"""
+Streaming reader for the top-level entries of a JSON object, so a large
+storage file can be loaded without parsing it into one dict first
+"""
+import codecs
+import json
+import re
+
+WHITESPACE = re.compile(r'[ \t\n\r]*')
+DELIMITERS = frozenset(' \t\n\r,]}')
+# A run of anything but brackets, braces and strings cut by the end of
+# the buffer: what lies between two of them in a value being skipped
+SKIP = re.compile(r'(?:[^"{}\[\]]+|"[^"\\]*(?:\\.[^"\\]*)*")*')
+
+
+class ObjectReader:
+    """
+    Iterates over the (key, value) entries of the JSON object stored in a
+    binary file, reading it chunk_size bytes at a time. Only the entry
+    being decoded is held in memory besides the current chunk. entries()
+    also gives the byte range of each value in the file, so it can be read
+    back on its own later, and can skip over the values, only checking
+    that their braces and brackets balance, when their range is all that
+    is needed.
+
+    Raises json.JSONDecodeError if the file is not a valid JSON object.
+    """
+    chunk_size = 1 << 16
+    __decoder = json.JSONDecoder()
+
+    def __init__(self, f, chunk_size=None):
+        """Initialize a reader over the binary file f"""
+        self.__file = f
+        self.__decode = codecs.getincrementaldecoder('utf-8')().decode
+        self.__buf = ''
+        self.__pos = 0
+        self.__eof = False
+        # Byte offset in the file of the character at __buf[__mark]
+        self.__mark = 0
+        self.__mark_offset = 0
+        if chunk_size is not None:
+            self.chunk_size = chunk_size
+        self.bytes_read = 0
+
+    def __iter__(self):
+        """Yields each (key, value) pair of the object in file order"""
+        for key, value, start, end in self.entries():
+            yield key, value
+
+    def entries(self, decode=True):
+        """Yields (key, value, start, end) for each entry of the object in
+        file order, the value being stored at bytes [start, end) of the
+        file; without decode, objects and arrays are skipped over, and
+        given as None"""
+        if self.__peek() != '{':
+            self.__error("Expecting '{'")
+        self.__pos += 1
+        if self.__peek() == '}':
+            self.__pos += 1
+        else:
+            while True:
+                key = self.__value()
+                if not isinstance(key, str):
+                    self.__error("Expecting property name")
+                if self.__peek() != ':':
+                    self.__error("Expecting ':' delimiter")
+                self.__pos += 1
+                char = self.__peek()
+                start = self.__offset()
+                if decode or char not in ('{', '['):
+                    value = self.__value()
+                else:
+                    value = self.__skip()
+                yield key, value, start, self.__offset()
+
+                char = self.__peek()
+                self.__pos += 1
+                if char == '}':
+                    break
+                if char != ',':
+                    self.__error("Expecting ',' delimiter")
+                self.__peek()
+        if self.__peek() != '':
+            self.__error("Extra data")
+
+    def __fill(self, size):
+        """Appends at least size more bytes of the file to the buffer"""
+        data = self.__file.read(max(size, self.chunk_size))
+        self.bytes_read += len(data)
+        self.__eof = not data
+        self.__offset()
+        self.__buf = self.__buf[self.__pos:] + self.__decode(
+            data, final=self.__eof)
+        self.__pos = self.__mark = 0
+
+    def __offset(self):
+        """Returns the byte offset in the file of the current position"""
+        self.__mark_offset += len(
+            self.__buf[self.__mark:self.__pos].encode('utf-8'))
+        self.__mark = self.__pos
+        return self.__mark_offset
+
+    def __peek(self):
+        """Skips whitespace and returns the next character, or '' at the
+        end of the file"""
+        while True:
+            self.__pos = WHITESPACE.match(self.__buf, self.__pos).end()
+            if self.__pos < len(self.__buf):
+                return self.__buf[self.__pos]
+            if self.__eof:
+                return ''
+            self.__fill(0)
+
+    def __value(self):
+        """Decodes the JSON value starting at the current position"""
+        while True:
+            try:
+                value, end = self.__decoder.raw_decode(self.__buf, self.__pos)
+                # A number cut by the end of the chunk parses as a shorter
+                # one, so it is only complete once a delimiter follows it
+                if (self.__eof or not isinstance(value, (int, float)) or
+                        self.__buf[end:end + 1] in DELIMITERS):
+                    self.__pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self.__eof:
+                    raise
+            # Grow geometrically so a value spanning many chunks is not
+            # re-parsed once per chunk
+            self.__fill(len(self.__buf) - self.__pos)
+
+    def __skip(self):
+        """Moves past the object or array starting at the current position
+        without decoding it, scanning for the brace or bracket closing it
+        (strings and all else between them in one match); returns None"""
+        # An object with no escapes nor other object in it ends at the
+        # first brace that an even number of quotes precede
+        end = self.__buf.find('}', self.__pos)
+        if end >= 0 and self.__buf[self.__pos] == '{':
+            inner = self.__buf[self.__pos + 1:end]
+            if not ('{' in inner or '\\' in inner or
+                    inner.count('"') % 2):
+                self.__pos = end + 1
+                return None
+        depth = 0
+        while True:
+            self.__pos = SKIP.match(self.__buf, self.__pos).end()
+            if (self.__pos == len(self.__buf) or
+                    self.__buf[self.__pos] == '"'):
+                # The end of the chunk, possibly within a string
+                if self.__eof:
+                    self.__error("Unterminated value")
+                self.__fill(0)
+                continue
+            depth += 1 if self.__buf[self.__pos] in '{[' else -1
+            self.__pos += 1
+            if depth == 0:
+                return None
+
+    def __error(self, msg):
+        """Raises a JSONDecodeError at the current position"""
+        raise json.JSONDecodeError(msg, self.__buf, self.__pos)
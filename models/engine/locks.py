@@ -0,0 +1,110 @@
+#!/usr/bin/python3
+"""
+Locks module: the readers-writer lock guarding the storage engines
+"""
+import threading
+
+
+class _Holder:
+    """
+    Context manager acquiring one mode of an RWLock
+    """
+    __slots__ = ("__enter", "__exit")
+
+    def __init__(self, acquire, release):
+        """Initialize a holder calling acquire on entry, release on exit"""
+        self.__enter = acquire
+        self.__exit = release
+
+    def __enter__(self):
+        """Acquires the lock"""
+        self.__enter()
+        return self
+
+    def __exit__(self, *exc_info):
+        """Releases the lock"""
+        self.__exit()
+
+
+class RWLock:
+    """
+    Readers-writer lock: any number of threads may hold it for reading, or
+    a single thread for writing.
+
+    Writers waiting for the lock hold back new readers, so a steady stream
+    of readers cannot starve them. Both modes are reentrant, and the thread
+    holding the write lock may also read; a thread holding only the read
+    lock cannot upgrade it to the write lock (that would deadlock against
+    another reader doing the same), and gets a RuntimeError instead.
+    """
+
+    def __init__(self):
+        """Initialize an unlocked lock"""
+        self.__cond = threading.Condition(threading.Lock())
+        self.__reads = {}
+        self.__writer = None
+        self.__writes = 0
+        self.__waiting = 0
+        self.__read = _Holder(self.acquire_read, self.release_read)
+        self.__write = _Holder(self.acquire_write, self.release_write)
+
+    def acquire_read(self):
+        """Blocks until the calling thread may read"""
+        me = threading.get_ident()
+        with self.__cond:
+            depth = self.__reads.get(me, 0)
+            if not depth and self.__writer != me:
+                while self.__writer is not None or self.__waiting:
+                    self.__cond.wait()
+            self.__reads[me] = depth + 1
+
+    def release_read(self):
+        """Releases one read acquired by the calling thread"""
+        me = threading.get_ident()
+        with self.__cond:
+            depth = self.__reads.get(me)
+            if not depth:
+                raise RuntimeError("release of an unacquired read lock")
+            if depth == 1:
+                del self.__reads[me]
+                if not self.__reads:
+                    self.__cond.notify_all()
+            else:
+                self.__reads[me] = depth - 1
+
+    def acquire_write(self):
+        """Blocks until the calling thread may write"""
+        me = threading.get_ident()
+        with self.__cond:
+            if self.__writer == me:
+                self.__writes += 1
+                return
+            if me in self.__reads:
+                raise RuntimeError(
+                    "cannot upgrade a read lock to a write lock")
+            self.__waiting += 1
+            try:
+                while self.__writer is not None or self.__reads:
+                    self.__cond.wait()
+            finally:
+                self.__waiting -= 1
+            self.__writer = me
+            self.__writes = 1
+
+    def release_write(self):
+        """Releases one write acquired by the calling thread"""
+        with self.__cond:
+            if self.__writer != threading.get_ident():
+                raise RuntimeError("release of an unacquired write lock")
+            self.__writes -= 1
+            if not self.__writes:
+                self.__writer = None
+                self.__cond.notify_all()
+
+    def read(self):
+        """Returns a context manager holding the lock for reading"""
+        return self.__read
+
+    def write(self):
+        """Returns a context manager holding the lock for writing"""
+        return self.__write
@@ -0,0 +1,171 @@
+#!/usr/bin/python3
+"""
+ObjectMap module: the key -> instance dictionary behind the storage engines,
+with per-class buckets and secondary indexes kept up to date on every change
+"""
+
+# Fields indexed for each class name by both storage engines
+indexes = {
+    'City': ('state_id',),
+    'Place': ('city_id', 'user_id'),
+    'Review': ('place_id', 'user_id'),
+}
+
+
+def name_of(cls):
+    """Returns the name of cls, which may be a class or a class name"""
+    return cls if isinstance(cls, str) else cls.__name__
+
+
+class ObjectMap(dict):
+    """
+    Dictionary of <class name>.<id> -> instance that also keeps
+
+    - a bucket per class name, so one class can be listed without scanning
+      every key, and
+    - secondary indexes on declared fields (e.g. City.state_id), mapping
+      each value to the instances holding it.
+
+    Instances report attribute changes through reindex().
+    """
+
+    def __init__(self, indexes=None):
+        """
+        Initialize an empty map; indexes maps a class name to the field
+        names to index for that class
+        """
+        super().__init__()
+        self.__buckets = {}
+        self.__indexes = {}
+        for class_name, fields in (indexes or {}).items():
+            for field in fields:
+                self.add_index(class_name, field)
+
+    def __setitem__(self, key, obj):
+        """Stores obj under key and links it into its bucket and indexes"""
+        old = self.get(key)
+        if old is not None:
+            self.__unlink(key, old)
+        super().__setitem__(key, obj)
+        self.__link(key, obj)
+
+    def __delitem__(self, key):
+        """Removes key and unlinks its instance"""
+        obj = self[key]
+        super().__delitem__(key)
+        self.__unlink(key, obj)
+
+    def pop(self, key, *default):
+        """Removes key and returns its instance, like dict.pop"""
+        if key not in self:
+            return super().pop(key, *default)
+        obj = super().pop(key)
+        self.__unlink(key, obj)
+        return obj
+
+    def popitem(self):
+        """Removes and returns the last (key, instance) pair"""
+        key, obj = super().popitem()
+        self.__unlink(key, obj)
+        return key, obj
+
+    def setdefault(self, key, default=None):
+        """Returns the instance under key, storing default if missing"""
+        if key not in self:
+            self[key] = default
+        return self[key]
+
+    def update(self, *args, **kwargs):
+        """Stores every (key, instance) pair given, like dict.update"""
+        for key, obj in dict(*args, **kwargs).items():
+            self[key] = obj
+
+    def clear(self):
+        """Removes every instance, emptying all buckets and indexes"""
+        super().clear()
+        self.__buckets.clear()
+        for fields in self.__indexes.values():
+            for index in fields.values():
+                index.clear()
+
+    def add_index(self, class_name, field):
+        """Declares a secondary index on field for class_name"""
+        fields = self.__indexes.setdefault(class_name, {})
+        if field in fields:
+            return
+        index = fields[field] = {}
+        for key, obj in self.bucket(class_name).items():
+            self.__add(index, getattr(obj, field, None), key, obj)
+
+    def indexed(self, class_name, field):
+        """Returns True if field is indexed for class_name"""
+        return field in self.__indexes.get(class_name, ())
+
+    def bucket(self, class_name):
+        """Returns the (read-only) key -> instance dict of one class"""
+        return self.__buckets.get(class_name, {})
+
+    def class_names(self):
+        """Returns the names of the classes with instances in the map"""
+        return list(self.__buckets)
+
+    def lookup(self, class_name, field, value):
+        """Returns the (read-only) key -> instance dict of class_name
+        instances whose field equals value, or None if field is not
+        indexed"""
+        index = self.__indexes.get(class_name, {}).get(field)
+        if index is None:
+            return None
+        try:
+            return index.get(value, {})
+        except TypeError:
+            return None
+
+    def reindex(self, key, obj, field, old):
+        """Moves obj from the old to the current value of field"""
+        index = self.__indexes.get(obj.__class__.__name__, {}).get(field)
+        if index is None or self.get(key) is not obj:
+            return
+        self.__discard(index, old, key)
+        self.__add(index, getattr(obj, field, None), key, obj)
+
+    def __link(self, key, obj):
+        """Adds obj to its class bucket and indexes"""
+        class_name = obj.__class__.__name__
+        bucket = self.__buckets.get(class_name)
+        if bucket is None:
+            bucket = self.__buckets[class_name] = {}
+        bucket[key] = obj
+        for field, index in self.__indexes.get(class_name, {}).items():
+            self.__add(index, getattr(obj, field, None), key, obj)
+
+    def __unlink(self, key, obj):
+        """Removes obj from its class bucket and indexes"""
+        class_name = obj.__class__.__name__
+        self.__buckets.get(class_name, {}).pop(key, None)
+        for field, index in self.__indexes.get(class_name, {}).items():
+            self.__discard(index, getattr(obj, field, None), key)
+
+    @staticmethod
+    def __add(index, value, key, obj):
+        """Adds key to the index entry of value"""
+        try:
+            entry = index.get(value)
+        except TypeError:
+            # Unhashable values (e.g. lists) are not indexed
+            return
+        if entry is None:
+            entry = index[value] = {}
+        entry[key] = obj
+
+    @staticmethod
+    def __discard(index, value, key):
+        """Removes key from the index entry of value"""
+        try:
+            entry = index.get(value)
+        except TypeError:
+            return
+        if entry is not None:
+            entry.pop(key, None)
+            if not entry:
+                del index[value]
@@ -0,0 +1,118 @@
+#!/usr/bin/python3
+"""
+OffsetIndex module: a read-only, memory-mapped key -> byte range index
+kept next to a snapshot (e.g. file.json.idx), so a process can find one
+object without scanning the snapshot
+
+The file is a header followed by fixed-width records sorted by key: the
+key, NUL-padded to key_width bytes, then the start and end offsets of its
+payload in the snapshot (uint64, little-endian). Lookups are a binary
+search over the mapped records, and the keys of one class, which share the
+"<class name>." prefix, are contiguous.
+"""
+import mmap
+import os
+import struct
+
+
+class OffsetIndex:
+    """
+    Read-only view of an index file
+
+    The header records the version of the snapshot it was built from
+    (inode, mtime in ns, size), so a stale index can be told apart.
+    """
+    magic = b"HBNBIDX\x01"
+    header = struct.Struct("<8sQQQII")
+    offsets = struct.Struct("<QQ")
+
+    def __init__(self, path):
+        """Maps the index file at path; raises ValueError if it is not
+        one"""
+        with open(path, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            if size < self.header.size:
+                raise ValueError(f"{path} is not an index")
+            self.__map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        (magic, ino, mtime_ns, snapshot_size, self.__width,
+         self.__count) = self.header.unpack_from(self.__map)
+        self.__record = self.__width + self.offsets.size
+        if (magic != self.magic or
+                size != self.header.size + self.__count * self.__record):
+            self.__map.close()
+            raise ValueError(f"{path} is not an index")
+        self.version = (ino, mtime_ns, snapshot_size)
+
+    def __len__(self):
+        """Returns the number of keys in the index"""
+        return self.__count
+
+    def get(self, key):
+        """Returns the (start, end) byte range of key, or None"""
+        raw = key.encode('utf-8')
+        if len(raw) > self.__width:
+            return None
+        i = self.__search(raw)
+        if i < self.__count and self.__key(i) == raw:
+            return self.__offsets(i)
+        return None
+
+    def items(self, prefix=""):
+        """Yields (key, (start, end)) for each key starting with prefix,
+        in key order"""
+        raw = prefix.encode('utf-8')
+        i = self.__search(raw) if raw else 0
+        while i < self.__count:
+            key = self.__key(i)
+            if not key.startswith(raw):
+                return
+            yield key.decode('utf-8'), self.__offsets(i)
+            i += 1
+
+    def count(self, prefix=""):
+        """Returns the number of keys starting with prefix, found with two
+        binary searches"""
+        raw = prefix.encode('utf-8')
+        if not raw:
+            return self.__count
+        # The keys starting with raw sort below raw with its last byte
+        # incremented (prefixes are ASCII class names followed by ".")
+        end = raw[:-1] + bytes([raw[-1] + 1])
+        return self.__search(end) - self.__search(raw)
+
+    def close(self):
+        """Unmaps the index"""
+        self.__map.close()
+
+    def __search(self, raw):
+        """Returns the position of the first key not below raw"""
+        low, high = 0, self.__count
+        while low < high:
+            middle = (low + high) // 2
+            if self.__key(middle) < raw:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def __key(self, i):
+        """Returns the key of record i, as bytes"""
+        start = self.header.size + i * self.__record
+        return self.__map[start:start + self.__width].rstrip(b"\0")
+
+    def __offsets(self, i):
+        """Returns the byte range of record i"""
+        return self.offsets.unpack_from(
+            self.__map, self.header.size + i * self.__record + self.__width)
+
+    @classmethod
+    def write(cls, path, version, offsets):
+        """Writes to path the index of offsets, a key -> (start, end)
+        mapping, for the snapshot whose version is given"""
+        keys = sorted(key.encode('utf-8') for key in offsets)
+        width = max(map(len, keys), default=0)
+        with open(path, 'wb') as f:
+            f.write(cls.header.pack(cls.magic, *version, width, len(keys)))
+            for raw in keys:
+                f.write(raw.ljust(width, b"\0"))
+                f.write(cls.offsets.pack(*offsets[raw.decode('utf-8')]))
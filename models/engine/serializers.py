@@ -0,0 +1,396 @@
+#!/usr/bin/python3
+"""
+Snapshot formats for FileStorage
+
+A serializer turns the to_dict() dictionary of one object into a payload
+(bytes) and back, and reads and writes whole snapshot files made of
+(key, payload) entries. Every entry records the byte range of its payload,
+so a payload can be read back on its own.
+
+- json: a JSON object with one entry per line (file.json)
+- binary: length-prefixed records whose payloads pack the declared
+  fields of each class (models.schema) with struct (file.hbnb), which
+  read the same on every Python version
+
+Existing stores can be converted either way:
+
+    python3 -m models.engine.serializers file.json file.hbnb
+"""
+import json
+import os
+import struct
+import sys
+import zlib
+from models.base_model import classes
+from models.engine.json_stream import ObjectReader
+from models.schema import schema
+
+
+class JSONSerializer:
+    """
+    Serializer for the JSON snapshot format
+    """
+    name = "json"
+    extension = ".json"
+
+    def encode(self, value):
+        """Returns the payload of the dictionary value"""
+        return json.dumps(value).encode('utf-8')
+
+    def decode(self, payload):
+        """Returns the dictionary stored in payload"""
+        return json.loads(payload)
+
+    def to_json(self, payload):
+        """Returns payload as JSON text"""
+        return payload.decode('utf-8')
+
+    def entries(self, f, decode=True):
+        """Yields (key, value, start, end) for each entry of the snapshot
+        file f, opened in binary mode; without decode, the values are only
+        skipped over, and given as None"""
+        return ObjectReader(f).entries(decode)
+
+    def prepare(self, f):
+        """Reads what the payloads of the snapshot file f need to be
+        decoded on their own (nothing, in this format)"""
+
+    def writer(self, f):
+        """Returns a writer of snapshot entries to the binary file f"""
+        return JSONWriter(f)
+
+
+class JSONWriter:
+    """
+    Writes the entries of a JSON snapshot, one per line
+    """
+
+    def __init__(self, f):
+        """Initialize a writer to the binary file f"""
+        self.__file = f
+        self.__offset = 0
+        self.__separator = "{"
+
+    def write(self, key, payload):
+        """Writes one entry and returns the byte range of its payload"""
+        head = f"{self.__separator}{json.dumps(key)}: ".encode('utf-8')
+        self.__file.write(head)
+        self.__file.write(payload)
+        self.__separator = ",\n"
+        start = self.__offset + len(head)
+        self.__offset = start + len(payload)
+        return start, self.__offset
+
+    def close(self):
+        """Terminates the snapshot"""
+        self.__file.write(b"{}" if self.__separator == "{" else b"}")
+
+
+class Layout:
+    """
+    How the payloads of one class pack its declared fields: the int, then
+    float, then str fields of its schema, id, created_at and updated_at
+    being among the strings. A payload starts with the crc of its layout
+    and a bit mask of the fields it holds; then come the ints and floats
+    (int64 and double), the length in characters of each string, the size
+    of the UTF-8 text of the strings, that text, and any other attribute
+    (or field holding a value of another type) as a JSON object.
+    """
+    head = struct.Struct("<IQ")
+    kinds = {"int": int, "float": float, "str": str}
+
+    def __init__(self, class_name, fields):
+        """Initialize the layout of class_name, given its (name, type
+        name) fields in packing order"""
+        self.class_name = class_name
+        self.fields = [(name, kind) for name, kind in fields][:64]
+        definition = json.dumps([class_name, self.fields])
+        self.crc = zlib.crc32(definition.encode('utf-8')) or 1
+        self.__slots = [(1 << bit, name, self.kinds[kind])
+                        for bit, (name, kind) in enumerate(self.fields)]
+        self.__plans = {}
+
+    @classmethod
+    def of(cls, model):
+        """Returns the layout of the model class model"""
+        fields = [(name, "str")
+                  for name in ("id", "created_at", "updated_at")]
+        fields += [(name, field.type.__name__)
+                   for name, field in schema(model).fields.items()
+                   if field.type in (int, float, str)]
+        order = list(cls.kinds)
+        fields.sort(key=lambda field: order.index(field[1]))
+        return cls(model.__name__, fields)
+
+    def plan(self, mask):
+        """Returns the (struct, numeric field names, string field names)
+        of the payloads holding the fields in mask"""
+        plan = self.__plans.get(mask)
+        if plan is None:
+            held = [(name, kind) for bit, (name, kind)
+                    in enumerate(self.fields) if mask >> bit & 1]
+            numbers = [name for name, kind in held if kind != "str"]
+            strings = [name for name, kind in held if kind == "str"]
+            codes = "".join("q" if kind == "int" else "d"
+                            for name, kind in held if kind != "str")
+            plan = self.__plans[mask] = (
+                struct.Struct(f"<{codes}{len(strings) + 1}I"),
+                numbers, strings)
+        return plan
+
+    def encode(self, value):
+        """Returns the payload of the to_dict() dictionary value"""
+        mask = 0
+        numbers = []
+        strings = []
+        held = 1
+        for bit, name, kind in self.__slots:
+            item = value.get(name)
+            if type(item) is not kind or (
+                    kind is int and not -1 << 63 <= item < 1 << 63):
+                continue
+            mask |= bit
+            held += 1
+            if kind is str:
+                strings.append(item)
+            else:
+                numbers.append(item)
+        text = "".join(strings).encode('utf-8')
+        packed = self.plan(mask)[0].pack(
+            *numbers, *map(len, strings), len(text))
+        tail = b""
+        if held < len(value):
+            rest = {name: item for name, item in value.items()
+                    if name != "__class__"}
+            for bit, name, kind in self.__slots:
+                if mask & bit:
+                    del rest[name]
+            tail = json.dumps(rest, separators=(",", ":")).encode('utf-8')
+        return b"".join((self.head.pack(self.crc, mask), packed, text,
+                         tail))
+
+    def decode(self, payload, mask):
+        """Returns the dictionary stored in payload, which holds the fields
+        in mask"""
+        packed, numbers, strings = self.plan(mask)
+        items = packed.unpack_from(payload, self.head.size)
+        value = dict(zip(numbers, items))
+        start = self.head.size + packed.size
+        end = start + items[-1]
+        text = payload[start:end].decode('utf-8')
+        offset = 0
+        for name, length in zip(strings, items[len(numbers):]):
+            value[name] = text[offset:offset + length]
+            offset += length
+        if end < len(payload):
+            value.update(json.loads(payload[end:]))
+        value["__class__"] = self.class_name
+        return value
+
+
+class BinarySerializer:
+    """
+    Serializer for the binary snapshot format: a magic header, the layouts
+    of the payloads (a uint32 size and a JSON object of crc -> [class
+    name, fields]), then one record per entry, made of the key and payload
+    lengths (uint16 and uint32, little-endian), the UTF-8 key and the
+    payload (see Layout). The last byte of the magic header is the format
+    version.
+
+    Layouts are kept by crc once read, so that a payload decodes on its own
+    after its snapshot was read or prepared, even if the schema of its
+    class changed since it was written; payloads of objects whose class is
+    unknown are a JSON object after a crc of 0.
+    """
+    name = "binary"
+    extension = ".hbnb"
+    magic = b"HBNB\x03"
+    record = struct.Struct("<HI")
+    size = struct.Struct("<I")
+    chunk_size = 1 << 20
+
+    def __init__(self):
+        """Initialize the layouts known"""
+        self.__layouts = {}
+        self.__current = {}
+
+    def layout(self, class_name):
+        """Returns the layout of class_name in its current schema, or None
+        if it is not a model class"""
+        layout = self.__current.get(class_name)
+        if layout is None:
+            if not isinstance(class_name, str) or class_name not in classes:
+                return None
+            layout = self.__current[class_name] = Layout.of(
+                classes[class_name])
+            self.__layouts.setdefault(layout.crc, layout)
+        return layout
+
+    def encode(self, value):
+        """Returns the payload of the dictionary value"""
+        layout = self.layout(value.get("__class__"))
+        if layout is None:
+            return Layout.head.pack(0, 0) + json.dumps(
+                value, separators=(",", ":")).encode('utf-8')
+        return layout.encode(value)
+
+    def decode(self, payload):
+        """Returns the dictionary stored in payload"""
+        try:
+            crc, mask = Layout.head.unpack_from(payload)
+            if not crc:
+                return json.loads(payload[Layout.head.size:])
+            layout = self.__layouts.get(crc)
+            if layout is None:
+                raise ValueError(f"unknown layout {crc:#x}")
+            return layout.decode(payload, mask)
+        except (ValueError, struct.error) as e:
+            raise ValueError(f"bad binary payload: {e}") from None
+
+    def to_json(self, payload):
+        """Returns payload as JSON text"""
+        return json.dumps(self.decode(payload))
+
+    def prepare(self, f):
+        """Reads the magic header and layouts of the snapshot file f, so
+        that its payloads can be decoded on their own; returns the offset
+        of its first record"""
+        magic = f.read(len(self.magic))
+        if magic != self.magic:
+            if magic[:-1] == self.magic[:-1]:
+                # Version 1 payloads were marshal data, which depends on
+                # the Python version that wrote them, and version 2 ones
+                # JSON text
+                raise ValueError("unsupported binary snapshot version "
+                                 f"{magic[-1]}")
+            raise ValueError("not a binary snapshot")
+        head = f.read(self.size.size)
+        if len(head) < self.size.size:
+            raise ValueError("truncated layouts")
+        size, = self.size.unpack(head)
+        data = f.read(size)
+        if len(data) < size:
+            raise ValueError("truncated layouts")
+        for class_name, fields in json.loads(data).values():
+            layout = Layout(class_name, map(tuple, fields))
+            self.__layouts.setdefault(layout.crc, layout)
+        return len(magic) + len(head) + size
+
+    def entries(self, f, decode=True):
+        """Yields (key, value, start, end) for each entry of the snapshot
+        file f, opened in binary mode; without decode, the values are
+        given as None"""
+        record = self.record
+        # File offset of buf[0]; records are read chunk_size at a time
+        offset = self.prepare(f)
+        buf = b""
+        pos = 0
+        while True:
+            if len(buf) - pos < record.size:
+                offset += pos
+                buf = buf[pos:] + f.read(self.chunk_size)
+                pos = 0
+                if not buf:
+                    return
+                if len(buf) < record.size:
+                    raise ValueError("truncated record")
+            key_size, size = record.unpack_from(buf, pos)
+            need = record.size + key_size + size
+            if len(buf) - pos < need:
+                offset += pos
+                buf = buf[pos:]
+                pos = 0
+                buf += f.read(max(need - len(buf), self.chunk_size))
+                if len(buf) < need:
+                    raise ValueError("truncated record")
+            start = pos + record.size + key_size
+            key = buf[pos + record.size:start].decode('utf-8')
+            pos = start + size
+            yield (key, self.decode(buf[start:pos]) if decode else None,
+                   offset + start, offset + pos)
+
+    def writer(self, f):
+        """Returns a writer of snapshot entries to the binary file f"""
+        return BinaryWriter(f, self)
+
+    def layouts(self):
+        """Returns the layouts known, by crc"""
+        return dict(self.__layouts)
+
+
+class BinaryWriter:
+    """
+    Writes the records of a binary snapshot, after every layout known,
+    which covers the payloads encoded or read so far
+    """
+
+    def __init__(self, f, serializer):
+        """Initialize a writer to the binary file f"""
+        self.__file = f
+        self.__record = serializer.record
+        # Current layouts first, for any class written from now on
+        for class_name in classes:
+            serializer.layout(class_name)
+        layouts = json.dumps({
+            crc: [layout.class_name, layout.fields]
+            for crc, layout in serializer.layouts().items()}).encode('utf-8')
+        head = serializer.magic + serializer.size.pack(len(layouts))
+        f.write(head + layouts)
+        self.__offset = len(head) + len(layouts)
+
+    def write(self, key, payload):
+        """Writes one record and returns the byte range of its payload"""
+        key = key.encode('utf-8')
+        head = self.__record.pack(len(key), len(payload))
+        self.__file.write(head + key)
+        self.__file.write(payload)
+        start = self.__offset + len(head) + len(key)
+        self.__offset = start + len(payload)
+        return start, self.__offset
+
+    def close(self):
+        """Terminates the snapshot"""
+
+
+serializers = {
+    JSONSerializer.name: JSONSerializer(),
+    BinarySerializer.name: BinarySerializer(),
+}
+
+
+def detect(path):
+    """Returns the serializer of the snapshot file at path"""
+    binary = serializers[BinarySerializer.name]
+    with open(path, 'rb') as f:
+        # Any version, so that entries() reports an unsupported one
+        if f.read(len(binary.magic))[:-1] == binary.magic[:-1]:
+            return binary
+    return serializers[JSONSerializer.name]
+
+
+def convert(source, target, name=None):
+    """Copies the snapshot at source to target, in the format called name
+    (by default, the one whose extension target has); returns the number
+    of entries copied"""
+    if name is None:
+        extension = os.path.splitext(target)[1]
+        name = next((s.name for s in serializers.values()
+                     if s.extension == extension), JSONSerializer.name)
+    reader = detect(source)
+    out = serializers[name]
+    count = 0
+    with open(source, 'rb') as src, open(target, 'wb') as dst:
+        writer = out.writer(dst)
+        for key, value, start, end in reader.entries(src):
+            writer.write(key, out.encode(value))
+            count += 1
+        writer.close()
+    return count
+
+
+if __name__ == "__main__":
+    if len(sys.argv) not in (3, 4):
+        print("Usage: python3 -m models.engine.serializers SOURCE TARGET "
+              f"[{'|'.join(serializers)}]", file=sys.stderr)
+        sys.exit(2)
+    print(f"{convert(*sys.argv[1:])} objects converted")
@@ -0,0 +1,124 @@
+#!/usr/bin/python3
+"""
+Output formats of the console's all command
+
+Each writer formats instances one at a time into a buffer, written to its
+stream every chunk_size characters, so a listing starts at once and takes
+the same memory however many instances it holds.
+
+- list: the Python list of the string representations of the instances,
+  as all has always printed it
+- jsonl: one to_dict() dictionary per line, as JSON
+- csv: one row per instance, with a header; the columns are __class__,
+  id, the timestamps and the attributes the class declares
+"""
+import csv
+import io
+import json
+from models.base_model import classes
+from models.schema import schema
+
+
+class Writer:
+    """
+    Base class of the writers: buffers the text of write() and writes it to
+    stream in chunks
+    """
+    chunk_size = 1 << 16
+
+    def __init__(self, stream, class_name=None):
+        """Initialize a writer of instances (of class_name only, if given)
+        to stream"""
+        self.stream = stream
+        self.class_name = class_name
+        self.buffer = io.StringIO()
+
+    def write(self, obj):
+        """Formats obj into the buffer, writing it out once full"""
+        self.format(obj)
+        if self.buffer.tell() >= self.chunk_size:
+            self.flush()
+
+    def format(self, obj):
+        """Writes the text of obj to the buffer"""
+        raise NotImplementedError
+
+    def flush(self):
+        """Writes the buffer out to stream"""
+        self.stream.write(self.buffer.getvalue())
+        self.buffer.seek(0)
+        self.buffer.truncate()
+
+    def close(self):
+        """Writes out what is left in the buffer"""
+        self.flush()
+
+
+class ListWriter(Writer):
+    """
+    Writes the repr of the list of str(obj), as print() does
+    """
+
+    def __init__(self, stream, class_name=None):
+        """Initialize a writer; the list is opened at once"""
+        super().__init__(stream, class_name)
+        self.buffer.write("[")
+        self.separator = ""
+
+    def format(self, obj):
+        """Writes the repr of str(obj), after a comma but for the first"""
+        self.buffer.write(self.separator)
+        self.buffer.write(repr(str(obj)))
+        self.separator = ", "
+
+    def close(self):
+        """Closes the list"""
+        self.buffer.write("]\n")
+        super().close()
+
+
+class JSONLinesWriter(Writer):
+    """
+    Writes the dictionary of each instance as one line of JSON
+    """
+
+    def format(self, obj):
+        """Writes obj.to_dict() as a line of JSON"""
+        self.buffer.write(json.dumps(obj.to_dict()))
+        self.buffer.write("\n")
+
+
+class CSVWriter(Writer):
+    """
+    Writes one CSV row per instance of class_name, which is required
+    """
+
+    def __init__(self, stream, class_name=None):
+        """Initialize a writer and write the header row"""
+        if class_name is None:
+            raise ValueError("class name missing")
+        super().__init__(stream, class_name)
+        self.fields = [(name, field.default, field.serialize) for name, field
+                       in schema(classes[class_name]).fields.items()]
+        columns = ["__class__", "id", "created_at", "updated_at"]
+        columns += [name for name, default, serialize in self.fields
+                    if name not in columns]
+        self.rows = csv.DictWriter(self.buffer, columns,
+                                   extrasaction="ignore")
+        self.rows.writeheader()
+
+    def format(self, obj):
+        """Writes the row of obj, each field serialized by the schema of
+        the class (lists and dictionaries as JSON)"""
+        row = obj.to_dict()
+        for name, default, serialize in self.fields:
+            row[name] = serialize(row.get(name, default))
+        self.rows.writerow(row)
+
+
+# Writer of each output format, by name
+writers = {
+    "list": ListWriter,
+    "jsonl": JSONLinesWriter,
+    "csv": CSVWriter,
+}
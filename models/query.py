@@ -0,0 +1,247 @@
+#!/usr/bin/python3
+"""
+Query language of the console's query command
+
+    <Class> [where <field> <op> <value> [and ...]]
+            [order by <field> [asc|desc]] [limit <n>] [fields <field>,...]
+
+e.g. Place where city_id=0001 and price_by_night<100 order by
+price_by_night limit 20 fields name,price_by_night
+
+op is one of = == != < <= > >=. A value is converted to the type the
+class declares for its field (see models.schema), e.g. an int for
+Place.price_by_night, and to a number or else kept as a string for the
+other fields; quote it if it holds spaces or operators. Equality
+conditions go through storage.find(), which uses the secondary indexes
+where there is one, and the others scan storage.stream(); every condition
+is then checked on each candidate as the result is streamed.
+"""
+import ast
+import heapq
+import itertools
+import operator
+import re
+from models.base_model import classes
+from models.schema import schema
+
+OPERATORS = {
+    "=": operator.eq,
+    "==": operator.eq,
+    "!=": operator.ne,
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+}
+
+TOKEN = re.compile(r"""\s*(?:
+    (?P<string>"(?:[^"\\]|\\.)*"|'(?:[^'\\]|\\.)*')
+    |(?P<op><=|>=|!=|==|=|<|>)
+    |(?P<comma>,)
+    |(?P<word>[^\s<>=!,"']+)
+)""", re.VERBOSE)
+
+
+class Query:
+    """
+    A parsed query, run against a storage engine with run()
+    """
+
+    def __init__(self, class_name, conditions=(), order=None,
+                 descending=False, limit=None, fields=None):
+        """Initialize a query of the instances of class_name; conditions
+        are (field, op, text) triples, text being the value as written"""
+        self.class_name = class_name
+        self.conditions = list(conditions)
+        self.order = order
+        self.descending = descending
+        self.limit = limit
+        self.fields = fields
+
+    @classmethod
+    def parse(cls, text):
+        """Returns the query written in text; raises ValueError, with a
+        message fit for the console, if it is not valid"""
+        tokens = Tokens(text)
+        class_name = tokens.word("class name missing")
+        query = cls(class_name)
+        if tokens.keyword("where"):
+            while True:
+                field = tokens.word("field missing in where")
+                op = tokens.take("op", f"operator missing after {field}")
+                value = tokens.value(f"value missing after {field}{op}")
+                query.conditions.append((field, op, value))
+                if not tokens.keyword("and"):
+                    break
+        if tokens.keyword("order"):
+            if not tokens.keyword("by"):
+                raise ValueError("by missing after order")
+            query.order = tokens.word("field missing after order by")
+            if tokens.keyword("desc"):
+                query.descending = True
+            else:
+                tokens.keyword("asc")
+        if tokens.keyword("limit"):
+            limit = tokens.word("number missing after limit")
+            if not limit.isdigit():
+                raise ValueError(f"invalid limit: {limit}")
+            query.limit = int(limit)
+        if tokens.keyword("fields"):
+            query.fields = [tokens.word("field missing after fields")]
+            while tokens.take("comma"):
+                query.fields.append(tokens.word("field missing after ,"))
+        if not tokens.done():
+            raise ValueError(f"unexpected {tokens.rest()}")
+        return query
+
+    def criteria(self):
+        """Returns the conditions as (field, compare, value) triples, each
+        value parsed by the schema of the class if it declares the field;
+        raises ValueError if a value does not fit its field"""
+        fields = schema(classes[self.class_name]).fields
+        criteria = []
+        for field, op, text in self.conditions:
+            if field not in fields:
+                value = convert(text)
+            else:
+                try:
+                    value = fields[field].parse(text)
+                except ValueError as e:
+                    raise ValueError(f"{field}: {e}") from None
+            criteria.append((field, OPERATORS[op], value))
+        return criteria
+
+    def run(self, storage):
+        """Yields the matching instances, in order if the query has one,
+        up to its limit"""
+        criteria = self.criteria()
+        equal = {}
+        for field, compare, value in criteria:
+            if compare is operator.eq:
+                equal.setdefault(field, value)
+        if equal:
+            candidates = storage.find(self.class_name, **equal).values()
+        else:
+            candidates = storage.stream(self.class_name)
+        matches = (obj for obj in candidates
+                   if all(test(obj, field, compare, value)
+                          for field, compare, value in criteria))
+        if self.order is None:
+            yield from itertools.islice(matches, self.limit)
+            return
+        key = order_key(self.order)
+        if self.limit is not None:
+            pick = heapq.nlargest if self.descending else heapq.nsmallest
+            yield from pick(self.limit, matches, key=key)
+        else:
+            yield from sorted(matches, key=key, reverse=self.descending)
+
+    def row(self, obj):
+        """Returns the line printed for obj: its string representation,
+        restricted to the query's fields if it has any"""
+        if self.fields is None:
+            return str(obj)
+        values = {field: getattr(obj, field, None) for field in self.fields}
+        return f"[{obj.__class__.__name__}] ({obj.id}) {values}"
+
+
+class Tokens:
+    """
+    Cursor over the tokens of a query
+    """
+
+    def __init__(self, text):
+        """Initialize a cursor at the first token of text"""
+        self.__text = text.strip()
+        self.__pos = 0
+        self.__next = self.__scan()
+
+    def __scan(self):
+        """Returns the (kind, text) of the token at the cursor, or None at
+        the end"""
+        if self.__pos >= len(self.__text):
+            return None
+        match = TOKEN.match(self.__text, self.__pos)
+        if match is None or match.end() == self.__pos:
+            raise ValueError(f"unexpected {self.__text[self.__pos:]}")
+        self.__end = match.end()
+        return match.lastgroup, match.group(match.lastgroup)
+
+    def take(self, kind, missing=None):
+        """Consumes and returns the next token if it is of kind; otherwise
+        raises ValueError(missing) if given, or returns None"""
+        if self.__next is None or self.__next[0] != kind:
+            if missing is not None:
+                raise ValueError(missing)
+            return None
+        text = self.__next[1]
+        self.__pos = self.__end
+        self.__next = self.__scan()
+        return text
+
+    def word(self, missing):
+        """Consumes and returns the next word, raising ValueError(missing)
+        if there is none"""
+        return self.take("word", missing)
+
+    def value(self, missing):
+        """Consumes and returns the next word or quoted string, unquoted;
+        raises ValueError if the string holds a bad escape"""
+        text = self.take("string")
+        if text is not None:
+            try:
+                return ast.literal_eval(text)
+            except (SyntaxError, ValueError):
+                raise ValueError(f"invalid value: {text}") from None
+        return self.word(missing)
+
+    def keyword(self, name):
+        """Consumes the next token if it is the word name (in any case);
+        returns whether it did"""
+        if (self.__next is None or self.__next[0] != "word" or
+                self.__next[1].lower() != name):
+            return False
+        self.take("word")
+        return True
+
+    def done(self):
+        """Returns whether every token was consumed"""
+        return self.__next is None
+
+    def rest(self):
+        """Returns the text not consumed yet"""
+        return self.__text[self.__pos:].strip()
+
+
+def convert(text):
+    """Returns text as an int or a float if it is a number, else as it is,
+    for the fields a class does not declare"""
+    for number in (int, float):
+        try:
+            return number(text)
+        except ValueError:
+            pass
+    return text
+
+
+def test(obj, field, compare, value):
+    """Returns whether the field of obj compares to value; values of other
+    types never match"""
+    try:
+        return compare(getattr(obj, field, None), value)
+    except TypeError:
+        return False
+
+
+def order_key(field):
+    """Returns a sort key on field, placing the instances without it last
+    and sorting values of different types by type name"""
+    def key(obj):
+        """Returns the sort key of obj"""
+        value = getattr(obj, field, None)
+        if value is None:
+            return (1, "", 0)
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            return (0, "", value)
+        return (0, type(value).__name__, value)
+    return key
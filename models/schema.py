@@ -0,0 +1,165 @@
+#!/usr/bin/python3
+"""
+Typed attribute schema of the model classes
+
+The schema of a class is derived once from the class-level attributes it
+declares (Place.number_rooms = 0, Place.amenity_ids = [], ...): each one
+becomes a Field whose type is that of its default, with a parse function
+chosen for the type up front. parse converts a value typed in the console
+or read from a JSON Lines or CSV file ("3", "['a', 'b']") to the type of
+the field, and serialize turns a value back into a CSV cell.
+
+    from models.schema import schema
+    schema(Place).fields["number_rooms"].parse("3")  # 3
+
+Reloaded dictionaries go through Schema.load(), which converts the values
+of the fields that are not strings if they were saved with another type
+(e.g. "3" or 3.0 for an int field); a float with a fractional part is
+not an int, and is kept as it is.
+"""
+import ast
+import json
+
+# Schema of each model class, built on first use
+schemas = {}
+
+# Marks a field missing from a dictionary
+MISSING = object()
+
+
+def declared(cls):
+    """Returns the class-level attributes declared by cls and its bases,
+    with their defaults: every attribute that is neither private nor a
+    method or other descriptor"""
+    defaults = {}
+    for klass in reversed(cls.__mro__):
+        if klass is object:
+            continue
+        for name, value in vars(klass).items():
+            if name.startswith("_") or hasattr(type(value), "__get__"):
+                continue
+            defaults[name] = value
+    return defaults
+
+
+def schema(cls):
+    """Returns the schema of the model class cls"""
+    try:
+        return schemas[cls]
+    except KeyError:
+        return schemas.setdefault(cls, Schema(cls))
+
+
+def parse_number(kind, default):
+    """Returns the parse function of an int or float field"""
+    def parse(value):
+        """Returns value, or the number written in it, as kind; an empty
+        string gives the default. A float is an int only if it is
+        integral: 4.0 gives 4, 4.7 raises ValueError."""
+        if isinstance(value, str):
+            if not value.strip():
+                return default
+            try:
+                return kind(value)
+            except ValueError:
+                raise ValueError(f"not a{'n' if kind is int else ''} "
+                                 f"{kind.__name__}: {value!r}") from None
+        if (isinstance(value, bool) or not isinstance(value, (int, float))
+                or kind is int and isinstance(value, float)
+                and not value.is_integer()):
+            raise ValueError(f"not a{'n' if kind is int else ''} "
+                             f"{kind.__name__}: {value!r}")
+        return kind(value)
+    return parse
+
+
+def parse_container(kind):
+    """Returns the parse function of a list or dict field"""
+    def parse(value):
+        """Returns value, or the JSON or Python literal written in it,
+        checking it is a kind"""
+        if isinstance(value, str):
+            if not value.strip():
+                return kind()
+            try:
+                value = json.loads(value)
+            except ValueError:
+                try:
+                    value = ast.literal_eval(value)
+                except (SyntaxError, ValueError):
+                    pass
+        if not isinstance(value, kind):
+            raise ValueError(f"not a {kind.__name__}: {value!r}")
+        return value
+    return parse
+
+
+def parse_string(value):
+    """Returns value as a string; lists and dictionaries are refused"""
+    if isinstance(value, (list, dict)):
+        raise ValueError(f"not a string: {value!r}")
+    return str(value)
+
+
+def parse_any(value):
+    """Returns value unchanged, for fields of other types"""
+    return value
+
+
+class Field:
+    """
+    One declared attribute of a model class
+    """
+    __slots__ = ("name", "default", "type", "parse", "serialize")
+
+    def __init__(self, name, default):
+        """Initialize the field name, whose class-level value is default"""
+        self.name = name
+        self.default = default
+        self.type = type(default)
+        if self.type in (int, float):
+            self.parse = parse_number(self.type, default)
+        elif self.type in (list, dict):
+            self.parse = parse_container(self.type)
+        elif self.type is str:
+            self.parse = parse_string
+        else:
+            self.parse = parse_any
+        self.serialize = (json.dumps if self.type in (list, dict)
+                          else parse_any)
+
+
+class Schema:
+    """
+    The fields declared by a model class, by name
+    """
+
+    def __init__(self, cls):
+        """Initialize the schema of the model class cls"""
+        self.fields = {name: Field(name, default)
+                       for name, default in declared(cls).items()}
+        self.defaults = {name: field.default
+                         for name, field in self.fields.items()}
+        # Fields whose saved values may need a conversion on reload
+        self.typed = tuple((name, field.type, field.parse)
+                           for name, field in self.fields.items()
+                           if field.type in (int, float, list, dict))
+
+    def load(self, values):
+        """Returns values, a to_dict() dictionary, or a copy of it with the
+        typed fields converted where they were saved with another type;
+        values that cannot be converted are kept as they are"""
+        copied = False
+        for name, kind, parse in self.typed:
+            value = values.get(name, MISSING)
+            if value is MISSING or type(value) is kind:
+                continue
+            try:
+                value = parse(value)
+            except ValueError:
+                continue
+            if not copied:
+                values = dict(values)
+                copied = True
+            values[name] = value
+        return values
@@ -0,0 +1,439 @@
+#!/usr/bin/python3
+"""
+Unit tests for the console
+"""
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from unittest import mock
+import console
+import models
+from console import HBNBCommand
+from models import storage
+
+
+class TestConsoleBatch(unittest.TestCase):
+    """Test cases for the begin and commit commands"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        storage.all().clear()
+
+    def tearDown(self):
+        """Clean up after each test"""
+        storage.all().clear()
+        for path in ("file.json", "file.json.bak"):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def run_commands(self, *lines, cli=None):
+        """Runs lines in a console (by default, a new one) and returns its
+        output"""
+        cli = cli or HBNBCommand()
+        with mock.patch("sys.stdout", new=io.StringIO()) as out:
+            for line in lines:
+                cli.onecmd(line)
+        return out.getvalue()
+
+    @unittest.skipIf(models.storage_t == "db", "counts file storage writes")
+    def test_begin_commit(self):
+        """Test commands between begin and commit are saved once"""
+        with mock.patch.object(storage, "save",
+                               wraps=storage.save) as save:
+            with mock.patch.object(type(storage), "compact",
+                                   autospec=True) as compact:
+                cli = HBNBCommand()
+                self.run_commands("begin", "create User", "create State",
+                                  cli=cli)
+                self.assertEqual(compact.call_count, 0)
+                self.run_commands("commit", cli=cli)
+            self.assertEqual(compact.call_count, 1)
+        self.assertEqual(save.call_count, 3)
+
+    def test_commit_without_begin(self):
+        """Test commit without begin prints an error"""
+        self.assertEqual(self.run_commands("commit"),
+                         "** no batch started **\n")
+
+    def test_begin_twice(self):
+        """Test begin inside a batch prints an error"""
+        self.assertEqual(self.run_commands("begin", "begin", "commit"),
+                         "** batch already started **\n")
+
+    @unittest.skipIf(models.storage_t == "db", "counts file storage writes")
+    def test_piped_input_is_batched(self):
+        """Test commands piped into the console are saved once"""
+        script = io.StringIO("create User\ncreate User\ncreate City\n")
+        with mock.patch("sys.stdin", new=script), \
+                mock.patch("sys.stdout", new=io.StringIO()), \
+                mock.patch.object(type(storage), "compact",
+                                  autospec=True) as compact:
+            console.main()
+        self.assertEqual(compact.call_count, 1)
+        self.assertEqual(len(storage.all()), 3)
+
+    @unittest.skipIf(models.storage_t == "db", "counts file storage writes")
+    def test_piped_commit_saves(self):
+        """Test commit saves at once when commands are piped in"""
+        script = io.StringIO("begin\ncreate User\ncommit\nall\n")
+        saved = []
+        with mock.patch("sys.stdin", new=script), \
+                mock.patch("sys.stdout", new=io.StringIO()), \
+                mock.patch.object(type(storage), "compact",
+                                  autospec=True) as compact, \
+                mock.patch.object(HBNBCommand, "do_all",
+                                  lambda cli, arg:
+                                  saved.append(compact.call_count)):
+            console.main()
+        self.assertEqual(saved, [1])
+        self.assertEqual(compact.call_count, 1)
+
+
+class TestConsoleQuery(unittest.TestCase):
+    """Test cases for the query command"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        storage.all().clear()
+
+    def tearDown(self):
+        """Clean up after each test"""
+        storage.all().clear()
+        for path in ("file.json", "file.json.bak"):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def run_command(self, line):
+        """Runs line in a new console and returns its output"""
+        with mock.patch("sys.stdout", new=io.StringIO()) as out:
+            HBNBCommand().onecmd(line)
+        return out.getvalue()
+
+    def test_query(self):
+        """Test matching instances are printed one per line"""
+        for price in (120, 80, 30):
+            place = models.base_model.classes["Place"]()
+            place.price_by_night = price
+            storage.new(place)
+        output = self.run_command("query Place where price_by_night<100 "
+                                  "order by price_by_night "
+                                  "fields price_by_night")
+        lines = output.splitlines()
+        self.assertEqual(len(lines), 2)
+        self.assertTrue(lines[0].endswith("{'price_by_night': 30}"))
+        self.assertTrue(lines[1].endswith("{'price_by_night': 80}"))
+
+    def test_query_errors(self):
+        """Test invalid queries print an error"""
+        self.assertEqual(self.run_command("query"),
+                         "** class name missing **\n")
+        self.assertEqual(self.run_command("query Nope"),
+                         "** class doesn't exist **\n")
+        self.assertEqual(self.run_command("query Place limit"),
+                         "** number missing after limit **\n")
+        self.assertEqual(self.run_command("query Place where max_guest>x"),
+                         "** max_guest: not an int: 'x' **\n")
+        self.assertEqual(self.run_command('query User where email="\\x"'),
+                         '** invalid value: "\\x" **\n')
+
+
+class TestConsoleAll(unittest.TestCase):
+    """Test cases for the all command"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        storage.all().clear()
+        self.user = models.base_model.classes["User"]()
+        self.city = models.base_model.classes["City"]()
+        storage.new(self.user)
+        storage.new(self.city)
+
+    def tearDown(self):
+        """Clean up after each test"""
+        storage.all().clear()
+
+    def run_command(self, line):
+        """Runs line in a new console and returns its output"""
+        with mock.patch("sys.stdout", new=io.StringIO()) as out:
+            HBNBCommand().onecmd(line)
+        return out.getvalue()
+
+    def test_all(self):
+        """Test all prints the list of the string representations"""
+        self.assertEqual(self.run_command("all"),
+                         f"{[str(self.user), str(self.city)]}\n")
+        self.assertEqual(self.run_command("all City"),
+                         f"{[str(self.city)]}\n")
+        self.assertEqual(self.run_command("all State"), "[]\n")
+        self.assertEqual(self.run_command("all Nope"),
+                         "** class doesn't exist **\n")
+
+    def test_all_formats(self):
+        """Test all writes JSON Lines or CSV with --format"""
+        self.assertEqual(self.run_command("all User --format=jsonl"),
+                         json.dumps(self.user.to_dict()) + "\n")
+        lines = self.run_command("all City --format=csv").splitlines()
+        self.assertEqual(len(lines), 2)
+        self.assertTrue(lines[0].startswith("__class__,id,"))
+        self.assertEqual(self.run_command("all --format=csv"),
+                         "** class name missing **\n")
+        self.assertEqual(self.run_command("all --format=xml"),
+                         "** unknown format: xml **\n")
+
+
+class TestConsoleDotNotation(unittest.TestCase):
+    """Test cases for the <class>.<command>(<arguments>) commands"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        storage.all().clear()
+        self.places = [models.base_model.classes["Place"]()
+                       for _ in range(3)]
+        for price, place in zip((50, 80, 120), self.places):
+            place.price_by_night = price
+            place.city_id = "city-1"
+            storage.new(place)
+
+    def tearDown(self):
+        """Clean up after each test"""
+        storage.all().clear()
+        for path in ("file.json", "file.json.bak"):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def run_command(self, line):
+        """Runs line in a new console and returns its output"""
+        with mock.patch("sys.stdout", new=io.StringIO()) as out:
+            HBNBCommand().onecmd(line)
+        return out.getvalue()
+
+    def test_all_count_show(self):
+        """Test <class>.all(), <class>.count() and <class>.show(<id>)"""
+        self.assertEqual(self.run_command("Place.all()"),
+                         self.run_command("all Place"))
+        self.assertEqual(self.run_command("Place.count()"), "3\n")
+        self.assertEqual(self.run_command("State.count()"), "0\n")
+        place = self.places[0]
+        self.assertEqual(self.run_command(f'Place.show("{place.id}")'),
+                         f"{place}\n")
+        self.assertEqual(self.run_command("Place.show()"),
+                         "** instance id missing **\n")
+
+    def test_destroy(self):
+        """Test <class>.destroy(<id>)"""
+        self.run_command(f'Place.destroy("{self.places[0].id}")')
+        self.assertEqual(self.run_command("Place.count()"), "2\n")
+        self.assertEqual(self.run_command('Place.destroy("missing")'),
+                         "** no instance found **\n")
+
+    def test_update(self):
+        """Test <class>.update(<id>, <attribute>, <value>)"""
+        place = self.places[0]
+        self.run_command(f'Place.update("{place.id}", "max_guest", "4")')
+        self.assertEqual(place.max_guest, 4)
+        self.run_command(f'Place.update("{place.id}", "name", "Loft")')
+        self.assertEqual(place.name, "Loft")
+        self.assertEqual(self.run_command(f'Place.update("{place.id}")'),
+                         "** attribute name missing **\n")
+        self.assertEqual(
+            self.run_command(f'Place.update("{place.id}", "name")'),
+            "** value missing **\n")
+
+    def test_update_schema(self):
+        """Test update converts values with the schema of the class, and
+        refuses those that do not fit"""
+        place = self.places[0]
+        self.run_command(f'update Place {place.id} amenity_ids ["a","b"]')
+        self.assertEqual(place.amenity_ids, ["a", "b"])
+        self.run_command(f"update Place {place.id} latitude 2")
+        self.assertEqual(place.latitude, 2.0)
+        self.assertIsInstance(place.latitude, float)
+        self.assertEqual(
+            self.run_command(f"update Place {place.id} max_guest many"),
+            "** max_guest: not an int: 'many' **\n")
+        self.assertEqual(place.max_guest, 0)
+        self.assertEqual(
+            self.run_command(f'Place.update("{place.id}", {{"name": "Loft", '
+                             f'"max_guest": "x"}})'),
+            "** max_guest: not an int: 'x' **\n")
+        self.assertEqual(place.name, "")
+        self.assertEqual(
+            self.run_command('Place.update_many("", {"max_guest": "x"})'),
+            "** max_guest: not an int: 'x' **\n")
+
+    def test_update_dictionary(self):
+        """Test <class>.update(<id>, <dictionary>) saves once"""
+        place = self.places[0]
+        with mock.patch.object(storage, "save") as save:
+            self.run_command(f'Place.update("{place.id}", {{"name": "Loft", '
+                             f'"max_guest": "4", "latitude": 1.5, '
+                             f'"id": "other"}})')
+        self.assertEqual(save.call_count, 1)
+        self.assertEqual((place.name, place.max_guest, place.latitude),
+                         ("Loft", 4, 1.5))
+        self.assertNotEqual(place.id, "other")
+
+    def test_update_invalid_names(self):
+        """Test dictionaries with keys that are not attribute names change
+        nothing"""
+        place = self.places[0]
+        for attributes, name in [('{1: 2}', "1"),
+                                 ('{"name": "Loft", "a b": 1}', "'a b'"),
+                                 ('{"__dict__": {}}', "'__dict__'")]:
+            self.assertEqual(
+                self.run_command(f'Place.update("{place.id}", {attributes})'),
+                f"** invalid attribute name: {name} **\n")
+            self.assertEqual(
+                self.run_command(f'Place.update_many("", {attributes})'),
+                f"** invalid attribute name: {name} **\n")
+        self.assertEqual(place.name, "")
+
+    def test_update_many(self):
+        """Test <class>.update_many(<conditions>, <dictionary>) updates the
+        matching instances"""
+        output = self.run_command('Place.update_many("price_by_night<100", '
+                                  '{"price_by_night": 100, "name": "Promo"})')
+        self.assertEqual(output, "2\n")
+        self.assertEqual([place.price_by_night for place in self.places],
+                         [100, 100, 120])
+        self.assertEqual(self.run_command(
+            'Place.update_many("", {"city_id": "city-2"})'), "3\n")
+        self.assertEqual(self.run_command(
+            'Place.update_many("price_by_night<", {})'),
+            "** value missing after price_by_night< **\n")
+        self.assertEqual(self.run_command(
+            'Place.update_many("price_by_night<cheap", {})'),
+            "** price_by_night: not an int: 'cheap' **\n")
+        self.assertEqual(self.run_command(
+            'Place.update_many(\'name="\\\\x"\', {})'),
+            '** invalid value: "\\x" **\n')
+        self.assertEqual(self.run_command('Place.update_many("")'),
+                         "** dictionary missing **\n")
+
+    @unittest.skipIf(models.storage_t == "db", "counts file storage writes")
+    def test_update_many_saves_once(self):
+        """Test <class>.update_many writes the store once"""
+        with mock.patch.object(type(storage), "compact",
+                               autospec=True) as compact:
+            self.run_command('Place.update_many("city_id=city-1", '
+                             '{"name": "Promo"})')
+        self.assertEqual(compact.call_count, 1)
+
+    def test_unknown(self):
+        """Test unknown classes and commands print an error"""
+        self.assertEqual(self.run_command("Nope.count()"),
+                         "** class doesn't exist **\n")
+        self.assertEqual(self.run_command("Place.fly()"),
+                         "*** Unknown syntax: Place.fly()\n")
+        self.assertEqual(self.run_command("Place.show(id"),
+                         "*** Unknown syntax: Place.show(id\n")
+
+
+class TestConsoleImportExport(unittest.TestCase):
+    """Test cases for the import and export commands"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        storage.all().clear()
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.path = os.path.join(self.tmp.name, "users.csv")
+
+    def tearDown(self):
+        """Clean up after each test"""
+        storage.all().clear()
+        for path in ("file.json", "file.json.bak"):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def run_command(self, line):
+        """Runs line in a new console and returns its output"""
+        with mock.patch("sys.stdout", new=io.StringIO()) as out:
+            HBNBCommand().onecmd(line)
+        return out.getvalue()
+
+    def test_export_import(self):
+        """Test instances exported to a file are imported back"""
+        user = models.base_model.classes["User"]()
+        user.first_name = "Betty"
+        storage.new(user)
+        self.assertEqual(self.run_command(f"export User {self.path}"), "1\n")
+        storage.all().clear()
+        self.assertEqual(self.run_command(f"import User {self.path}"), "1\n")
+        self.assertEqual(storage.get("User", user.id).first_name, "Betty")
+
+    def test_errors(self):
+        """Test missing arguments and bad files print an error"""
+        self.assertEqual(self.run_command("import"),
+                         "** class name missing **\n")
+        self.assertEqual(self.run_command("export Nope x.csv"),
+                         "** class doesn't exist **\n")
+        self.assertEqual(self.run_command("import User"),
+                         "** file name missing **\n")
+        self.assertEqual(self.run_command(f"import User {self.path}"),
+                         f"** No such file or directory: {self.path} **\n")
+        self.assertEqual(self.run_command("export User users.xml"),
+                         "** unknown file format: .xml **\n")
+        with mock.patch.object(type(storage), "import_file",
+                               side_effect=KeyError("id")):
+            self.assertEqual(self.run_command(f"import User {self.path}"),
+                             "** KeyError: 'id' **\n")
+
+
+class TestConsoleStartup(unittest.TestCase):
+    """Test cases for the cold start of the console"""
+
+    def run_console(self, commands, **env):
+        """Runs console.py as a script in a new interpreter, in an empty
+        directory, with commands piped in and the environment variables
+        env; returns its output and the modules imported by the end, and
+        keeps the names of the files it left in self.files"""
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        code = ("import runpy, sys\n"
+                f"runpy.run_path({os.path.join(root, 'console.py')!r}, "
+                "run_name='__main__')\n"
+                "print(' '.join(sys.modules), file=sys.stderr)")
+        with tempfile.TemporaryDirectory() as tmp:
+            out = subprocess.run([sys.executable, "-c", code],
+                                 cwd=tmp, input=commands,
+                                 env=dict(os.environ, PYTHONPATH=root,
+                                          HBNB_DB_PATH="hbnb.db", **env),
+                                 capture_output=True, text=True, check=True)
+            self.files = sorted(os.listdir(tmp))
+        return out.stdout, out.stderr.split()
+
+    def test_help_loads_nothing(self):
+        """Test help neither loads the store nor imports the models"""
+        out, modules = self.run_console("help quit\n")
+        self.assertIn("Quit command to exit the program", out)
+        self.assertNotIn("models.engine.file_storage", modules)
+        self.assertNotIn("models.engine.db_storage", modules)
+        self.assertNotIn("models.user", modules)
+
+    def test_storage_loaded_on_first_use(self):
+        """Test the store is loaded by the first command using it, which
+        imports only the models it names"""
+        out, modules = self.run_console("show User 1\n")
+        self.assertIn("** no instance found **", out)
+        self.assertIn("models.user", modules)
+        self.assertNotIn("models.place", modules)
+
+        out, modules = self.run_console("create User\nUser.count()\n")
+        self.assertIn("(hbnb) 1\n", out)
+
+    @unittest.skipIf(models.storage_t == "db", "tests file storage files")
+    def test_journal_variable(self):
+        """Test HBNB_JOURNAL makes the console append to the journal
+        rather than rewrite file.json"""
+        self.run_console("create User\n", HBNB_JOURNAL="1")
+        self.assertEqual(self.files, ["file.json.journal"])
+        self.run_console("create User\n")
+        self.assertEqual(self.files, ["file.json"])
+
+
+if __name__ == '__main__':
+    unittest.main()
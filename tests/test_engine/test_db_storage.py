@@ -0,0 +1,191 @@
+#!/usr/bin/python3
+"""
+Unit tests for DBStorage class
+"""
+import unittest
+import os
+import sqlite3
+from unittest import mock
+import models
+from models.engine.db_storage import DBStorage
+from models.base_model import BaseModel
+from models.user import User
+from models.city import City
+from models.review import Review
+
+
+class TestDBStorage(unittest.TestCase):
+    """Test cases for DBStorage class"""
+
+    path = "test_hbnb.db"
+
+    def setUp(self):
+        """Set up test fixtures: a DBStorage used as models.storage"""
+        self.storage = DBStorage(self.path)
+        patcher = mock.patch.object(models, "storage", self.storage)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        """Clean up after each test"""
+        self.storage.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    def reopen(self):
+        """Replaces self.storage by a new one reloaded from the database"""
+        self.storage.close()
+        self.storage = DBStorage(self.path)
+        models.storage = self.storage
+        self.storage.reload()
+
+    def test_env_path(self):
+        """Test the database path defaults to HBNB_DB_PATH"""
+        with mock.patch.dict(os.environ, {"HBNB_DB_PATH": self.path}):
+            storage = DBStorage()
+        self.assertEqual(storage.path, self.path)
+        storage.close()
+
+    def test_new_and_all(self):
+        """Test new instances are listed by all()"""
+        user = User()
+        key = f"User.{user.id}"
+        self.assertIs(self.storage.all()[key], user)
+        self.assertEqual(self.storage.all(User), {key: user})
+        self.assertEqual(self.storage.all("City"), {})
+        self.assertIs(self.storage.get("User", user.id), user)
+        self.assertEqual(list(self.storage.stream("User")), [user])
+        self.assertEqual(list(self.storage.stream()), [user])
+        self.assertEqual(self.storage.count("User"), 1)
+        self.assertEqual(self.storage.count("City"), 0)
+        self.assertEqual(self.storage.count(), 1)
+
+    def test_save_and_reload(self):
+        """Test objects round-trip through the database"""
+        user = User()
+        user.email = "test@example.com"
+        base_model = BaseModel()
+        user.save()
+
+        self.reopen()
+        self.assertEqual(self.storage.get(User, user.id).to_dict(),
+                         user.to_dict())
+        self.assertEqual(self.storage.get(BaseModel, base_model.id).to_dict(),
+                         base_model.to_dict())
+
+    def test_one_table_per_class(self):
+        """Test each class has its own table with indexed foreign keys"""
+        City().state_id = "state-1"
+        Review()
+        self.storage.save()
+
+        connection = sqlite3.connect(self.path)
+        tables = {name for (name,) in connection.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table'")}
+        indexes = {name for (name,) in connection.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'index'")}
+        rows = connection.execute('SELECT state_id FROM "City"').fetchall()
+        connection.close()
+        self.assertEqual(tables, {"City", "Review"})
+        self.assertTrue({"City_state_id", "Review_place_id",
+                         "Review_user_id"} <= indexes)
+        self.assertEqual(rows, [("state-1",)])
+
+    def test_save_writes_changes_only(self):
+        """Test save() writes updated and destroyed objects"""
+        user = User()
+        other = User()
+        self.storage.save()
+        user.first_name = "Betty"
+        self.storage.delete(other)
+        self.storage.save()
+
+        self.reopen()
+        self.assertEqual(self.storage.get(User, user.id).first_name, "Betty")
+        self.assertIsNone(self.storage.get(User, other.id))
+
+    def test_find(self):
+        """Test find() uses the indexes and follows updates"""
+        city = City()
+        city.state_id = "state-1"
+        City().state_id = "state-2"
+        self.assertEqual(list(self.storage.find(City, state_id="state-1")),
+                         [f"City.{city.id}"])
+        city.state_id = "state-2"
+        self.assertEqual(self.storage.find(City, state_id="state-1"), {})
+        self.assertEqual(len(self.storage.find(City, state_id="state-2")), 2)
+
+    def test_reload_progress(self):
+        """Test reload() reports the rows it did not read"""
+        for _ in range(3):
+            User()
+        self.storage.save()
+        self.storage.close()
+        self.storage = DBStorage(self.path)
+        calls = []
+        self.storage.reload(lambda *args: calls.append(args))
+        self.assertEqual(calls, [(0, 0, 3)])
+
+    def test_reads_on_demand(self):
+        """Test get(), find() on an indexed field and count() read only the
+        rows they need"""
+        cities = [City() for _ in range(4)]
+        for i, city in enumerate(cities):
+            city.state_id = f"state-{i % 2}"
+        User()
+        self.storage.save()
+        self.reopen()
+        with mock.patch.object(City, "from_dict",
+                               side_effect=City.from_dict) as from_dict:
+            self.assertEqual(self.storage.count(City), 4)
+            self.assertEqual(self.storage.count(), 5)
+            self.assertEqual(from_dict.call_count, 0)
+            self.assertEqual(self.storage.get(City, cities[0].id).id,
+                             cities[0].id)
+            self.assertIsNone(self.storage.get(City, "missing"))
+            self.assertEqual(from_dict.call_count, 1)
+            found = self.storage.find(City, state_id="state-1")
+            self.assertEqual(set(found), {f"City.{cities[1].id}",
+                                          f"City.{cities[3].id}"})
+            self.assertEqual(from_dict.call_count, 3)
+
+    def test_changes_before_save(self):
+        """Test instances created, changed or destroyed in memory win over
+        their rows until saved"""
+        cities = [City() for _ in range(3)]
+        for city in cities:
+            city.state_id = "state-1"
+        self.storage.save()
+        self.reopen()
+        moved = self.storage.get(City, cities[0].id)
+        moved.state_id = "state-2"
+        self.storage.delete(self.storage.get(City, cities[1].id))
+        City().state_id = "state-1"
+        self.assertEqual(len(self.storage.find(City, state_id="state-1")), 2)
+        self.assertEqual(list(self.storage.find(City, state_id="state-2")),
+                         [f"City.{moved.id}"])
+        self.assertEqual(self.storage.count(City), 3)
+        self.assertIsNone(self.storage.get(City, cities[1].id))
+        self.assertEqual(len(self.storage.all(City)), 3)
+
+    def test_reload_empty(self):
+        """Test reload() of an empty database loads nothing"""
+        self.storage.reload()
+        self.assertEqual(self.storage.all(), {})
+
+    def test_batch(self):
+        """Test saves inside a batch are written once, at the end"""
+        with self.storage.batch():
+            for _ in range(3):
+                User().save()
+            other = DBStorage(self.path)
+            other.reload()
+            self.assertEqual(other.all(), {})
+            other.close()
+
+        self.reopen()
+        self.assertEqual(len(self.storage.all(User)), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
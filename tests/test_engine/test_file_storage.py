@@ -5,11 +5,25 @@ Unit tests for FileStorage class
 import unittest
 import os
 import json
-from models.engine.file_storage import FileStorage
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+from unittest import mock
+import models
+from models.engine.file_storage import FileStorage, StaleStorageError
 from models.base_model import BaseModel
 from models.user import User
+from models.city import City
+from models.place import Place
+from models.review import Review
 
 
+@unittest.skipIf(models.storage_t == "db", "not testing file storage")
 class TestFileStorage(unittest.TestCase):
     """Test cases for FileStorage class"""
 
@@ -18,17 +32,19 @@ class TestFileStorage(unittest.TestCase):
         self.storage = FileStorage()
         # Clear storage before each test
         self.storage.all().clear()
-        # Remove file.json if it exists
-        if os.path.exists("file.json"):
-            os.remove("file.json")
+        # Remove file.json and its backup if they exist
+        for path in ("file.json", "file.json.bak"):
+            if os.path.exists(path):
+                os.remove(path)
 
     def tearDown(self):
         """Clean up after each test"""
         # Clear storage after each test
         self.storage.all().clear()
-        # Remove file.json if it exists
-        if os.path.exists("file.json"):
-            os.remove("file.json")
+        # Remove file.json and its backup if they exist
+        for path in ("file.json", "file.json.bak"):
+            if os.path.exists(path):
+                os.remove(path)
 
     def test_all_method(self):
         """Test all method returns __objects dictionary"""
@@ -162,6 +178,1313 @@ class TestFileStorage(unittest.TestCase):
         self.assertIn(key, storage2.all())
         self.assertEqual(storage1.all()[key], storage2.all()[key])
 
+    def test_save_writes_one_entry_per_line(self):
+        """Test the snapshot holds one object per line"""
+        BaseModel()
+        User()
+        self.storage.save()
+
+        with open("file.json", "r", encoding="utf-8") as f:
+            lines = f.read().splitlines()
+        self.assertEqual(len(lines), 2)
+
+    def test_save_encodes_only_dirty_objects(self):
+        """Test save only calls to_dict on objects changed since last save"""
+        user = User()
+        BaseModel()
+        self.storage.save()
+
+        user.first_name = "Betty"
+        with mock.patch.object(BaseModel, "to_dict",
+                               autospec=True,
+                               side_effect=BaseModel.to_dict) as to_dict:
+            self.storage.save()
+        self.assertEqual(to_dict.call_count, 1)
+        self.assertIs(to_dict.call_args[0][0], user)
+
+        with open("file.json", "r", encoding="utf-8") as f:
+            data = json.load(f)
+        self.assertEqual(data[f"User.{user.id}"]["first_name"], "Betty")
+
+    def test_save_after_external_removal(self):
+        """Test save drops objects removed directly from all()"""
+        base_model = BaseModel()
+        self.storage.save()
+        del self.storage.all()[f"BaseModel.{base_model.id}"]
+        self.storage.save()
+
+        with open("file.json", "r", encoding="utf-8") as f:
+            self.assertEqual(json.load(f), {})
+
+    def test_reload_reports_progress(self):
+        """Test reload reports progress while streaming the file"""
+        for _ in range(5):
+            BaseModel()
+        self.storage.save()
+        self.storage.all().clear()
+
+        calls = []
+        FileStorage.progress_every = 2
+        try:
+            self.storage.reload(progress=lambda *args: calls.append(args))
+        finally:
+            FileStorage.progress_every = 10000
+        size = os.path.getsize("file.json")
+        self.assertEqual([call[0] for call in calls], [2, 4, 5])
+        self.assertEqual(calls[-1], (5, size, size))
+        self.assertEqual(len(self.storage.all()), 5)
+
+    def test_hydrate_many(self):
+        """Test hydrate_many registers clean instances once"""
+        user = User()
+        user.email = "test@example.com"
+        entries = [(f"User.{user.id}", user.to_dict())]
+        self.storage.all().clear()
+
+        self.storage.hydrate_many(entries)
+        reloaded = self.storage.all()[f"User.{user.id}"]
+        self.assertIsInstance(reloaded, User)
+        self.assertEqual(reloaded.email, "test@example.com")
+        self.assertNotIn(f"User.{user.id}",
+                         FileStorage._FileStorage__dirty)
+
+    def test_all_with_class(self):
+        """Test all(cls) only returns instances of cls"""
+        base_model = BaseModel()
+        user = User()
+        expected = {f"User.{user.id}": user}
+        self.assertEqual(self.storage.all(User), expected)
+        self.assertEqual(self.storage.all("User"), expected)
+        self.assertEqual(self.storage.all("State"), {})
+        self.assertIn(f"BaseModel.{base_model.id}", self.storage.all())
+
+    def test_reload_converts_types(self):
+        """Test values saved with another type than their field declares
+        are converted on reload"""
+        place = Place()
+        with open("file.json", "w", encoding="utf-8") as f:
+            json.dump({f"Place.{place.id}": dict(
+                place.to_dict(), number_rooms="3", latitude=1,
+                amenity_ids='["a"]')}, f)
+        self.storage.all().clear()
+        self.storage.reload()
+        place = self.storage.get(Place, place.id)
+        self.assertEqual((place.number_rooms, place.latitude,
+                          place.amenity_ids), (3, 1.0, ["a"]))
+        self.assertIsInstance(place.latitude, float)
+
+    def test_stream(self):
+        """Test stream yields the instances of a class, or of every
+        class"""
+        base_model = BaseModel()
+        user = User()
+        self.assertEqual(list(self.storage.stream(User)), [user])
+        self.assertEqual(list(self.storage.stream("State")), [])
+        self.assertEqual(list(self.storage.stream()),
+                         list(self.storage.all().values()))
+        self.assertIn(base_model, self.storage.stream())
+
+    def test_count(self):
+        """Test count gives the number of instances of a class, or of
+        every class"""
+        BaseModel()
+        User()
+        User()
+        self.assertEqual(self.storage.count(User), 2)
+        self.assertEqual(self.storage.count("State"), 0)
+        self.assertEqual(self.storage.count(), 3)
+
+    def test_find_uses_indexes(self):
+        """Test find returns instances matching every criterion"""
+        city = City()
+        city.state_id = "state-1"
+        other = City()
+        other.state_id = "state-2"
+        place = Place()
+        place.city_id = city.id
+        place.user_id = "user-1"
+
+        self.assertEqual(self.storage.find(City, state_id="state-1"),
+                         {f"City.{city.id}": city})
+        self.assertEqual(
+            self.storage.find("Place", city_id=city.id, user_id="user-1"),
+            {f"Place.{place.id}": place})
+        self.assertEqual(self.storage.find(Place, city_id=other.id), {})
+
+    def test_find_follows_updates(self):
+        """Test indexes follow attribute updates and deletes"""
+        city = City()
+        city.state_id = "state-1"
+        city.state_id = "state-2"
+        self.assertEqual(self.storage.find(City, state_id="state-1"), {})
+        self.assertEqual(self.storage.find(City, state_id="state-2"),
+                         {f"City.{city.id}": city})
+
+        self.storage.delete(city)
+        self.assertEqual(self.storage.find(City, state_id="state-2"), {})
+
+    def test_find_unindexed_field(self):
+        """Test find falls back to scanning the class bucket"""
+        city = City()
+        city.name = "Kigali"
+        City().name = "Nairobi"
+        self.assertEqual(self.storage.find(City, name="Kigali"),
+                         {f"City.{city.id}": city})
+
+    def test_batch_coalesces_saves(self):
+        """Test saves inside a batch are written once, at the end"""
+        with mock.patch.object(FileStorage, "compact",
+                               autospec=True) as compact:
+            with self.storage.batch():
+                for _ in range(3):
+                    User().save()
+                with self.storage.batch():
+                    User().save()
+                self.assertEqual(compact.call_count, 0)
+            self.assertEqual(compact.call_count, 1)
+
+            with self.storage.batch():
+                pass
+            self.assertEqual(compact.call_count, 1)
+
+    def test_batch_flush_every(self):
+        """Test a batch saves every flush_every saves"""
+        with mock.patch.object(FileStorage, "compact",
+                               autospec=True) as compact:
+            self.storage.begin(flush_every=2)
+            for _ in range(5):
+                User().save()
+            self.assertEqual(compact.call_count, 2)
+            self.storage.commit()
+            self.assertEqual(compact.call_count, 3)
+            self.storage.commit()
+            self.assertEqual(compact.call_count, 3)
+
+    def test_batch_saves_on_error(self):
+        """Test a batch interrupted by an exception still saves"""
+        with self.assertRaises(ZeroDivisionError):
+            with self.storage.batch():
+                user = User()
+                user.save()
+                1 / 0
+        with open("file.json", "r", encoding="utf-8") as f:
+            self.assertIn(f"User.{user.id}", json.load(f))
+
+    def test_batch_per_thread(self):
+        """Test a batch does not defer the saves of other threads"""
+        with mock.patch.object(FileStorage, "compact",
+                               autospec=True) as compact:
+            with self.storage.batch():
+                thread = threading.Thread(target=lambda: User().save())
+                thread.start()
+                thread.join()
+                self.assertEqual(compact.call_count, 1)
+                User().save()
+                self.assertEqual(compact.call_count, 1)
+            self.assertEqual(compact.call_count, 2)
+
+
+@unittest.skipIf(models.storage_t == "db", "not testing file storage")
+class TestFileStorageJournal(unittest.TestCase):
+    """Test cases for the FileStorage journal mode"""
+
+    journal = "file.json.journal"
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.storage = FileStorage()
+        self.storage.all().clear()
+        FileStorage.journal_mode = True
+        for path in ("file.json", "file.json.bak", self.journal):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def tearDown(self):
+        """Clean up after each test"""
+        self.storage.all().clear()
+        FileStorage.journal_mode = False
+        for path in ("file.json", "file.json.bak", self.journal):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def read_journal(self):
+        """Returns the records currently in the journal"""
+        with open(self.journal, "r", encoding="utf-8") as f:
+            return [json.loads(line) for line in f]
+
+    def test_save_appends_only_changes(self):
+        """Test save appends one record per changed object"""
+        first = BaseModel()
+        second = BaseModel()
+        self.storage.save()
+        self.assertEqual(len(self.read_journal()), 2)
+        self.assertFalse(os.path.exists("file.json"))
+
+        first.name = "changed"
+        first.save()
+        records = self.read_journal()
+        self.assertEqual(len(records), 3)
+        self.assertEqual(records[-1]["op"], "put")
+        self.assertEqual(records[-1]["key"], f"BaseModel.{first.id}")
+        self.assertEqual(records[-1]["value"]["name"], "changed")
+
+    def test_delete_appends_record(self):
+        """Test destroying an object appends a delete record"""
+        user = User()
+        self.storage.save()
+        self.storage.delete(user)
+        self.storage.save()
+
+        record = self.read_journal()[-1]
+        self.assertEqual(record, {"op": "del", "key": f"User.{user.id}"})
+        self.assertNotIn(f"User.{user.id}", self.storage.all())
+
+    def test_reload_replays_journal(self):
+        """Test reload replays the journal on top of the snapshot"""
+        kept = User()
+        kept.email = "kept@example.com"
+        gone = User()
+        self.storage.compact()
+
+        kept.email = "new@example.com"
+        kept.save()
+        self.storage.delete(gone)
+        self.storage.save()
+
+        self.storage.all().clear()
+        self.storage.reload()
+        self.assertEqual(
+            self.storage.all()[f"User.{kept.id}"].email, "new@example.com")
+        self.assertNotIn(f"User.{gone.id}", self.storage.all())
+
+    def test_reload_ignores_torn_record(self):
+        """Test reload stops at a partially written journal record"""
+        user = User()
+        self.storage.save()
+        with open(self.journal, "a", encoding="utf-8") as f:
+            f.write('{"op": "put", "key": "User.x", "val')
+
+        self.storage.all().clear()
+        self.storage.reload()
+        self.assertEqual(list(self.storage.all()), [f"User.{user.id}"])
+
+    def test_compact_folds_journal(self):
+        """Test compact writes a snapshot and removes the journal"""
+        user = User()
+        self.storage.save()
+        self.storage.compact()
+
+        self.assertFalse(os.path.exists(self.journal))
+        with open("file.json", "r", encoding="utf-8") as f:
+            self.assertIn(f"User.{user.id}", json.load(f))
+
+    def test_journal_limit_triggers_compaction(self):
+        """Test the journal is compacted once it passes journal_limit"""
+        FileStorage.journal_limit = 2
+        try:
+            for _ in range(3):
+                BaseModel()
+            self.storage.save()
+        finally:
+            FileStorage.journal_limit = 10000
+        self.assertFalse(os.path.exists(self.journal))
+        self.assertTrue(os.path.exists("file.json"))
+
+
+@unittest.skipIf(models.storage_t == "db", "not testing file storage")
+class TestFileStorageLazy(unittest.TestCase):
+    """Test cases for the FileStorage lazy mode"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.storage = FileStorage()
+        self.storage.all().clear()
+        self.users = [User() for _ in range(3)]
+        for user in self.users:
+            user.first_name = user.id[:4]
+        self.city = City()
+        self.city.state_id = "state-1"
+        self.storage.save()
+        self.storage.all().clear()
+        FileStorage.lazy_mode = True
+        self.storage.reload()
+
+    def tearDown(self):
+        """Clean up after each test"""
+        FileStorage.lazy_mode = False
+        FileStorage.max_resident = None
+        FileStorage.stream_chunk = 1000
+        self.storage.all().clear()
+        for path in ("file.json", "file.json.bak"):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def loaded(self):
+        """Returns the keys of the instances built so far"""
+        return set(FileStorage._FileStorage__objects)
+
+    def test_reload_builds_nothing(self):
+        """Test reload only indexes the file"""
+        self.assertEqual(self.loaded(), set())
+
+    def test_get_builds_one_instance(self):
+        """Test get only builds the requested instance"""
+        user = self.storage.get(User, self.users[0].id)
+        self.assertEqual(user.first_name, self.users[0].first_name)
+        self.assertIsInstance(user.created_at, datetime)
+        self.assertEqual(self.loaded(), {f"User.{user.id}"})
+        self.assertIs(self.storage.get("User", user.id), user)
+        self.assertIsNone(self.storage.get(User, "missing"))
+
+    def test_count_builds_nothing(self):
+        """Test count does not build lazily loaded instances"""
+        self.assertEqual(self.storage.count(User), 3)
+        self.assertEqual(self.storage.count(), 4)
+        self.assertEqual(self.loaded(), set())
+
+    def test_all_with_class_builds_one_class(self):
+        """Test all(cls) and find only build instances of cls"""
+        self.assertEqual(len(self.storage.all(User)), 3)
+        self.assertEqual(len(self.loaded()), 3)
+        self.assertEqual(list(self.storage.find(City, state_id="state-1")),
+                         [f"City.{self.city.id}"])
+        self.assertEqual(len(self.storage.all()), 4)
+
+    def test_save_keeps_unloaded_objects(self):
+        """Test save copies objects that were never built"""
+        user = self.storage.get(User, self.users[0].id)
+        user.last_name = "Holberton"
+        user.save()
+        self.assertEqual(len(self.loaded()), 1)
+
+        with open("file.json", "r", encoding="utf-8") as f:
+            data = json.load(f)
+        self.assertEqual(len(data), 4)
+        self.assertEqual(data[f"User.{user.id}"]["last_name"], "Holberton")
+        self.assertEqual(data[f"City.{self.city.id}"]["state_id"], "state-1")
+
+        other = self.storage.get(User, self.users[1].id)
+        self.assertEqual(other.first_name, self.users[1].first_name)
+
+    def test_delete_unloaded_object(self):
+        """Test an instance can be destroyed before it was built"""
+        self.storage.delete(self.users[0])
+        self.storage.save()
+        self.assertIsNone(self.storage.get(User, self.users[0].id))
+        self.assertEqual(len(self.storage.all()), 3)
+
+    def test_eviction(self):
+        """Test clean instances are dropped past max_resident"""
+        FileStorage.max_resident = 1
+        first = self.storage.get(User, self.users[0].id)
+        second = self.storage.get(User, self.users[1].id)
+        self.assertEqual(self.loaded(), {f"User.{second.id}"})
+
+        # Changing an evicted instance brings it back
+        first.first_name = "Betty"
+        self.assertIs(self.storage.get(User, first.id), first)
+        self.storage.save()
+        self.storage.all().clear()
+        self.storage.reload()
+        self.assertEqual(self.storage.get(User, first.id).first_name, "Betty")
+
+    def test_eviction_keeps_held_instance(self):
+        """Test an instance held across its eviction is the one built
+        again, so changes made through it are saved"""
+        FileStorage.max_resident = 1
+        held = self.storage.get(User, self.users[0].id)
+        self.storage.get(User, self.users[1].id)
+        self.storage.get(User, self.users[2].id)
+        self.assertNotIn(f"User.{held.id}", self.loaded())
+        self.assertIs(self.storage.get(User, held.id), held)
+        self.storage.get(User, self.users[1].id)
+        held.first_name = "CHANGED"
+        held.save()
+        self.storage.all().clear()
+        self.storage.reload()
+        self.assertEqual(self.storage.get(User, held.id).first_name,
+                         "CHANGED")
+
+    def test_stream(self):
+        """Test stream yields every instance, building them a chunk at a
+        time and keeping at most max_resident"""
+        FileStorage.max_resident = 1
+        FileStorage.stream_chunk = 2
+        seen = []
+        for obj in self.storage.stream(User):
+            seen.append(obj.id)
+            self.assertLessEqual(len(self.loaded()), 2)
+        self.assertEqual(sorted(seen), sorted(user.id for user in self.users))
+        self.assertEqual(len(list(self.storage.stream())), 4)
+        self.assertEqual(len(self.loaded()), 1)
+
+
+@unittest.skipIf(models.storage_t == "db", "not testing file storage")
+class TestFileStorageCrashSafety(unittest.TestCase):
+    """Test cases for atomic saves, backups and fsync policies"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.storage = FileStorage()
+        self.storage.all().clear()
+
+    def tearDown(self):
+        """Clean up after each test"""
+        FileStorage.fsync = "batch"
+        FileStorage.lazy_mode = False
+        self.storage.all().clear()
+        for path in ("file.json", "file.json.bak", "file.json.tmp"):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def test_save_keeps_backup(self):
+        """Test save keeps the previous snapshot as file.json.bak"""
+        user = User()
+        self.storage.save()
+        self.assertFalse(os.path.exists("file.json.bak"))
+        with open("file.json", "rb") as f:
+            first = f.read()
+
+        user.first_name = "Betty"
+        self.storage.save()
+        with open("file.json.bak", "rb") as f:
+            self.assertEqual(f.read(), first)
+        self.assertFalse(os.path.exists("file.json.tmp"))
+
+    def test_torn_snapshot_falls_back_to_backup(self):
+        """Test reload loads the backup when file.json is truncated"""
+        user = User()
+        self.storage.save()
+        other = User()
+        user.first_name = "Betty"
+        self.storage.save()
+        with open("file.json", "rb") as f:
+            data = f.read()
+        with open("file.json", "wb") as f:
+            f.write(data[:data.index(b"\n") + 10])
+
+        self.storage.all().clear()
+        with self.assertWarns(RuntimeWarning):
+            self.storage.reload()
+        # Only the backup's version survives, not the torn entries
+        self.assertEqual(list(self.storage.all()), [f"User.{user.id}"])
+        self.assertEqual(self.storage.get(User, user.id).first_name, "")
+        self.assertIsNone(self.storage.get(User, other.id))
+
+        # The backup is kept until a good snapshot replaces file.json
+        with open("file.json.bak", "rb") as f:
+            backup = f.read()
+        self.storage.save()
+        with open("file.json.bak", "rb") as f:
+            self.assertEqual(f.read(), backup)
+        self.storage.save()
+        self.storage.all().clear()
+        self.storage.reload()
+        self.assertIn(f"User.{user.id}", self.storage.all())
+
+    def test_torn_snapshot_lazy_mode(self):
+        """Test the backup is loaded in full in lazy mode"""
+        user = User()
+        self.storage.save()
+        User()
+        self.storage.save()
+        with open("file.json", "wb") as f:
+            f.write(b'{"User.x": {"id"')
+
+        FileStorage.lazy_mode = True
+        self.storage.all().clear()
+        with self.assertWarns(RuntimeWarning):
+            self.storage.reload()
+        self.assertEqual(list(self.storage.all()), [f"User.{user.id}"])
+
+    def test_fsync_policies(self):
+        """Test when each fsync policy flushes to disk"""
+        User()
+        for policy, calls in (("never", 0), ("always", 4), ("batch", 1)):
+            FileStorage.fsync = policy
+            FileStorage._FileStorage__synced_at = 0.0
+            with mock.patch("os.fsync") as fsync:
+                self.storage.save()
+                self.storage.save()
+            self.assertEqual(fsync.call_count, calls, policy)
+
+
+@unittest.skipIf(models.storage_t == "db", "not testing file storage")
+class TestFileStorageAsync(unittest.TestCase):
+    """Test cases for FileStorage with the background writer"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.storage = FileStorage()
+        self.storage.all().clear()
+        # Start from an empty store with nothing left dirty
+        self.storage.save()
+        os.remove("file.json")
+        FileStorage.async_mode = True
+        FileStorage.flush_interval = 60
+
+    def tearDown(self):
+        """Clean up after each test"""
+        try:
+            self.storage.flush()
+        finally:
+            FileStorage.async_mode = False
+            FileStorage.flush_interval = 1.0
+            FileStorage.high_water = 1000
+            self.storage.all().clear()
+            for path in ("file.json", "file.json.bak"):
+                if os.path.exists(path):
+                    os.remove(path)
+
+    def saved(self):
+        """Returns the snapshot as a dictionary"""
+        with open("file.json", "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def test_save_is_deferred_until_flush(self):
+        """Test save returns before writing and flush waits for it"""
+        user = User()
+        user.save()
+        self.assertFalse(os.path.exists("file.json"))
+        self.storage.flush()
+        self.assertIn(f"User.{user.id}", self.saved())
+
+    def test_high_water_wakes_writer(self):
+        """Test the writer saves once high_water objects are dirty"""
+        FileStorage.high_water = 3
+        for _ in range(3):
+            User().save()
+        for _ in range(500):
+            if os.path.exists("file.json"):
+                break
+            time.sleep(0.01)
+        self.assertEqual(len(self.saved()), 3)
+
+    def test_writer_snapshot_is_consistent(self):
+        """Test changes made while the writer runs are not lost"""
+        FileStorage.flush_interval = 0
+        users = [User() for _ in range(200)]
+        for i in range(20):
+            for user in users:
+                user.first_name = f"name {i}"
+            self.storage.save()
+        self.storage.flush()
+
+        self.storage.all().clear()
+        self.storage.reload()
+        self.assertEqual(len(self.storage.all()), 200)
+        for obj in self.storage.all().values():
+            self.assertEqual(obj.first_name, "name 19")
+
+    def test_flush_raises_write_errors(self):
+        """Test flush re-raises the error of a failed write"""
+        User().save()
+        with mock.patch.object(FileStorage, "compact",
+                               side_effect=OSError("disk full")):
+            with self.assertRaises(OSError):
+                self.storage.flush()
+        self.storage.flush()
+
+    def test_flush_at_exit(self):
+        """Test pending saves are written at interpreter exit"""
+        root = os.path.dirname(os.path.dirname(os.path.dirname(
+            os.path.abspath(__file__))))
+        with tempfile.TemporaryDirectory() as tmp:
+            env = dict(os.environ, HBNB_ASYNC_SAVE="1", PYTHONPATH=root)
+            script = ("from models.user import User\n"
+                      "user = User()\nuser.save()\nprint(user.id)")
+            out = subprocess.run([sys.executable, "-c", script], cwd=tmp,
+                                 env=env, capture_output=True, text=True,
+                                 check=True)
+            with open(os.path.join(tmp, "file.json"), "r",
+                      encoding="utf-8") as f:
+                self.assertIn(f"User.{out.stdout.strip()}", json.load(f))
+
+
+@unittest.skipIf(models.storage_t == "db", "not testing file storage")
+class TestFileStorageThreads(unittest.TestCase):
+    """Stress test of FileStorage used from many threads"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.storage = FileStorage()
+        self.storage.all().clear()
+        FileStorage.thread_safe = True
+        # The background writer saves while the threads change objects
+        FileStorage.async_mode = True
+        FileStorage.flush_interval = 0
+
+    def tearDown(self):
+        """Clean up after each test"""
+        try:
+            self.storage.flush()
+        finally:
+            FileStorage.thread_safe = False
+            FileStorage.async_mode = False
+            FileStorage.flush_interval = 1.0
+        self.storage.all().clear()
+        for path in ("file.json", "file.json.bak", "file.json.journal"):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def test_all_returns_copy(self):
+        """Test all() returns a copy in thread_safe mode"""
+        user = User()
+        objects = self.storage.all()
+        self.assertIsNot(objects, FileStorage._FileStorage__objects)
+        objects.clear()
+        self.assertIn(f"User.{user.id}", self.storage.all())
+
+    def test_concurrent_create_update_destroy(self):
+        """Test threads creating, updating and destroying objects while
+        others list and save them"""
+        errors = []
+
+        def worker(seed):
+            rng = random.Random(seed)
+            mine = []
+            try:
+                for i in range(150):
+                    op = rng.random()
+                    if op < 0.4 or not mine:
+                        place = Place()
+                        place.city_id = f"city-{seed}"
+                        mine.append(place)
+                        place.save()
+                    elif op < 0.7:
+                        place = rng.choice(mine)
+                        place.name = f"name {seed}-{i}"
+                        place.save()
+                    elif op < 0.85:
+                        place = mine.pop(rng.randrange(len(mine)))
+                        self.storage.delete(place)
+                        self.storage.save()
+                    else:
+                        for obj in self.storage.all().values():
+                            str(obj)
+                        found = self.storage.find(Place,
+                                                  city_id=f"city-{seed}")
+                        if set(found) != {f"Place.{p.id}" for p in mine}:
+                            errors.append(f"find mismatch in {seed}")
+            except Exception as e:
+                errors.append(repr(e))
+
+        threads = [threading.Thread(target=worker, args=(seed,))
+                   for seed in range(8)]
+        # Switch threads as often as possible to provoke races
+        interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+        try:
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        finally:
+            sys.setswitchinterval(interval)
+        self.assertEqual(errors, [])
+        self.storage.flush()
+
+        expected = {key: obj.to_dict()
+                    for key, obj in self.storage.all().items()}
+        FileStorage._FileStorage__objects.clear()
+        self.storage.reload()
+        self.assertEqual({key: obj.to_dict()
+                          for key, obj in self.storage.all().items()},
+                         expected)
+
+
+@unittest.skipIf(models.storage_t == "db", "not testing file storage")
+class TestFileStorageBinary(unittest.TestCase):
+    """Test cases for FileStorage with the binary snapshot format"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.storage = FileStorage()
+        self.storage.all().clear()
+        FileStorage.format = "binary"
+
+    def tearDown(self):
+        """Clean up after each test"""
+        FileStorage.format = "json"
+        FileStorage.lazy_mode = False
+        FileStorage.journal_mode = False
+        self.storage.all().clear()
+        for path in ("file.json", "file.hbnb", "file.hbnb.bak",
+                     "file.hbnb.journal"):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def test_save_and_reload(self):
+        """Test objects round-trip through file.hbnb"""
+        user = User()
+        user.email = "test@example.com"
+        self.storage.save()
+        self.assertTrue(os.path.exists("file.hbnb"))
+        self.assertFalse(os.path.exists("file.json"))
+
+        self.storage.all().clear()
+        self.storage.reload()
+        reloaded = self.storage.all()[f"User.{user.id}"]
+        self.assertEqual(reloaded.to_dict(), user.to_dict())
+
+    def test_lazy_and_journal(self):
+        """Test lazy mode and journal mode work with file.hbnb"""
+        user = User()
+        City().state_id = "state-1"
+        self.storage.save()
+        self.storage.all().clear()
+        FileStorage.lazy_mode = True
+        FileStorage.journal_mode = True
+        self.storage.reload()
+
+        reloaded = self.storage.get(User, user.id)
+        reloaded.first_name = "Betty"
+        reloaded.save()
+        self.assertTrue(os.path.exists("file.hbnb.journal"))
+
+        self.storage.all().clear()
+        self.storage.reload()
+        self.assertEqual(self.storage.get(User, user.id).first_name, "Betty")
+        self.assertEqual(len(self.storage.find(City, state_id="state-1")), 1)
+
+    def test_switch_format(self):
+        """Test objects loaded from one format are saved in another"""
+        user = User()
+        self.storage.save()
+        self.storage.all().clear()
+        FileStorage.lazy_mode = True
+        self.storage.reload()
+
+        FileStorage.format = "json"
+        self.storage.save()
+        with open("file.json", "r", encoding="utf-8") as f:
+            self.assertIn(f"User.{user.id}", json.load(f))
+
+
+@unittest.skipIf(models.storage_t == "db", "not testing file storage")
+class TestFileStorageShared(unittest.TestCase):
+    """Test cases for FileStorage shared between processes"""
+
+    files = ("file.json", "file.json.bak", "file.json.journal",
+             "file.json.lock")
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.storage = FileStorage()
+        self.storage.all().clear()
+        for path in self.files:
+            if os.path.exists(path):
+                os.remove(path)
+        FileStorage.shared = True
+        FileStorage.journal_mode = True
+        self.storage.reload()
+
+    def tearDown(self):
+        """Clean up after each test"""
+        FileStorage.shared = False
+        FileStorage.on_conflict = "merge"
+        FileStorage.journal_mode = False
+        self.storage.all().clear()
+        for path in self.files:
+            if os.path.exists(path):
+                os.remove(path)
+
+    def start_worker(self, code, journal_mode=True):
+        """Starts another process running code against the store"""
+        root = os.path.dirname(os.path.dirname(os.path.dirname(
+            os.path.abspath(__file__))))
+        env = dict(os.environ, HBNB_SHARED="1", HBNB_FSYNC="never",
+                   PYTHONPATH=root)
+        script = ("from models import storage\n"
+                  "from models.engine.file_storage import FileStorage\n"
+                  "from models.user import User\n"
+                  f"FileStorage.journal_mode = {journal_mode}\n"
+                  "storage.reload()\n" + code)
+        return subprocess.Popen([sys.executable, "-c", script], env=env)
+
+    def run_worker(self, code, journal_mode=True):
+        """Runs code against the store in another process"""
+        self.assertEqual(self.start_worker(code, journal_mode).wait(), 0)
+
+    def test_save_merges_other_changes(self):
+        """Test save pulls in what another process saved meanwhile"""
+        user = User()
+        self.storage.save()
+        self.run_worker("other = User()\nother.first_name = 'Other'\n"
+                        "other.save()\n"
+                        f"storage.get(User, {user.id!r}).last_name = 'Doe'\n"
+                        "storage.save()")
+        user.first_name = "Betty"
+        user.save()
+
+        self.storage.all().clear()
+        self.storage.reload()
+        users = self.storage.all(User)
+        self.assertEqual(len(users), 2)
+        self.assertEqual(users[f"User.{user.id}"].first_name, "Betty")
+        self.assertIn("Other", [u.first_name for u in users.values()])
+
+    def test_compact_merges_other_changes(self):
+        """Test a full snapshot keeps what another process saved"""
+        FileStorage.journal_mode = False
+        gone = User()
+        User().save()
+        self.run_worker(f"storage.delete(storage.get(User, {gone.id!r}))\n"
+                        "User().save()", journal_mode=False)
+        user = User()
+        user.save()
+
+        with open("file.json", "r", encoding="utf-8") as f:
+            keys = json.load(f)
+        self.assertEqual(len(keys), 3)
+        self.assertIn(f"User.{user.id}", keys)
+        self.assertNotIn(f"User.{gone.id}", keys)
+        self.assertIsNone(self.storage.get(User, gone.id))
+
+    def test_refuse(self):
+        """Test save refuses to write over changes of another process"""
+        FileStorage.on_conflict = "refuse"
+        User().save()
+        self.run_worker("User().save()")
+        user = User()
+        with self.assertRaises(StaleStorageError):
+            user.save()
+
+        self.assertEqual(self.storage.refresh(), 1)
+        user.save()
+        self.storage.all().clear()
+        self.storage.reload()
+        self.assertEqual(len(self.storage.all(User)), 3)
+
+    def test_refresh_reads_new_records_only(self):
+        """Test refresh applies the journal records added since"""
+        user = User()
+        self.storage.save()
+        self.assertEqual(self.storage.refresh(), 0)
+        self.run_worker(f"storage.get(User, {user.id!r}).first_name = 'A'\n"
+                        "storage.save()")
+        self.assertEqual(self.storage.refresh(), 1)
+        self.assertEqual(self.storage.get(User, user.id).first_name, "A")
+        self.run_worker("User().save()")
+        self.assertEqual(self.storage.refresh(), 1)
+        self.assertEqual(len(self.storage.all(User)), 2)
+
+    def test_refresh_keeps_local_changes(self):
+        """Test refresh leaves unsaved local changes alone"""
+        user = User()
+        self.storage.save()
+        user.first_name = "Local"
+        self.run_worker(f"storage.get(User, {user.id!r}).first_name = 'B'\n"
+                        "storage.save()")
+        self.storage.refresh()
+        self.assertEqual(self.storage.get(User, user.id).first_name, "Local")
+
+    def test_refresh_after_compaction(self):
+        """Test refresh reads a snapshot rewritten by another process"""
+        FileStorage.lazy_mode = True
+        self.addCleanup(setattr, FileStorage, "lazy_mode", False)
+        users = [User() for _ in range(3)]
+        self.storage.save()
+        self.storage.all().clear()
+        self.storage.reload()
+        self.run_worker(f"storage.delete(storage.get(User, {users[0].id!r}))\n"
+                        "User().save()", journal_mode=False)
+        self.storage.refresh()
+        self.assertIsNone(self.storage.get(User, users[0].id))
+        self.assertEqual(len(self.storage.all(User)), 3)
+
+    def test_concurrent_workers(self):
+        """Test processes saving at the same time lose no objects"""
+        FileStorage.journal_mode = False
+        User().save()
+        workers = [self.start_worker("for _ in range(10):\n"
+                                     "    User().save()", journal_mode=False)
+                   for _ in range(4)]
+        for worker in workers:
+            self.assertEqual(worker.wait(), 0)
+        self.storage.refresh()
+        self.assertEqual(len(self.storage.all(User)), 41)
+        self.storage.all().clear()
+        self.storage.reload()
+        self.assertEqual(len(self.storage.all(User)), 41)
+
+
+@unittest.skipIf(models.storage_t == "db", "not testing file storage")
+class TestFileStorageSharded(unittest.TestCase):
+    """Test cases for the FileStorage sharded layout"""
+
+    shards = "file.shards"
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.storage = FileStorage()
+        self.storage.all().clear()
+        FileStorage.sharded = True
+        self.clean()
+
+    def tearDown(self):
+        """Clean up after each test"""
+        self.clean()
+        FileStorage.sharded = False
+        FileStorage.shard_partitions = 1
+        FileStorage.lazy_mode = False
+        FileStorage.journal_mode = False
+        self.storage.reload()
+        self.storage.all().clear()
+
+    def clean(self):
+        """Removes the store and empties the storage"""
+        if os.path.exists(self.shards):
+            shutil.rmtree(self.shards)
+        for path in ("file.json", "file.json.bak", "file.shards.journal"):
+            if os.path.exists(path):
+                os.remove(path)
+        self.storage.reload()
+
+    def shard_files(self):
+        """Returns the names of the shard files"""
+        return sorted(name for name in os.listdir(self.shards)
+                      if name.endswith(".json"))
+
+    def test_one_file_per_class(self):
+        """Test each class is saved to its own shard"""
+        user = User()
+        user.email = "test@example.com"
+        City().state_id = "state-1"
+        self.storage.save()
+        self.assertEqual(self.shard_files(), ["City.json", "User.json"])
+        self.assertFalse(os.path.exists("file.json"))
+
+        self.storage.all().clear()
+        self.storage.reload()
+        self.assertEqual(self.storage.get(User, user.id).to_dict(),
+                         user.to_dict())
+        self.assertEqual(len(self.storage.find(City, state_id="state-1")), 1)
+
+    def test_save_rewrites_dirty_shards_only(self):
+        """Test save leaves the shards of unchanged classes alone"""
+        User()
+        review = Review()
+        self.storage.save()
+        user_inode = os.stat(os.path.join(self.shards, "User.json")).st_ino
+        review_inode = os.stat(
+            os.path.join(self.shards, "Review.json")).st_ino
+
+        review.text = "Great"
+        self.storage.save()
+        self.assertEqual(
+            os.stat(os.path.join(self.shards, "User.json")).st_ino,
+            user_inode)
+        self.assertNotEqual(
+            os.stat(os.path.join(self.shards, "Review.json")).st_ino,
+            review_inode)
+
+    def test_empty_shard_removed(self):
+        """Test the shard of a class with no objects left is removed"""
+        user = User()
+        City()
+        self.storage.save()
+        self.storage.delete(user)
+        self.storage.save()
+        self.assertEqual(self.shard_files(), ["City.json"])
+
+    def test_partitions(self):
+        """Test objects are partitioned by id, and repartitioned"""
+        users = [User() for _ in range(20)]
+        self.storage.save()
+        self.assertEqual(self.shard_files(), ["User.json"])
+
+        FileStorage.shard_partitions = 4
+        self.storage.all().clear()
+        self.storage.reload()
+        self.storage.save()
+        self.assertEqual(self.shard_files(), [f"User.{n}.json"
+                                              for n in range(4)])
+        self.storage.all().clear()
+        self.storage.reload()
+        self.assertEqual(set(self.storage.all(User)),
+                         {f"User.{user.id}" for user in users})
+
+    def test_lazy_loads_needed_shards(self):
+        """Test all(cls) only loads the shards of cls in lazy mode"""
+        User()
+        city = City()
+        self.storage.save()
+        FileStorage.lazy_mode = True
+        self.storage.all().clear()
+        self.storage.reload()
+
+        with mock.patch.object(City, "from_dict",
+                               side_effect=City.from_dict) as from_dict:
+            self.assertEqual(len(self.storage.all(User)), 1)
+            self.assertEqual(from_dict.call_count, 0)
+            self.assertIsNotNone(self.storage.get(City, city.id))
+            self.assertEqual(from_dict.call_count, 1)
+        self.assertEqual(len(self.storage.all()), 2)
+
+    def test_journal(self):
+        """Test journal records are folded into their shards"""
+        FileStorage.journal_mode = True
+        user = User()
+        City()
+        self.storage.save()
+        self.assertTrue(os.path.exists("file.shards.journal"))
+        self.assertFalse(os.path.exists(self.shards))
+
+        self.storage.all().clear()
+        self.storage.reload()
+        self.storage.compact()
+        self.assertFalse(os.path.exists("file.shards.journal"))
+        self.assertEqual(self.shard_files(), ["City.json", "User.json"])
+        self.storage.all().clear()
+        self.storage.reload()
+        self.assertIsNotNone(self.storage.get(User, user.id))
+
+    def test_split_single_file(self):
+        """Test a store saved before sharding is split up on save"""
+        FileStorage.sharded = False
+        user = User()
+        self.storage.save()
+        FileStorage.sharded = True
+        self.storage.all().clear()
+        self.storage.reload()
+        self.assertIsNotNone(self.storage.get(User, user.id))
+        self.storage.save()
+        self.assertEqual(self.shard_files(), ["User.json"])
+
+    def test_torn_shard(self):
+        """Test a torn shard is loaded from its backup"""
+        user = User()
+        self.storage.save()
+        user.first_name = "Betty"
+        self.storage.save()
+        with open(os.path.join(self.shards, "User.json"), "r+b") as f:
+            f.truncate(10)
+
+        self.storage.all().clear()
+        with self.assertWarns(RuntimeWarning):
+            self.storage.reload()
+        self.assertEqual(self.storage.get(User, user.id).first_name, "")
+
+
+@unittest.skipIf(models.storage_t == "db", "not testing file storage")
+class TestFileStorageParallel(unittest.TestCase):
+    """Test cases for FileStorage reloads decoded by worker processes"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.storage = FileStorage()
+        self.storage.all().clear()
+        self.users = [User() for _ in range(200)]
+        for user in self.users:
+            user.first_name = user.id[:8]
+        self.storage.save()
+        self.storage.all().clear()
+        FileStorage.reload_workers = 3
+        FileStorage.reload_chunk_size = 1000
+
+    def tearDown(self):
+        """Clean up after each test"""
+        FileStorage.reload_workers = 1
+        FileStorage.reload_chunk_size = 4 * 1024 * 1024
+        FileStorage.sharded = False
+        self.storage.all().clear()
+        if os.path.exists("file.shards"):
+            shutil.rmtree("file.shards")
+        for path in ("file.json", "file.json.bak"):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def assertReloaded(self):
+        """Asserts every user was reloaded as saved"""
+        self.assertEqual(len(self.storage.all()), len(self.users))
+        for user in self.users:
+            self.assertEqual(self.storage.get(User, user.id).to_dict(),
+                             user.to_dict())
+
+    def test_reload_chunks(self):
+        """Test a JSON snapshot is reloaded in chunks"""
+        calls = []
+        self.storage.reload(lambda *args: calls.append(args))
+        self.assertReloaded()
+        self.assertGreater(len(calls), 2)
+        self.assertEqual(calls[-1][0], len(self.users))
+        self.assertEqual(calls[-1][1], os.path.getsize("file.json"))
+
+    def test_reload_unsplittable(self):
+        """Test a snapshot on a single line is reloaded in one go"""
+        with open("file.json", "r", encoding="utf-8") as f:
+            data = json.load(f)
+        with open("file.json", "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        self.storage.reload()
+        self.assertReloaded()
+
+    def test_reload_torn(self):
+        """Test a torn snapshot still falls back to its backup"""
+        self.storage.reload()
+        self.storage.save()
+        self.storage.all().clear()
+        with open("file.json", "r+b") as f:
+            f.truncate(os.path.getsize("file.json") // 2)
+        with self.assertWarns(RuntimeWarning):
+            self.storage.reload()
+        self.assertReloaded()
+
+    def test_reload_shards(self):
+        """Test shards are decoded by the workers"""
+        FileStorage.reload_workers = 1
+        self.storage.reload()
+        FileStorage.sharded = True
+        FileStorage.shard_partitions = 4
+        self.addCleanup(setattr, FileStorage, "shard_partitions", 1)
+        self.storage.save()
+        self.storage.all().clear()
+        FileStorage.reload_workers = 3
+        self.storage.reload()
+        self.assertReloaded()
+
+
+@unittest.skipIf(models.storage_t == "db", "not testing file storage")
+class TestFileStorageIndexed(unittest.TestCase):
+    """Test cases for FileStorage opened through its offset index"""
+
+    files = ("file.json", "file.json.bak", "file.json.idx",
+             "file.json.journal")
+
+    def setUp(self):
+        """Set up test fixtures: a store of users and a city, reopened
+        through its index"""
+        self.storage = FileStorage()
+        self.storage.all().clear()
+        FileStorage.lazy_mode = True
+        FileStorage.indexed = True
+        self.users = [User() for _ in range(5)]
+        self.city = City()
+        self.city.state_id = "state-1"
+        self.storage.save()
+        self.reopen()
+
+    def tearDown(self):
+        """Clean up after each test"""
+        FileStorage.lazy_mode = False
+        FileStorage.indexed = False
+        FileStorage.journal_mode = False
+        for path in self.files:
+            if os.path.exists(path):
+                os.remove(path)
+        self.storage.reload()
+        self.storage.all().clear()
+
+    def reopen(self):
+        """Reloads the storage through its index, failing if the snapshot
+        is scanned instead"""
+        self.storage.all().clear()
+        with mock.patch.object(FileStorage, "_FileStorage__read_snapshot",
+                               side_effect=AssertionError("scanned")):
+            self.storage.reload()
+
+    def test_index_written(self):
+        """Test a compaction writes the index of the snapshot"""
+        self.assertTrue(os.path.exists("file.json.idx"))
+        FileStorage.indexed = False
+        self.storage.reload()
+        self.assertEqual(len(self.storage.all()), 6)
+
+    def test_index_written_at_reload(self):
+        """Test a read-only session indexes a snapshot saved without an
+        index, or with a stale one, for the next to use"""
+        for stale in (False, True):
+            if stale:
+                with open("file.json.idx", "r+b") as f:
+                    f.seek(8)
+                    f.write(b"\0" * 8)
+            else:
+                os.remove("file.json.idx")
+            self.storage.all().clear()
+            self.storage.reload()
+            self.assertEqual(self.storage.get(User, self.users[0].id).id,
+                             self.users[0].id)
+            self.reopen()
+            self.assertEqual(len(self.storage.all(User)), 5)
+        self.assertEqual([name for name in os.listdir(".")
+                          if name.endswith(".tmp")], [])
+
+    def test_get_through_index(self):
+        """Test get builds only the object asked for"""
+        user = self.users[2]
+        with mock.patch.object(User, "from_dict",
+                               side_effect=User.from_dict) as from_dict:
+            self.assertEqual(self.storage.get(User, user.id).to_dict(),
+                             user.to_dict())
+            self.assertIsNone(self.storage.get(User, "missing"))
+        self.assertEqual(from_dict.call_count, 1)
+
+    def test_all_and_find(self):
+        """Test all and find list objects from the index"""
+        self.assertEqual(set(self.storage.all(User)),
+                         {f"User.{user.id}" for user in self.users})
+        self.assertEqual(list(self.storage.find(City, state_id="state-1")),
+                         [f"City.{self.city.id}"])
+        self.assertEqual(len(self.storage.all()), 6)
+
+    def test_count(self):
+        """Test count answers from the index without building objects,
+        minus the objects destroyed, plus those created"""
+        with mock.patch.object(User, "from_dict",
+                               side_effect=AssertionError("built")):
+            self.assertEqual(self.storage.count(User), 5)
+            self.assertEqual(self.storage.count("City"), 1)
+        self.storage.delete(self.storage.get(User, self.users[0].id))
+        self.storage.get(User, self.users[1].id)
+        User()
+        self.assertEqual(self.storage.count(User), 5)
+        self.storage.delete(self.users[2])
+        self.assertEqual(self.storage.count(User), 4)
+        self.assertEqual(self.storage.count(), 5)
+        self.assertEqual(self.storage.count(User), 4)
+
+    def test_changes_saved(self):
+        """Test changes and deletions made through the index are saved,
+        and the objects never built are kept"""
+        user = self.storage.get(User, self.users[0].id)
+        user.first_name = "Betty"
+        self.storage.delete(self.storage.get(User, self.users[1].id))
+        new = User()
+        self.storage.save()
+        self.reopen()
+
+        users = self.storage.all(User)
+        self.assertEqual(len(users), 5)
+        self.assertEqual(users[f"User.{user.id}"].first_name, "Betty")
+        self.assertNotIn(f"User.{self.users[1].id}", users)
+        self.assertIn(f"User.{new.id}", users)
+        self.assertIsNotNone(self.storage.get(City, self.city.id))
+
+    def test_journal(self):
+        """Test journal records replayed over the index win"""
+        FileStorage.journal_mode = True
+        self.storage.get(User, self.users[0].id).first_name = "Betty"
+        self.storage.delete(self.storage.get(User, self.users[1].id))
+        self.storage.save()
+        self.reopen()
+        self.assertEqual(
+            self.storage.get(User, self.users[0].id).first_name, "Betty")
+        self.assertIsNone(self.storage.get(User, self.users[1].id))
+        self.assertEqual(len(self.storage.all(User)), 4)
+
+    def test_stale_index(self):
+        """Test an index not matching the snapshot is not used"""
+        FileStorage.indexed = False
+        self.storage.all()
+        self.storage.delete(self.storage.get(User, self.users[0].id))
+        self.storage.save()
+        FileStorage.indexed = True
+        self.storage.all().clear()
+        self.storage.reload()
+        self.assertIsNone(self.storage.get(User, self.users[0].id))
+        self.assertEqual(len(self.storage.all(User)), 4)
+
 
 if __name__ == '__main__':
     unittest.main()
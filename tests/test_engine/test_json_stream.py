@@ -0,0 +1,98 @@
+#!/usr/bin/python3
+"""
+Unit tests for ObjectReader class
+"""
+import io
+import json
+import unittest
+from models.engine.json_stream import ObjectReader
+
+
+class TestObjectReader(unittest.TestCase):
+    """Test cases for ObjectReader class"""
+
+    def read(self, text, chunk_size=3):
+        """Returns the entries of text read with a tiny chunk size"""
+        f = io.BytesIO(text.encode("utf-8"))
+        return list(ObjectReader(f, chunk_size=chunk_size))
+
+    def test_entries_in_order(self):
+        """Test entries are yielded in file order"""
+        data = {"User.1": {"id": "1", "n": [1, 2.5, None]},
+                "City.2": {"id": "2", "name": "Kigali"},
+                "State.3": {}}
+        self.assertEqual(self.read(json.dumps(data)), list(data.items()))
+        self.assertEqual(self.read(json.dumps(data, indent=4)),
+                         list(data.items()))
+
+    def test_empty_object(self):
+        """Test an empty object yields nothing"""
+        self.assertEqual(self.read(" { } \n"), [])
+
+    def test_numbers_across_chunks(self):
+        """Test numbers cut by a chunk boundary are read whole"""
+        self.assertEqual(self.read('{"a": 123456789, "b": 1.25}', 8),
+                         [("a", 123456789), ("b", 1.25)])
+
+    def test_multibyte_across_chunks(self):
+        """Test UTF-8 characters cut by a chunk boundary"""
+        data = {"Place.1": {"name": "Café Kigali – ÿ"}}
+        text = json.dumps(data, ensure_ascii=False)
+        for size in range(1, 8):
+            self.assertEqual(self.read(text, size), list(data.items()))
+
+    def test_entry_offsets(self):
+        """Test entries() gives the byte range of each value"""
+        text = '{"a": {"x": "é"},\n "b" :  [1, 2] , "c":3}'
+        raw = text.encode("utf-8")
+        for size in (1, 2, 5, 64):
+            f = io.BytesIO(raw)
+            for key, value, start, end in ObjectReader(f, size).entries():
+                self.assertEqual(json.loads(raw[start:end]), value)
+            self.assertEqual(raw[start:end], b"3")
+
+    def test_entries_without_decoding(self):
+        """Test entries(False) gives the same ranges without decoding the
+        objects and arrays"""
+        text = ('{"a": {"x": "}]\\"{", "y": [1, {"z": null}]},\n'
+                ' "b" :  [[], "é"] , "c": 3, "d": "s", "e": [1],\n'
+                ' "f": {"x": "\\u00e9}"}, "g": {"x": [1, "]"]}}')
+        raw = text.encode("utf-8")
+        expected = list(ObjectReader(io.BytesIO(raw)).entries())
+        for size in range(1, 12):
+            f = io.BytesIO(raw)
+            entries = list(ObjectReader(f, size).entries(False))
+            self.assertEqual([(key, start, end) for key, _, start, end
+                              in entries],
+                             [(key, start, end) for key, _, start, end
+                              in expected])
+            self.assertEqual([value for _, value, _, _ in entries],
+                             [None, None, 3, "s", None, None, None])
+
+    def test_torn_without_decoding(self):
+        """Test a document cut within a skipped value raises
+        JSONDecodeError"""
+        text = '{"a": {"x": "}", "y": [1, 2]}, "b": {}}'
+        for size in range(1, len(text)):
+            f = io.BytesIO(text[:size].encode("utf-8"))
+            with self.assertRaises(json.JSONDecodeError, msg=text[:size]):
+                list(ObjectReader(f, 4).entries(False))
+
+    def test_bytes_read(self):
+        """Test bytes_read counts the bytes consumed"""
+        text = json.dumps({"a": 1})
+        f = io.BytesIO(text.encode("utf-8"))
+        reader = ObjectReader(f)
+        list(reader)
+        self.assertEqual(reader.bytes_read, len(text))
+
+    def test_invalid_documents(self):
+        """Test malformed documents raise JSONDecodeError"""
+        for text in ("", "invalid json content", "[]", '{"a" 1}',
+                     '{"a": 1', '{"a": 1,}', '{"a": 1} x', '{1: 2}'):
+            with self.assertRaises(json.JSONDecodeError, msg=text):
+                self.read(text)
+
+
+if __name__ == '__main__':
+    unittest.main()
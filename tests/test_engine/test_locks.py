@@ -0,0 +1,99 @@
+#!/usr/bin/python3
+"""
+Unit tests for the readers-writer lock
+"""
+import threading
+import time
+import unittest
+from models.engine.locks import RWLock
+
+
+class TestRWLock(unittest.TestCase):
+    """Test cases for RWLock"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.lock = RWLock()
+
+    def run_thread(self, target):
+        """Starts target in a thread and returns the thread"""
+        thread = threading.Thread(target=target, daemon=True)
+        thread.start()
+        return thread
+
+    def test_readers_share(self):
+        """Test several threads can hold the read lock together"""
+        inside = threading.Barrier(3, timeout=5)
+
+        def reader():
+            with self.lock.read():
+                inside.wait()
+        threads = [self.run_thread(reader) for _ in range(2)]
+        inside.wait()
+        for thread in threads:
+            thread.join(5)
+            self.assertFalse(thread.is_alive())
+
+    def test_writer_excludes_readers(self):
+        """Test a reader waits for the writer to release the lock"""
+        events = []
+        with self.lock.write():
+            def reader():
+                with self.lock.read():
+                    events.append("read")
+            thread = self.run_thread(reader)
+            time.sleep(0.05)
+            events.append("write done")
+        thread.join(5)
+        self.assertEqual(events, ["write done", "read"])
+
+    def test_waiting_writer_holds_back_readers(self):
+        """Test new readers queue behind a waiting writer"""
+        events = []
+        self.lock.acquire_read()
+
+        def writer():
+            with self.lock.write():
+                events.append("write")
+
+        def reader():
+            with self.lock.read():
+                events.append("read")
+        writer_thread = self.run_thread(writer)
+        time.sleep(0.05)
+        reader_thread = self.run_thread(reader)
+        time.sleep(0.05)
+        self.assertEqual(events, [])
+        self.lock.release_read()
+        writer_thread.join(5)
+        reader_thread.join(5)
+        self.assertEqual(events, ["write", "read"])
+
+    def test_reentrant(self):
+        """Test both modes can be acquired again by their holder"""
+        with self.lock.write():
+            with self.lock.write():
+                with self.lock.read():
+                    pass
+        with self.lock.read():
+            with self.lock.read():
+                pass
+        with self.lock.write():
+            pass
+
+    def test_upgrade_raises(self):
+        """Test a reader cannot take the write lock"""
+        with self.lock.read():
+            with self.assertRaises(RuntimeError):
+                self.lock.acquire_write()
+
+    def test_release_unacquired_raises(self):
+        """Test releasing a lock not held raises RuntimeError"""
+        with self.assertRaises(RuntimeError):
+            self.lock.release_read()
+        with self.assertRaises(RuntimeError):
+            self.lock.release_write()
+
+
+if __name__ == '__main__':
+    unittest.main()
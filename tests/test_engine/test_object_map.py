@@ -0,0 +1,93 @@
+#!/usr/bin/python3
+"""
+Unit tests for ObjectMap class
+"""
+import unittest
+from models.engine.object_map import ObjectMap
+from models.city import City
+from models.state import State
+from models import storage
+
+
+class TestObjectMap(unittest.TestCase):
+    """Test cases for ObjectMap class"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        storage.all().clear()
+        self.objects = ObjectMap({"City": ("state_id",)})
+        self.city = City()
+        self.city.state_id = "state-1"
+        self.key = f"City.{self.city.id}"
+        self.objects[self.key] = self.city
+
+    def tearDown(self):
+        """Clean up after each test"""
+        storage.all().clear()
+
+    def test_is_dict(self):
+        """Test ObjectMap behaves as a dictionary"""
+        self.assertIsInstance(self.objects, dict)
+        self.assertEqual(self.objects[self.key], self.city)
+
+    def test_bucket(self):
+        """Test instances are grouped per class"""
+        state = State()
+        self.objects[f"State.{state.id}"] = state
+        self.assertEqual(self.objects.bucket("City"), {self.key: self.city})
+        self.assertEqual(self.objects.bucket("State"),
+                         {f"State.{state.id}": state})
+        self.assertEqual(self.objects.bucket("User"), {})
+        self.assertEqual(sorted(self.objects.class_names()),
+                         ["City", "State"])
+
+    def test_lookup(self):
+        """Test indexed lookups"""
+        self.assertEqual(self.objects.lookup("City", "state_id", "state-1"),
+                         {self.key: self.city})
+        self.assertEqual(self.objects.lookup("City", "state_id", "other"), {})
+        self.assertIsNone(self.objects.lookup("City", "name", "x"))
+
+    def test_reindex(self):
+        """Test reindex moves an instance to its new value"""
+        object.__setattr__(self.city, "state_id", "state-2")
+        self.objects.reindex(self.key, self.city, "state_id", "state-1")
+        self.assertEqual(self.objects.lookup("City", "state_id", "state-1"),
+                         {})
+        self.assertEqual(self.objects.lookup("City", "state_id", "state-2"),
+                         {self.key: self.city})
+
+    def test_removal_unlinks(self):
+        """Test del, pop and clear empty buckets and indexes"""
+        del self.objects[self.key]
+        self.assertEqual(self.objects.bucket("City"), {})
+        self.assertEqual(self.objects.lookup("City", "state_id", "state-1"),
+                         {})
+
+        self.objects[self.key] = self.city
+        self.assertIs(self.objects.pop(self.key), self.city)
+        self.assertEqual(self.objects.bucket("City"), {})
+
+        self.objects[self.key] = self.city
+        self.objects.clear()
+        self.assertEqual(self.objects.bucket("City"), {})
+        self.assertEqual(self.objects.lookup("City", "state_id", "state-1"),
+                         {})
+
+    def test_add_index(self):
+        """Test an index added later covers existing instances"""
+        object.__setattr__(self.city, "name", "Kigali")
+        self.objects.add_index("City", "name")
+        self.assertEqual(self.objects.lookup("City", "name", "Kigali"),
+                         {self.key: self.city})
+
+    def test_unhashable_values(self):
+        """Test unhashable values are skipped by indexes"""
+        object.__setattr__(self.city, "state_id", ["not", "hashable"])
+        self.objects[self.key] = self.city
+        self.assertIsNone(
+            self.objects.lookup("City", "state_id", ["not", "hashable"]))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,77 @@
+#!/usr/bin/python3
+"""
+Unit tests for the OffsetIndex class
+"""
+import os
+import unittest
+from models.engine.offset_index import OffsetIndex
+
+OFFSETS = {
+    "User.2": (40, 80),
+    "City.1": (0, 40),
+    "User.10": (80, 120),
+    "Place.1": (120, 200),
+}
+
+
+class TestOffsetIndex(unittest.TestCase):
+    """Test cases for the OffsetIndex class"""
+
+    path = "test.idx"
+
+    def setUp(self):
+        """Set up test fixtures: an index of OFFSETS"""
+        OffsetIndex.write(self.path, (1, 2, 3), OFFSETS)
+        self.index = OffsetIndex(self.path)
+
+    def tearDown(self):
+        """Clean up after each test"""
+        self.index.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    def test_get(self):
+        """Test keys are found by binary search"""
+        self.assertEqual(len(self.index), 4)
+        self.assertEqual(self.index.version, (1, 2, 3))
+        for key, offsets in OFFSETS.items():
+            self.assertEqual(self.index.get(key), offsets)
+        self.assertIsNone(self.index.get("User.1"))
+        self.assertIsNone(self.index.get("Zebra.1"))
+        self.assertIsNone(self.index.get("User." + "x" * 100))
+
+    def test_items(self):
+        """Test the keys of one class are listed in key order"""
+        self.assertEqual(list(self.index.items("User.")),
+                         [("User.10", (80, 120)), ("User.2", (40, 80))])
+        self.assertEqual(list(self.index.items("State.")), [])
+        self.assertEqual([key for key, offsets in self.index.items()],
+                         sorted(OFFSETS))
+
+    def test_count(self):
+        """Test the keys of one class are counted"""
+        self.assertEqual(self.index.count("User."), 2)
+        self.assertEqual(self.index.count("City."), 1)
+        self.assertEqual(self.index.count("State."), 0)
+        self.assertEqual(self.index.count(), 4)
+
+    def test_empty(self):
+        """Test an index without keys"""
+        OffsetIndex.write("empty.idx", (0, 0, 0), {})
+        index = OffsetIndex("empty.idx")
+        self.assertIsNone(index.get("User.1"))
+        self.assertEqual(list(index.items()), [])
+        index.close()
+        os.remove("empty.idx")
+
+    def test_not_an_index(self):
+        """Test other files are rejected"""
+        with open("bad.idx", "wb") as f:
+            f.write(b"{}" * 40)
+        with self.assertRaises(ValueError):
+            OffsetIndex("bad.idx")
+        os.remove("bad.idx")
+
+
+if __name__ == '__main__':
+    unittest.main()
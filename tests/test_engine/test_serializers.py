@@ -0,0 +1,143 @@
+#!/usr/bin/python3
+"""
+Unit tests for the snapshot serializers
+"""
+import io
+import json
+import os
+import struct
+import unittest
+from models.engine.serializers import (serializers, convert, detect,
+                                       BinarySerializer, Layout)
+
+VALUES = {
+    "User.1": {"id": "1", "email": "a@b.c", "__class__": "User"},
+    "Place.2": {"id": "2", "name": "Café", "number_rooms": 3,
+                "latitude": 1.5, "amenity_ids": ["x", "y"],
+                "__class__": "Place"},
+}
+
+
+class TestSerializers(unittest.TestCase):
+    """Test cases for the snapshot serializers"""
+
+    def tearDown(self):
+        """Clean up after each test"""
+        for path in ("test.json", "test.hbnb", "back.json"):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def write(self, serializer, values=VALUES):
+        """Returns the bytes of a snapshot of values and the offsets of
+        each payload"""
+        f = io.BytesIO()
+        writer = serializer.writer(f)
+        offsets = {key: writer.write(key, serializer.encode(value))
+                   for key, value in values.items()}
+        writer.close()
+        return f.getvalue(), offsets
+
+    def test_round_trip(self):
+        """Test every format reads back what it wrote"""
+        for serializer in serializers.values():
+            data, offsets = self.write(serializer)
+            entries = list(serializer.entries(io.BytesIO(data)))
+            self.assertEqual([(key, value) for key, value, _, _ in entries],
+                             list(VALUES.items()))
+            for key, value, start, end in entries:
+                self.assertEqual(offsets[key], (start, end))
+                self.assertEqual(serializer.decode(data[start:end]), value)
+            self.assertEqual(
+                list(serializer.entries(io.BytesIO(data), False)),
+                [(key, None, start, end) for key, _, start, end in entries])
+
+    def test_empty_snapshot(self):
+        """Test an empty snapshot has no entries"""
+        for serializer in serializers.values():
+            data, _ = self.write(serializer, {})
+            self.assertEqual(list(serializer.entries(io.BytesIO(data))), [])
+
+    def test_json_snapshot_is_json(self):
+        """Test the JSON format writes a plain JSON object"""
+        data, _ = self.write(serializers["json"])
+        self.assertEqual(json.loads(data), VALUES)
+
+    def test_to_json(self):
+        """Test payloads can be turned into JSON text"""
+        for serializer in serializers.values():
+            payload = serializer.encode(VALUES["Place.2"])
+            self.assertEqual(json.loads(serializer.to_json(payload)),
+                             VALUES["Place.2"])
+
+    def test_truncated_binary(self):
+        """Test a torn binary snapshot raises ValueError"""
+        serializer = serializers["binary"]
+        data, _ = self.write(serializer)
+        for size in (0, 3, len(data) - 1, len(data) - 20):
+            with self.assertRaises(ValueError):
+                list(serializer.entries(io.BytesIO(data[:size])))
+
+    def test_binary_payload_is_packed(self):
+        """Test binary payloads pack the declared fields rather than write
+        JSON text, and older versions are refused"""
+        serializer = serializers["binary"]
+        data, offsets = self.write(serializer)
+        start, end = offsets["Place.2"]
+        payload = data[start:end]
+        self.assertNotIn(b'"number_rooms"', payload)
+        self.assertIn(struct.pack("<q", 3), payload)
+        self.assertIn(struct.pack("<d", 1.5), payload)
+        # Only the list, which no struct field holds, is JSON
+        self.assertIn(b'{"amenity_ids":["x","y"]}', payload)
+        for version in (b"\x01", b"\x02"):
+            with self.assertRaisesRegex(ValueError, "unsupported .* version"):
+                list(serializer.entries(io.BytesIO(b"HBNB" + version +
+                                                   data[5:])))
+
+    def test_binary_other_values(self):
+        """Test values of another type than their field, big ints and
+        unknown classes read back as they were"""
+        serializer = serializers["binary"]
+        values = {
+            "Place.3": {"id": "3", "number_rooms": "many",
+                        "latitude": 2, "max_guest": 1 << 70,
+                        "name": None, "extra": {"a": [1]},
+                        "__class__": "Place"},
+            "Nope.4": {"id": "4", "__class__": "Nope"},
+        }
+        data, _ = self.write(serializer, values)
+        self.assertEqual({key: value for key, value, _, _
+                          in serializer.entries(io.BytesIO(data))}, values)
+
+    def test_binary_old_layout(self):
+        """Test payloads written with an older schema of their class still
+        read back once their snapshot was read"""
+        serializer = BinarySerializer()
+        old = Layout("Place", [("number_rooms", "int"), ("id", "str")])
+        payload = old.encode({"id": "5", "number_rooms": 2,
+                              "__class__": "Place"})
+        with self.assertRaisesRegex(ValueError, "unknown layout"):
+            serializer.decode(payload)
+        layouts = json.dumps({old.crc: [old.class_name, old.fields]})
+        head = serializer.magic + struct.pack("<I", len(layouts))
+        f = io.BytesIO(head + layouts.encode("utf-8"))
+        self.assertEqual(serializer.prepare(f), len(f.getvalue()))
+        self.assertEqual(serializer.decode(payload),
+                         {"id": "5", "number_rooms": 2,
+                          "__class__": "Place"})
+
+    def test_convert_and_detect(self):
+        """Test stores convert both ways"""
+        with open("test.json", "wb") as f:
+            f.write(self.write(serializers["json"])[0])
+        self.assertEqual(convert("test.json", "test.hbnb"), 2)
+        self.assertIs(detect("test.hbnb"), serializers["binary"])
+        self.assertIs(detect("test.json"), serializers["json"])
+
+        convert("test.hbnb", "back.json")
+        with open("back.json", "r", encoding="utf-8") as f:
+            self.assertEqual(json.load(f), VALUES)
+
+
+if __name__ == '__main__':
+    unittest.main()
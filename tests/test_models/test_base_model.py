@@ -5,8 +5,10 @@ Unit tests for BaseModel class
 import unittest
 import os
 import json
+import sys
 from datetime import datetime
-from models.base_model import BaseModel
+from unittest import mock
+from models.base_model import BaseModel, classes
 from models import storage
 
 
@@ -23,9 +25,10 @@ class TestBaseModel(unittest.TestCase):
         """Clean up after each test"""
         # Clear storage after each test
         storage.all().clear()
-        # Remove file.json if it exists
-        if os.path.exists("file.json"):
-            os.remove("file.json")
+        # Remove file.json and its backup if they exist
+        for path in ("file.json", "file.json.bak"):
+            if os.path.exists(path):
+                os.remove(path)
 
     def test_init_without_args(self):
         """Test BaseModel initialization without arguments"""
@@ -130,6 +133,75 @@ class TestBaseModel(unittest.TestCase):
         key = f"BaseModel.{base_model.id}"
         self.assertIn(key, storage.all())
 
+    def test_setattr_marks_dirty(self):
+        """Test that assigning an attribute marks the instance dirty"""
+        with mock.patch.object(storage, "mark_dirty") as mark_dirty:
+            self.base_model.name = "changed"
+        mark_dirty.assert_called_once_with(self.base_model, "name", None)
+
+    def test_from_dict(self):
+        """Test from_dict builds an instance without registering it"""
+        obj_dict = self.base_model.to_dict()
+        obj_dict["id"] = "other-id"
+        obj_dict["name"] = "test_name"
+        base_model = BaseModel.from_dict(obj_dict)
+
+        self.assertEqual(base_model.id, "other-id")
+        self.assertEqual(base_model.name, "test_name")
+        self.assertEqual(base_model.created_at, self.base_model.created_at)
+        self.assertEqual(base_model.to_dict(), obj_dict)
+        self.assertNotIn("BaseModel.other-id", storage.all())
+
+    def test_timestamps_parsed_on_first_read(self):
+        """Test timestamps loaded from a dictionary stay strings until read"""
+        raw = "2023-01-01T12:00:00.000000"
+        base_model = BaseModel.from_dict(
+            {"id": "test-id", "created_at": raw, "updated_at": raw})
+        self.assertEqual(base_model.__dict__["created_at"], raw)
+        self.assertEqual(base_model.to_dict()["created_at"], raw)
+
+        self.assertEqual(base_model.created_at, datetime(2023, 1, 1, 12))
+        self.assertEqual(base_model.__dict__["created_at"],
+                         datetime(2023, 1, 1, 12))
+        self.assertEqual(base_model.to_dict()["created_at"],
+                         "2023-01-01T12:00:00")
+
+    def test_str_shows_datetimes(self):
+        """Test __str__ shows unread timestamps as datetimes"""
+        raw = "2023-01-01T12:00:00.000000"
+        base_model = BaseModel.from_dict(
+            {"id": "test-id", "created_at": raw, "updated_at": raw})
+        self.assertIn("datetime.datetime(2023, 1, 1, 12, 0)",
+                      str(base_model))
+
+    def test_registry(self):
+        """Test that model classes register themselves by name"""
+        from models.review import Review
+        self.assertIs(classes["BaseModel"], BaseModel)
+        self.assertIs(classes["Review"], Review)
+
+        class Pet(BaseModel):
+            """Throwaway model class"""
+        try:
+            self.assertIs(classes["Pet"], Pet)
+        finally:
+            del classes["Pet"]
+
+    def test_registry_unknown_class(self):
+        """Test that unknown class names raise KeyError"""
+        for name in ("Unicorn", "os.path", ""):
+            with self.assertRaises(KeyError):
+                classes[name]
+
+    def test_registry_contains(self):
+        """Test that membership imports the module of a model class"""
+        with mock.patch.dict(classes), mock.patch.dict(sys.modules):
+            dict.pop(classes, "Amenity", None)
+            sys.modules.pop("models.amenity", None)
+            self.assertIn("Amenity", classes)
+            self.assertNotIn("Unicorn", classes)
+            self.assertNotIn("user", classes)
+
 
 if __name__ == '__main__':
     unittest.main()
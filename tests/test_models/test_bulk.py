@@ -0,0 +1,132 @@
+#!/usr/bin/python3
+"""
+Unit tests for bulk import and export
+"""
+import unittest
+import json
+import os
+import tempfile
+from unittest import mock
+import models
+from models import storage
+from models.place import Place
+from models.user import User
+
+
+class TestBulk(unittest.TestCase):
+    """Test cases for storage.import_file and storage.export_file"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        storage.all().clear()
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def tearDown(self):
+        """Clean up after each test"""
+        storage.all().clear()
+        for path in ("file.json", "file.json.bak"):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def path(self, name, text=None):
+        """Returns the path of name in the test directory, writing text to
+        it if given"""
+        path = os.path.join(self.tmp.name, name)
+        if text is not None:
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(text)
+        return path
+
+    def test_import_jsonl(self):
+        """Test records are stored with the declared types"""
+        path = self.path("places.jsonl",
+                         '{"id": "p1", "name": "Loft", "number_rooms": "3",'
+                         ' "latitude": 1, "amenity_ids": ["a"]}\n'
+                         '\n'
+                         '{"name": "Hut", "color": "red"}\n')
+        self.assertEqual(storage.import_file(Place, path), 2)
+        loft = storage.get(Place, "p1")
+        self.assertEqual((loft.name, loft.number_rooms, loft.latitude,
+                          loft.amenity_ids), ("Loft", 3, 1.0, ["a"]))
+        self.assertIsInstance(loft.latitude, float)
+        hut, = storage.find(Place, name="Hut").values()
+        self.assertEqual(hut.color, "red")
+        self.assertIsNotNone(hut.created_at)
+
+    def test_import_saves_once(self):
+        """Test an import saves the storage once"""
+        path = self.path("users.jsonl",
+                         "".join(f'{{"email": "{i}@hbnb.io"}}\n'
+                                 for i in range(10)))
+        with mock.patch.object(storage, "save") as save:
+            self.assertEqual(storage.import_file("User", path), 10)
+        self.assertEqual(save.call_count, 1)
+
+    def test_import_invalid(self):
+        """Test a bad record stops the import before anything is stored"""
+        for text, message in [
+                ('{"name": "Loft"}\n{"number_rooms": "many"}\n',
+                 "line 2: number_rooms: not an int: 'many'"),
+                ('{"amenity_ids": "x"}\n', "line 1: amenity_ids: "),
+                ('{"created_at": "yesterday"}\n', "line 1: created_at: "),
+                ('{"__class__": "User"}\n', "line 1: not a Place: User"),
+                ('{"name": "Loft"}\n{"id": ""}\n', "line 2: id: empty"),
+                ('{"id": ["p1"]}\n', "line 1: id: not a string: "),
+                ('{"id": {"a": 1}}\n', "line 1: id: not a string: "),
+                ('[1]\n', "line 1: not an object"),
+                ('{"name": \n', "line 1: ")]:
+            path = self.path("bad.jsonl", text)
+            with self.assertRaisesRegex(ValueError, f"^{message}"):
+                storage.import_file(Place, path)
+            self.assertEqual(storage.all(Place), {})
+        with self.assertRaisesRegex(ValueError, "unknown file format"):
+            storage.import_file(Place, self.path("places.xml", ""))
+        path = self.path("bad.csv", f"id,name\np1,{'x' * (1 << 20)}\n")
+        with self.assertRaisesRegex(ValueError, "^line 2: field larger"):
+            storage.import_file(Place, path)
+
+    def test_import_numeric_id(self):
+        """Test a numeric id is stored as a string"""
+        path = self.path("places.jsonl", '{"id": 12, "name": "Loft"}\n')
+        self.assertEqual(storage.import_file(Place, path), 1)
+        self.assertEqual(storage.get(Place, "12").id, "12")
+
+    def test_round_trip(self):
+        """Test exported files import back to the same instances"""
+        places = [Place() for _ in range(3)]
+        places[0].name = "Loft, top floor"
+        places[1].amenity_ids = ["a", "b"]
+        places[2].max_guest = 4
+        expected = {place.id: place.to_dict() for place in places}
+        for name in ("places.jsonl", "places.csv"):
+            path = self.path(name)
+            self.assertEqual(storage.export_file(Place, path), 3)
+            storage.all().clear()
+            self.assertEqual(storage.import_file(Place, path), 3)
+            for place_id, attributes in expected.items():
+                place = storage.get(Place, place_id)
+                for attribute, value in attributes.items():
+                    self.assertEqual(place.to_dict()[attribute], value)
+
+    def test_export_jsonl(self):
+        """Test export writes one record per line"""
+        user = User()
+        path = self.path("users.jsonl")
+        self.assertEqual(storage.export_file("User", path), 1)
+        with open(path, encoding="utf-8") as f:
+            self.assertEqual([json.loads(line) for line in f],
+                             [user.to_dict()])
+
+    @unittest.skipIf(models.storage_t == "db", "reloads file storage")
+    def test_import_persisted(self):
+        """Test imported instances are saved to the store"""
+        path = self.path("places.jsonl", '{"id": "p1", "name": "Loft"}\n')
+        storage.import_file(Place, path)
+        storage.all().clear()
+        storage.reload()
+        self.assertEqual(storage.get(Place, "p1").name, "Loft")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,116 @@
+#!/usr/bin/python3
+"""
+Unit tests for the compact model layout
+"""
+import unittest
+import os
+from datetime import datetime, timedelta, timezone
+from models import compact, storage
+from models.base_model import classes
+from models.place import Place
+from models.review import Review
+
+
+class TestCompact(unittest.TestCase):
+    """Test cases for the compact model layout"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        storage.all().clear()
+        compact.enable(["Place", "Review"])
+        self.place = classes["Place"]()
+        self.place.name = "Cozy Apartment"
+        self.place.number_rooms = 2
+        self.place.city_id = "city-123"
+
+    def tearDown(self):
+        """Clean up after each test"""
+        compact.disable()
+        storage.all().clear()
+        for path in ("file.json", "file.json.bak"):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def test_enable_registers_subclass(self):
+        """Test enable registers a slotted subclass under the same name"""
+        self.assertIsNot(classes["Place"], Place)
+        self.assertTrue(issubclass(classes["Place"], Place))
+        self.assertIsInstance(self.place, compact.CompactModel)
+        self.assertEqual(self.place.__class__.__name__, "Place")
+        self.assertEqual(self.place.__dict__, {})
+
+    def test_disable_restores_classes(self):
+        """Test disable registers the original classes again"""
+        compact.disable()
+        self.assertIs(classes["Place"], Place)
+        self.assertIs(classes["Review"], Review)
+
+    def test_defaults(self):
+        """Test unset declared attributes fall back to class defaults"""
+        self.assertEqual(self.place.description, "")
+        self.assertEqual(self.place.max_guest, 0)
+        self.assertEqual(self.place.amenity_ids, [])
+        with self.assertRaises(AttributeError):
+            self.place.undeclared
+
+    def test_timestamps(self):
+        """Test timestamps are stored as epoch microseconds"""
+        self.assertIsInstance(self.place.created_at, datetime)
+        self.assertIsInstance(self.place._created_at, int)
+        self.place.updated_at = "2023-01-01T12:00:00.000001"
+        self.assertEqual(self.place.updated_at,
+                         datetime(2023, 1, 1, 12, 0, 0, 1))
+
+    def test_aware_timestamps(self):
+        """Test timestamps with a time zone are stored in UTC"""
+        self.place.created_at = "2023-01-01T12:00:00+02:00"
+        self.assertEqual(self.place.created_at, datetime(2023, 1, 1, 10))
+        self.place.updated_at = datetime(2023, 1, 1, 12,
+                                         tzinfo=timezone(-timedelta(hours=5)))
+        self.assertEqual(self.place.updated_at, datetime(2023, 1, 1, 17))
+
+    def test_to_dict(self):
+        """Test to_dict matches the default layout"""
+        self.place.extra = "value"
+        obj_dict = self.place.to_dict()
+        self.assertEqual(obj_dict["__class__"], "Place")
+        self.assertEqual(obj_dict["name"], "Cozy Apartment")
+        self.assertEqual(obj_dict["number_rooms"], 2)
+        self.assertEqual(obj_dict["extra"], "value")
+        self.assertNotIn("description", obj_dict)
+        self.assertEqual(obj_dict["created_at"],
+                         self.place.created_at.isoformat())
+
+        self.assertEqual(Place.from_dict(obj_dict).to_dict(), obj_dict)
+        self.assertEqual(classes["Place"].from_dict(obj_dict).to_dict(),
+                         obj_dict)
+
+    def test_str_representation(self):
+        """Test __str__ shows the same attributes as the default layout"""
+        expected = Place.from_dict(self.place.to_dict())
+        expected.created_at
+        expected.updated_at
+        self.assertEqual(str(self.place), str(expected))
+
+    def test_foreign_keys_interned(self):
+        """Test *_id values loaded from a dictionary are shared"""
+        obj_dict = {"id": "1", "place_id": "".join(["place", "-1"])}
+        first = classes["Review"].from_dict(obj_dict)
+        second = classes["Review"].from_dict(dict(obj_dict, id="2"))
+        self.assertIs(first.place_id, second.place_id)
+
+    def test_storage_round_trip(self):
+        """Test compact instances are saved, indexed and reloaded"""
+        self.assertEqual(list(storage.find("Place", city_id="city-123")),
+                         [f"Place.{self.place.id}"])
+        storage.save()
+        storage.all().clear()
+        storage.reload()
+
+        reloaded = storage.all()[f"Place.{self.place.id}"]
+        self.assertIsInstance(reloaded, compact.CompactModel)
+        self.assertEqual(reloaded.to_dict(), self.place.to_dict())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+#!/usr/bin/python3
+"""
+Unit tests for the output formats of the all command
+"""
+import unittest
+import csv
+import io
+import json
+from models import storage
+from models.output import CSVWriter, JSONLinesWriter, ListWriter, writers
+from models.place import Place
+
+
+class TestOutput(unittest.TestCase):
+    """Test cases for the output writers"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        storage.all().clear()
+        self.places = [Place() for _ in range(3)]
+        self.places[0].name = "Cozy, quiet"
+        self.places[1].amenity_ids = ["a", "b"]
+
+    def tearDown(self):
+        """Clean up after each test"""
+        storage.all().clear()
+
+    def output(self, writer_class, objects, class_name="Place"):
+        """Returns the text written by writer_class for objects"""
+        stream = io.StringIO()
+        writer = writer_class(stream, class_name)
+        for obj in objects:
+            writer.write(obj)
+        writer.close()
+        return stream.getvalue()
+
+    def test_writers(self):
+        """Test every format is registered by name"""
+        self.assertEqual(writers, {"list": ListWriter,
+                                   "jsonl": JSONLinesWriter,
+                                   "csv": CSVWriter})
+
+    def test_list(self):
+        """Test the list format matches printing the list of strings"""
+        expected = str([str(place) for place in self.places]) + "\n"
+        self.assertEqual(self.output(ListWriter, self.places), expected)
+        self.assertEqual(self.output(ListWriter, []), "[]\n")
+
+    def test_chunks(self):
+        """Test output is written as the buffer fills, not at the end"""
+        stream = io.StringIO()
+        writer = ListWriter(stream)
+        writer.chunk_size = 10
+        writer.write(self.places[0])
+        self.assertEqual(stream.getvalue(), f"[{str(self.places[0])!r}")
+        writer.write(self.places[1])
+        writer.close()
+        self.assertEqual(stream.getvalue(),
+                         str([str(place) for place in self.places[:2]])
+                         + "\n")
+
+    def test_jsonl(self):
+        """Test the jsonl format writes one dictionary per line"""
+        lines = self.output(JSONLinesWriter, self.places).splitlines()
+        self.assertEqual([json.loads(line) for line in lines],
+                         [place.to_dict() for place in self.places])
+
+    def test_csv(self):
+        """Test the csv format writes a header and one row per instance"""
+        rows = list(csv.DictReader(io.StringIO(
+            self.output(CSVWriter, self.places))))
+        self.assertEqual(len(rows), 3)
+        self.assertEqual(list(rows[0])[:4],
+                         ["__class__", "id", "created_at", "updated_at"])
+        self.assertEqual(rows[0]["id"], self.places[0].id)
+        self.assertEqual(rows[0]["name"], "Cozy, quiet")
+        self.assertEqual(rows[0]["number_rooms"], "0")
+        self.assertEqual(json.loads(rows[1]["amenity_ids"]), ["a", "b"])
+
+    def test_csv_needs_class(self):
+        """Test the csv format needs a class name"""
+        with self.assertRaisesRegex(ValueError, "class name missing"):
+            CSVWriter(io.StringIO())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -21,9 +21,10 @@ class TestPlace(unittest.TestCase):
         """Clean up after each test"""
         # Clear storage after each test
         storage.all().clear()
-        # Remove file.json if it exists
-        if os.path.exists("file.json"):
-            os.remove("file.json")
+        # Remove file.json and its backup if they exist
+        for path in ("file.json", "file.json.bak"):
+            if os.path.exists(path):
+                os.remove(path)
 
     def test_place_inheritance(self):
         """Test that Place inherits from BaseModel"""
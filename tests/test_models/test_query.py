@@ -0,0 +1,124 @@
+#!/usr/bin/python3
+"""
+Unit tests for the console's query language
+"""
+import unittest
+import os
+from unittest import mock
+from models import storage
+from models.place import Place
+from models.query import Query
+
+
+class TestQuery(unittest.TestCase):
+    """Test cases for Query"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        storage.all().clear()
+        self.places = []
+        for i, (city, price) in enumerate([("a", 120), ("a", 80), ("b", 50),
+                                           ("a", 30), ("a", 95)]):
+            place = Place()
+            place.name = f"place {i}"
+            place.city_id = city
+            place.price_by_night = price
+            storage.new(place)
+            self.places.append(place)
+
+    def tearDown(self):
+        """Clean up after each test"""
+        storage.all().clear()
+        for path in ("file.json", "file.json.bak"):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def names(self, text):
+        """Returns the names of the places matching the query text"""
+        return [obj.name for obj in Query.parse(text).run(storage)]
+
+    def test_parse(self):
+        """Test every clause is parsed"""
+        query = Query.parse('Place where city_id="a b" and price_by_night<100'
+                            ' order by price_by_night desc limit 20'
+                            ' fields name,price_by_night')
+        self.assertEqual(query.class_name, "Place")
+        self.assertEqual(query.conditions, [("city_id", "=", "a b"),
+                                            ("price_by_night", "<", "100")])
+        self.assertEqual(query.order, "price_by_night")
+        self.assertTrue(query.descending)
+        self.assertEqual(query.limit, 20)
+        self.assertEqual(query.fields, ["name", "price_by_night"])
+
+    def test_parse_errors(self):
+        """Test invalid queries raise ValueError with a message"""
+        for text, message in [("", "class name missing"),
+                              ("Place where", "field missing in where"),
+                              ("Place where name", "operator missing after "
+                                                   "name"),
+                              ("Place order name", "by missing after order"),
+                              ("Place limit x", "invalid limit: x"),
+                              ("Place fields", "field missing after fields"),
+                              ("Place sorted", "unexpected sorted"),
+                              ('User where email="\\x"',
+                               'invalid value: "\\\\x"')]:
+            with self.assertRaisesRegex(ValueError, f"^{message}$"):
+                Query.parse(text)
+
+    def test_where(self):
+        """Test conditions are compared with the declared type"""
+        self.assertEqual(self.names("Place where city_id=a and "
+                                    "price_by_night<100"),
+                         ["place 1", "place 3", "place 4"])
+        self.assertEqual(self.names("Place where price_by_night>=95"),
+                         ["place 0", "place 4"])
+        self.assertEqual(self.names("Place where city_id!=a"), ["place 2"])
+        self.assertEqual(self.names("Place where name='place 2'"),
+                         ["place 2"])
+
+    def test_where_mismatched_type(self):
+        """Test values of another type never match"""
+        self.places[0].price_by_night = "free"
+        self.assertEqual(self.names("Place where price_by_night<60"),
+                         ["place 2", "place 3"])
+
+    def test_where_schema(self):
+        """Test values are parsed by the schema of the class, and numbers
+        or strings for the fields it does not declare"""
+        query = Query.parse("Place where number_rooms=3 and name=3 and "
+                            "amenity_ids='[\"a\"]' and rating>4.5")
+        self.assertEqual([value for _, _, value in query.criteria()],
+                         [3, "3", ["a"], 4.5])
+        query = Query.parse("Place where number_rooms=many")
+        with self.assertRaisesRegex(ValueError,
+                                    "^number_rooms: not an int: 'many'$"):
+            query.criteria()
+
+    def test_equality_uses_find(self):
+        """Test equality conditions go through storage.find"""
+        with mock.patch.object(storage, "find", wraps=storage.find) as find:
+            self.names("Place where city_id=b and price_by_night>10")
+        find.assert_called_once_with("Place", city_id="b")
+
+    def test_order_and_limit(self):
+        """Test results are sorted, then cut at the limit"""
+        self.assertEqual(self.names("Place order by price_by_night"),
+                         ["place 3", "place 2", "place 1", "place 4",
+                          "place 0"])
+        self.assertEqual(self.names("Place order by price_by_night desc "
+                                    "limit 2"),
+                         ["place 0", "place 4"])
+        self.assertEqual(len(self.names("Place limit 3")), 3)
+
+    def test_row(self):
+        """Test rows are the string representation, projected on fields"""
+        place = self.places[0]
+        self.assertEqual(Query.parse("Place").row(place), str(place))
+        self.assertEqual(Query.parse("Place fields name,price_by_night")
+                         .row(place),
+                         f"[Place] ({place.id}) "
+                         "{'name': 'place 0', 'price_by_night': 120}")
+
+
+if __name__ == '__main__':
+    unittest.main()
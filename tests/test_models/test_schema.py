@@ -0,0 +1,100 @@
+#!/usr/bin/python3
+"""
+Unit tests for the typed attribute schema of the model classes
+"""
+import unittest
+from models import compact
+from models.base_model import BaseModel
+from models.place import Place
+from models.schema import schema
+from models.user import User
+
+
+class TestSchema(unittest.TestCase):
+    """Test cases for schema()"""
+
+    def test_declared_fields(self):
+        """Test the fields are the class-level attributes, typed by their
+        defaults"""
+        fields = schema(Place).fields
+        self.assertEqual(fields["number_rooms"].type, int)
+        self.assertEqual(fields["latitude"].type, float)
+        self.assertEqual(fields["amenity_ids"].type, list)
+        self.assertEqual(fields["name"].type, str)
+        self.assertNotIn("created_at", fields)
+        self.assertNotIn("save", fields)
+        self.assertEqual(schema(BaseModel).fields, {})
+        self.assertEqual(schema(User).defaults["email"], "")
+
+    def test_cached(self):
+        """Test the schema of a class is built once"""
+        self.assertIs(schema(Place), schema(Place))
+
+    def test_compact_class(self):
+        """Test compact variants have the fields of their class"""
+        compact.enable(["Place"])
+        try:
+            self.assertEqual(compact.fields(compact.classes["Place"]),
+                             schema(Place).defaults)
+        finally:
+            compact.disable()
+
+    def test_parse(self):
+        """Test values are converted to the type of their field"""
+        fields = schema(Place).fields
+        self.assertEqual(fields["number_rooms"].parse("3"), 3)
+        self.assertEqual(fields["number_rooms"].parse(3.0), 3)
+        self.assertEqual(fields["number_rooms"].parse(""), 0)
+        self.assertEqual(fields["latitude"].parse("1.5"), 1.5)
+        self.assertEqual(fields["latitude"].parse(2), 2.0)
+        self.assertEqual(fields["amenity_ids"].parse('["a", "b"]'),
+                         ["a", "b"])
+        self.assertEqual(fields["amenity_ids"].parse("['a']"), ["a"])
+        self.assertEqual(fields["name"].parse(12), "12")
+
+    def test_parse_errors(self):
+        """Test values that do not fit their field raise ValueError"""
+        fields = schema(Place).fields
+        for name, value, message in [
+                ("number_rooms", "many", "not an int: 'many'"),
+                ("number_rooms", True, "not an int: True"),
+                ("number_rooms", 4.7, "not an int: 4.7"),
+                ("number_rooms", "4.7", "not an int: '4.7'"),
+                ("number_rooms", float("nan"), "not an int: nan"),
+                ("latitude", [], "not a float: \\[\\]"),
+                ("amenity_ids", "a", "not a list: 'a'"),
+                ("name", ["a"], "not a string")]:
+            with self.assertRaisesRegex(ValueError, f"^{message}"):
+                fields[name].parse(value)
+
+    def test_serialize(self):
+        """Test lists are serialized as JSON, other values as they are"""
+        fields = schema(Place).fields
+        self.assertEqual(fields["amenity_ids"].serialize(["a"]), '["a"]')
+        self.assertEqual(fields["max_guest"].serialize(4), 4)
+
+    def test_load(self):
+        """Test values saved with another type are converted on load"""
+        values = {"id": "1", "number_rooms": "3", "latitude": 1,
+                  "max_guest": "many", "price_by_night": 4.7,
+                  "name": "Loft"}
+        loaded = schema(Place).load(values)
+        self.assertEqual(loaded, {"id": "1", "number_rooms": 3,
+                                  "latitude": 1.0, "max_guest": "many",
+                                  "price_by_night": 4.7, "name": "Loft"})
+        self.assertEqual(values["number_rooms"], "3")
+        typed = {"id": "1", "number_rooms": 3}
+        self.assertIs(schema(Place).load(typed), typed)
+
+    def test_from_dict(self):
+        """Test instances built from a dictionary get the declared
+        types"""
+        place = Place.from_dict({"id": "1", "__class__": "Place",
+                                 "price_by_night": "120",
+                                 "amenity_ids": '["a"]'})
+        self.assertEqual((place.price_by_night, place.amenity_ids),
+                         (120, ["a"]))
+
+
+if __name__ == '__main__':
+    unittest.main()